@@ -0,0 +1,157 @@
+"""初始回填扫描对比：原来的固定等待 / 按控件响应速度滚动
+
+运行: python -m benchmarks.bench_backfill [--segments N] [--visible V] [--latency 秒] [--skip-legacy]
+
+模拟一个可滚动的字幕列表：按键之后要经过latency秒才渲染出新的可见项，
+按控件响应滚动时最后一条字幕在扫描期间持续增长（模拟正在进行的会议）。
+原来的扫描以"没有新名字"判断到底，最后一条字幕一直增长时永远不会结束，
+因此固定等待的扫描在静止的列表上运行。
+两种方式都通过TranscriptManager把回填内容写入存储，统计扫描耗时和收集到的条目数。
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from caption_backfill import BackfillScanner
+from caption_source import CaptionSource, ReplayCaptionSource
+from test import TranscriptManager
+
+HOME, END, PAGE_DOWN = "home", "end", "pagedown"
+
+
+class SimulatedScrollableList(CaptionSource):
+    """可滚动的字幕列表，按键在render_latency秒后才生效"""
+
+    def __init__(self, names, visible: int = 8, render_latency: float = 0.05,
+                 grow_interval: float = 0.2):
+        self.names = list(names)
+        self.visible = visible
+        self.render_latency = render_latency
+        self.grow_interval = grow_interval
+        self.top = max(0, len(self.names) - visible)
+        self._pending = []
+        self._started = time.monotonic()
+        self.reads = 0
+
+    def connect(self) -> bool:
+        return True
+
+    def is_alive(self) -> bool:
+        return True
+
+    def press(self, key):
+        self._pending.append((time.monotonic() + self.render_latency, key))
+
+    def read_names(self):
+        self.reads += 1
+        now = time.monotonic()
+        while self._pending and self._pending[0][0] <= now:
+            _, key = self._pending.pop(0)
+            bottom = max(0, len(self.names) - self.visible)
+            if key == HOME:
+                self.top = 0
+            elif key == END:
+                self.top = bottom
+            else:
+                self.top = min(bottom, self.top + self.visible)
+        names = self.names[self.top:self.top + self.visible]
+        # 最后一条字幕随时间增长
+        if self.top + self.visible >= len(self.names) and self.grow_interval:
+            words = int((now - self._started) / self.grow_interval)
+            names[-1] = names[-1] + " more" * words
+        return names
+
+
+class LegacyBackfill(SimulatedScrollableList):
+    """原来ZoomCaptionSource.backfill的固定等待逻辑"""
+
+    def __init__(self, names, visible: int = 8, render_latency: float = 0.05):
+        super().__init__(names, visible, render_latency, grow_interval=0)
+
+    def press(self, key):
+        super().press(key)
+        time.sleep(0.1)  # 原_send_key中按下和抬起各等待0.05秒
+
+    def backfill(self):
+        time.sleep(0.5)
+        self.press(END)
+        time.sleep(0.2)
+        for _ in range(3):
+            for _ in range(10):
+                self.press(HOME)
+                time.sleep(0.1)
+            if self.read_names():
+                break
+            time.sleep(0.5)
+
+        no_new_content_count = 0
+        seen_names = set()
+        while no_new_content_count < 3:
+            names = self.read_names()
+            new_names = [name for name in names if name not in seen_names]
+            if new_names:
+                seen_names.update(new_names)
+                no_new_content_count = 0
+                yield names
+            else:
+                no_new_content_count += 1
+            self.press(PAGE_DOWN)
+            time.sleep(0.3)
+
+
+class AdaptiveBackfill(SimulatedScrollableList):
+    """新的ZoomCaptionSource.backfill：由BackfillScanner按控件响应滚动"""
+
+    def backfill(self):
+        self.press(END)
+        self.scanner = BackfillScanner(self.read_names, lambda: self.press(HOME),
+                                       lambda: self.press(PAGE_DOWN))
+        yield from self.scanner.scan()
+
+
+def run(source_class, names, args):
+    source = source_class(names, args.visible, args.latency)
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        manager = TranscriptManager(transcript_dir=transcript_dir)
+        first_segment = None
+        original_update = manager.update_transcripts
+        started = time.monotonic()
+
+        def update(items):
+            nonlocal first_segment
+            if first_segment is None:
+                first_segment = time.monotonic() - started
+            return original_update(items)
+
+        manager.update_transcripts = update
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager._collect_all_content(source)
+            if manager.journal:
+                manager.journal.close()
+    return manager, source, first_segment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200, help="列表中已有的字幕条数")
+    parser.add_argument("--visible", type=int, default=8, help="可见项数量")
+    parser.add_argument("--latency", type=float, default=0.05, help="按键到渲染完成的延迟（秒）")
+    parser.add_argument("--skip-legacy", action="store_true", help="不运行原来的固定等待扫描")
+    args = parser.parse_args()
+
+    frames = ReplayCaptionSource.synthetic(args.segments, speed=0, visible=args.segments).frames
+    names = frames[-1][1]
+
+    variants = [("按控件响应", AdaptiveBackfill)]
+    if not args.skip_legacy:
+        variants.insert(0, ("固定等待", LegacyBackfill))
+    for label, source_class in variants:
+        manager, source, first_segment = run(source_class, names, args)
+        print(f"{label:<6} 耗时 {manager.backfill_seconds:6.2f} s  首条入库 {first_segment:.2f} s  "
+              f"条目 {len(manager.transcripts)}/{len(names)}  读取 {source.reads} 次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""字幕修订风暴回放
+
+运行: python -m benchmarks.bench_caption_merger [日志文件.journal] [--batch N]
+
+不带参数时生成合成的修订风暴：逐词增长、替换词语、缩短和拆分；
+带日志文件时按写入顺序回放真实记录，每N条记录作为一批。
+分别统计旧的"保留更长内容"逻辑与CaptionMerger产生的UI事件数、
+CPU时间，以及最终内容与真实最终状态不一致的条目数。
+"""
+import argparse
+import random
+import time
+
+from caption_merger import CaptionMerger
+from transcript_journal import TranscriptJournal
+from transcript_store import TranscriptItem, TranscriptStore
+
+WORDS = ["we", "should", "ship", "the", "release", "today", "after", "review",
+         "budget", "timeline", "risk", "owner", "next", "sprint", "deploy"]
+
+
+def synthetic_storm(segments, states_per_batch, seed=7):
+    """生成修订风暴，返回 (批次列表, 每条字幕的最终内容)"""
+    rng = random.Random(seed)
+    states = []
+    final = {}
+    for i in range(segments):
+        seconds = 9 * 3600 + i * 4
+        timestamp = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        speaker = rng.choice(["Alice", "Bob", "Carol"])
+        words = []
+        for _ in range(rng.randint(8, 20)):
+            words.append(rng.choice(WORDS))
+            states.append((speaker, timestamp, " ".join(words)))
+            if rng.random() < 0.2 and len(words) > 2:
+                # 替换前面的某个词
+                words[rng.randrange(len(words) - 1)] = rng.choice(WORDS)
+                states.append((speaker, timestamp, " ".join(words)))
+        if rng.random() < 0.3:
+            # 缩短，或拆分出去的后半段成为下一条字幕的开头
+            words = words[:max(1, len(words) * 2 // 3)]
+            states.append((speaker, timestamp, " ".join(words)))
+        final[(timestamp, speaker)] = " ".join(words)
+    batches = [states[i:i + states_per_batch] for i in range(0, len(states), states_per_batch)]
+    return batches, final
+
+
+def journal_storm(path, states_per_batch):
+    """从转录日志回放记录"""
+    states = [(speaker, timestamp, content)
+              for timestamp, speaker, content in TranscriptJournal.replay(path)]
+    final = {(timestamp, speaker): content for speaker, timestamp, content in states}
+    batches = [states[i:i + states_per_batch] for i in range(0, len(states), states_per_batch)]
+    return batches, final
+
+
+def run_legacy(batches):
+    """原先update_transcripts的逻辑：内容更长才更新，每次更新一个事件"""
+    transcripts = {}
+    latest_messages = {}
+    events = 0
+    for batch in batches:
+        for speaker, timestamp, content in batch:
+            item = TranscriptItem(speaker, timestamp, content)
+            dedup_key = f"{item.timestamp}_{item.speaker}"
+            if dedup_key in latest_messages:
+                if len(item.content) <= len(latest_messages[dedup_key].content):
+                    continue
+                transcripts.pop(f"{item.timestamp}|{latest_messages[dedup_key].content}", None)
+            latest_messages[dedup_key] = item
+            transcripts[f"{item.timestamp}|{item.content}"] = item
+            events += 1
+    return events, {(i.timestamp, i.speaker): i.content for i in latest_messages.values()}
+
+
+def run_merger(batches):
+    store = TranscriptStore()
+    merger = CaptionMerger()
+    events = 0
+    for batch in batches:
+        items = [TranscriptItem(speaker, timestamp, content) for speaker, timestamp, content in batch]
+        events += len(merger.merge_batch(store, items))
+    return events, {(i.timestamp, i.speaker): i.content for i in store}
+
+
+def report(label, runner, batches, final):
+    started = time.process_time()
+    events, result = runner(batches)
+    cpu = time.process_time() - started
+    stale = sum(1 for key, content in final.items() if result.get(key) != content)
+    print(f"{label:<8} 事件 {events:8d}  CPU {cpu * 1000:8.1f} ms  内容不一致 {stale:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("journal", nargs="?", help="要回放的.journal文件")
+    parser.add_argument("--batch", type=int, default=4, help="每批包含的字幕状态数")
+    parser.add_argument("--segments", type=int, default=5000, help="合成字幕条数")
+    args = parser.parse_args()
+
+    if args.journal:
+        batches, final = journal_storm(args.journal, args.batch)
+    else:
+        batches, final = synthetic_storm(args.segments, args.batch)
+    states = sum(len(batch) for batch in batches)
+    print(f"{len(final)} 条字幕, {states} 个中间状态, {len(batches)} 批")
+    report("legacy", run_legacy, batches, final)
+    report("merger", run_merger, batches, final)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""字幕列表项解析对比：原来的逐项解析 / CaptionParser批量解析
+
+运行: python -m benchmarks.bench_caption_parser [--names N] [--batch B]
+
+生成N个与ListItemControl.Name相同格式的名字，其中一部分没有说话者（沿用上一条），
+一部分内容折成多行。统计两种方式的耗时，以及原来的方式截断了多少条多行内容。
+批量解析按B个一批调用，结果应与一次解析全部名字相同（说话者跨批次保留）。
+"""
+import argparse
+import random
+import re
+import time
+
+from caption_parser import CaptionParser
+from transcript_store import MeetingClock, TranscriptItem, format_clock, parse_clock
+
+WORDS = ["we", "should", "ship", "the", "release", "after", "review", "budget",
+         "timeline", "risk", "owner", "next", "sprint", "deploy", "customer"]
+SPEAKERS = ["Alice", "Bob", "Carol", "David Lee"]
+
+
+def make_names(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    seconds = parse_clock("09:00:00")
+    names = []
+    for _ in range(count):
+        seconds += rng.randint(1, 6)
+        speaker = rng.choice(SPEAKERS) if rng.random() < 0.7 else ""
+        lines = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+                 for _ in range(1 if rng.random() < 0.8 else rng.randint(2, 3))]
+        header = f"{speaker} {format_clock(seconds)}".strip()
+        names.append(header + "\n" + "\n".join(lines))
+    return names
+
+
+class LegacyParser:
+    """原来TranscriptManager._parse_list_item的逐项解析"""
+
+    def __init__(self):
+        self.clock = MeetingClock()
+        self.current_speaker = ""
+
+    def parse(self, name):
+        if not name:
+            return None
+        name_parts = name.split('\n')
+        if len(name_parts) < 2:
+            return None
+        header = name_parts[0].strip()
+        content = name_parts[1].strip()
+        time_match = re.search(r'\d{2}:\d{2}:\d{2}', header)
+        if not time_match:
+            return None
+        timestamp = time_match.group(0)
+        speaker_part = header[:time_match.start()].strip()
+        if speaker_part:
+            self.current_speaker = speaker_part
+        speaker = speaker_part if speaker_part else self.current_speaker
+        return TranscriptItem(speaker=speaker, timestamp=timestamp, content=content,
+                              seconds=self.clock.resolve(timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=100000, help="名字数量")
+    parser.add_argument("--batch", type=int, default=50, help="每批名字数量")
+    args = parser.parse_args()
+
+    names = make_names(args.names)
+
+    legacy = LegacyParser()
+    started = time.perf_counter()
+    legacy_items = [item for item in map(legacy.parse, names) if item]
+    legacy_time = time.perf_counter() - started
+
+    batch_parser = CaptionParser()
+    started = time.perf_counter()
+    batch_items = []
+    for offset in range(0, len(names), args.batch):
+        batch_items.extend(batch_parser.parse_batch(names[offset:offset + args.batch]))
+    batch_time = time.perf_counter() - started
+
+    whole = CaptionParser().parse_batch(names)
+    assert [(i.speaker, i.timestamp, i.content) for i in whole] == \
+           [(i.speaker, i.timestamp, i.content) for i in batch_items], "分批解析的结果不同"
+    assert [(i.speaker, i.timestamp) for i in legacy_items] == \
+           [(i.speaker, i.timestamp) for i in batch_items], "说话者或时间戳与原来的解析不同"
+
+    truncated = sum(1 for old, new in zip(legacy_items, batch_items) if old.content != new.content)
+    print(f"名字 {len(names):,}  条目 {len(batch_items):,}  多行内容 {truncated:,} 条")
+    print(f"逐项解析 {legacy_time * 1000:8.1f} ms  {len(names) / legacy_time:>12,.0f} 条/秒  "
+          f"截断 {truncated:,} 条多行内容")
+    print(f"批量解析 {batch_time * 1000:8.1f} ms  {len(names) / batch_time:>12,.0f} 条/秒  "
+          f"加速 {legacy_time / batch_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
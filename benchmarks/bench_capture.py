@@ -0,0 +1,69 @@
+"""多窗口同时采集：每个来源独立的TranscriptManager和会议文件
+
+运行: python -m benchmarks.bench_capture [--sources N] [--workers W] [--segments S] [--speed X]
+
+用N个合成会议的回放来源模拟同时打开的多个Zoom转录窗口，另加一个
+创建时就出错的来源（录制文件不存在），验证出错只影响它自己。
+工作线程只有W个时，多出的来源等待前面的来源结束后再开始。
+采集过程中每秒打印一次各来源的状态，结束后列出保存的会议文件。
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from caption_source import ReplayCaptionSource
+from capture_supervisor import CaptureSupervisor
+from test import TranscriptManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=3, help="回放来源数量")
+    parser.add_argument("--workers", type=int, default=2, help="工作线程数量")
+    parser.add_argument("--segments", type=int, default=60, help="每个会议的字幕条数")
+    parser.add_argument("--speed", type=float, default=40, help="回放倍速")
+    args = parser.parse_args()
+
+    sources = {
+        f"room{n + 1}": (lambda n=n: ReplayCaptionSource.synthetic(args.segments, speed=args.speed, seed=n + 1))
+        for n in range(args.sources)
+    }
+    sources["broken"] = lambda: ReplayCaptionSource.from_file("missing.jsonl")
+
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        supervisor = CaptureSupervisor(
+            lambda: sources,
+            lambda key: TranscriptManager(transcript_dir=transcript_dir, stream_name=key),
+            max_workers=args.workers,
+            discover_interval=0.5,
+            min_interval=0.25 / args.speed,
+            max_interval=2.0 / args.speed,
+        )
+        stdout = sys.stdout
+        started = time.perf_counter()
+        # 采集线程逐条打印日志，压测时丢弃输出，只打印状态表
+        with contextlib.redirect_stdout(io.StringIO()):
+            thread = threading.Thread(target=supervisor.run, daemon=True)
+            thread.start()
+            while True:
+                time.sleep(1)
+                statuses = supervisor.status()
+                print(f"--- {time.perf_counter() - started:.0f}s\n{supervisor.format_status(statuses)}",
+                      file=stdout)
+                if statuses and all(status["state"] in ("finished", "failed") for status in statuses):
+                    break
+            supervisor.stop()
+        elapsed = time.perf_counter() - started
+
+        print(f"\n耗时 {elapsed:.1f} s，保存的会议文件:")
+        for name in sorted(os.listdir(transcript_dir)):
+            print(f"  {name}")
+
+
+if __name__ == "__main__":
+    main()
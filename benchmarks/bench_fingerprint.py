@@ -0,0 +1,95 @@
+"""列表项指纹缓存压测：每次读取的解析开销与可见项数量的关系
+
+运行: python -m benchmarks.bench_fingerprint [--polls N] [--visible 8,32,128,512]
+
+模拟的字幕列表每次读取时最后一条字幕增长一个词，每隔几次读取出现一条新字幕，
+其余可见项保持不变。分别在关闭和开启指纹缓存时统计每次读取的平均耗时。
+关闭缓存时每次都解析全部可见项，耗时随可见项数量增长；
+开启缓存时只解析变化的项，耗时基本只取决于变化的数量。
+"""
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+
+from transcript_store import format_clock, parse_clock
+from test import TranscriptManager
+
+
+class SimulatedListControl:
+    """模拟Zoom字幕列表：只有最后一条字幕在增长，visible个列表项可见"""
+
+    WORDS = ["we", "should", "ship", "the", "release", "after", "review", "budget",
+             "timeline", "risk", "owner", "next", "sprint", "deploy", "customer"]
+    SPEAKERS = ["Alice", "Bob", "Carol", "David"]
+
+    def __init__(self, visible: int, new_every: int = 6, seed: int = 1):
+        self.visible = visible
+        self.new_every = new_every
+        self.rng = random.Random(seed)
+        self.seconds = parse_clock("09:00:00")
+        self.rows = []
+        self.ticks = 0
+        # 先填满可见区域
+        for _ in range(visible):
+            self._new_row()
+
+    def _new_row(self):
+        self.seconds += self.rng.randint(2, 8)
+        header = f"{self.rng.choice(self.SPEAKERS)} {format_clock(self.seconds)}"
+        self.rows.append([header, self.rng.choice(self.WORDS)])
+
+    def tick(self):
+        """字幕变化一次：最后一条增长一个词，或者出现一条新字幕"""
+        self.ticks += 1
+        if self.ticks % self.new_every == 0:
+            self._new_row()
+        else:
+            self.rows[-1][1] += " " + self.rng.choice(self.WORDS)
+
+    def read_names(self):
+        return [f"{header}\n{content}" for header, content in self.rows[-self.visible:]]
+
+
+def run(visible: int, polls: int, cached: bool):
+    control = SimulatedListControl(visible)
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        manager = TranscriptManager(transcript_dir=transcript_dir)
+        elapsed = 0.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            # 第一次读取解析全部可见项，不计入统计
+            manager.update_transcripts(manager._parse_visible_items(control.read_names()))
+            for _ in range(polls):
+                control.tick()
+                names = control.read_names()
+                if not cached:
+                    manager.fingerprints.reset()
+                started = time.perf_counter()
+                items = manager._parse_visible_items(names)
+                if items:
+                    manager.update_transcripts(items)
+                elapsed += time.perf_counter() - started
+            if manager.journal:
+                manager.journal.close()
+    return elapsed / polls, manager.fingerprints.stats(), len(manager.transcripts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=2000, help="每种配置的读取次数")
+    parser.add_argument("--visible", default="8,32,128,512", help="逗号分隔的可见项数量")
+    args = parser.parse_args()
+
+    print(f"{'可见项':>6} {'无缓存 us/次':>12} {'缓存 us/次':>10} {'加速':>6} {'命中率':>7} {'条目':>6}")
+    for visible in (int(value) for value in args.visible.split(',')):
+        legacy, _, legacy_count = run(visible, args.polls, cached=False)
+        cached, stats, count = run(visible, args.polls, cached=True)
+        assert count == legacy_count, "开启缓存后存储的条目数不同"
+        print(f"{visible:>6} {legacy * 1e6:>12.1f} {cached * 1e6:>10.1f} "
+              f"{legacy / cached:>5.1f}x {stats['hit_rate']:>7.1%} {count:>6}")
+
+
+if __name__ == "__main__":
+    main()
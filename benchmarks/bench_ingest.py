@@ -0,0 +1,58 @@
+"""字幕读取方式对比：固定1秒轮询 / 自适应轮询 / 变化通知
+
+运行: python -m benchmarks.bench_ingest [--segments N] [--speed S]
+
+用ReplayCaptionSource按S倍速回放同一段合成会议，分别统计
+字幕出现到写入存储的延迟百分位，以及读取字幕列表的次数。
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from caption_source import ReplayCaptionSource
+from test import TranscriptManager, monitor_transcript_loop
+
+
+class CountingSource(ReplayCaptionSource):
+    """统计read_names()调用次数，可以关闭变化通知"""
+
+    def __init__(self, frames, speed, events):
+        super().__init__(frames, speed)
+        self.events = events
+        self.reads = 0
+
+    def subscribe(self, callback) -> bool:
+        return self.events and super().subscribe(callback)
+
+    def read_names(self):
+        self.reads += 1
+        return super().read_names()
+
+
+def run(label, frames, speed, events, min_interval, max_interval):
+    source = CountingSource(frames, speed, events)
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        manager = TranscriptManager(transcript_dir=transcript_dir)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor_transcript_loop(manager, source, min_interval, max_interval)
+        elapsed = time.perf_counter() - started
+    print(f"{label:<10} 读取 {source.reads:5d} 次  耗时 {elapsed:5.1f} s  {manager.latency.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=20, help="合成会议的字幕条数")
+    parser.add_argument("--speed", type=float, default=4, help="回放倍速")
+    args = parser.parse_args()
+
+    frames = ReplayCaptionSource.synthetic(args.segments).frames
+    run("固定1秒", frames, args.speed, False, 1.0, 1.0)
+    run("自适应", frames, args.speed, False, 0.25, 2.0)
+    run("变化通知", frames, args.speed, True, 0.25, 2.0)
+
+
+if __name__ == "__main__":
+    main()
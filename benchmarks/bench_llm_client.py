@@ -0,0 +1,81 @@
+"""LLM调用的连接和token开销：每次新连接并换token / 共用连接和缓存的token
+
+运行: python -m benchmarks.bench_llm_client [--calls N] [--handshake-ms H] [--auth-ms A]
+
+不需要真实的LLM服务：对本地接口桩（benchmarks.llm_stub）调用，接口桩给每个新连接
+加H毫秒（模拟TCP和TLS握手），换token加A毫秒。原来的做法每次调用都用
+requests.request发请求（每次新连接）并先调用一次get_token()；GenAIClient在启动时
+预热，之后的调用复用连接和token。统计每次调用的耗时、新连接数和换token次数。
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import requests
+
+import gpt4o
+from benchmarks.llm_stub import start_stub
+from caption_ingest import LatencyStats
+
+MSGS = [{"role": "user", "content": "Summarize the meeting"}]
+
+
+def legacy_call():
+    """原来的ask()：每次换token，每个请求都是新连接"""
+    payload = json.dumps({"input_token_state": {"token_type": "CREDENTIAL", "username": "u", "password": "p"},
+                          "output_token_state": {"token_type": "JWT"}})
+    response = requests.request("POST", gpt4o.OPENAI_TOKEN_URL, headers={'Content-Type': 'application/json'},
+                                data=payload, verify=False)
+    token = response.json()["issued_token"]
+    payload = json.dumps({"model": "gpt-4o", "messages": MSGS, "stream": False})
+    headers = {gpt4o.HEAD_TOKEN_KEY: token, 'Content-Type': 'application/json'}
+    response = requests.request("POST", gpt4o.OPENAI_MM_URL, headers=headers, data=payload,
+                                verify=False, timeout=180)
+    return response.json()["choices"][0]["message"]["content"]
+
+
+def measure(server, call, calls):
+    latency = LatencyStats()
+    connections, tokens = server.connections, server.token_requests
+    for _ in range(calls):
+        started = time.perf_counter()
+        # gpt4o会打印请求和回复
+        with contextlib.redirect_stdout(io.StringIO()):
+            call()
+        latency.add(time.perf_counter() - started)
+    return latency, server.connections - connections, server.token_requests - tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=30, help="每种方式的调用次数")
+    parser.add_argument("--handshake-ms", type=float, default=60, help="每个新连接的毫秒数")
+    parser.add_argument("--auth-ms", type=float, default=150, help="换token的毫秒数")
+    args = parser.parse_args()
+
+    server, url = start_stub(0, tokens=20, token_delay=0.001, first_delay=0.05,
+                             handshake_delay=args.handshake_ms / 1000, auth_delay=args.auth_ms / 1000)
+    gpt4o.OPENAI_MM_URL = url
+    gpt4o.OPENAI_TOKEN_URL = server.token_url
+    gpt4o.OPENAI_TOKEN = ""
+    gpt4o.HEAD_TOKEN_KEY = "Authorization"
+    gpt4o.OPENAI_APPLICATION_ID = "bench"
+    try:
+        latency, connections, tokens = measure(server, legacy_call, args.calls)
+        print(f"每次新连接+换token  {latency.summary()}  新连接 {connections}  换token {tokens}")
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gpt4o.warm_up()
+        print(f"GenAIClient预热     {(time.perf_counter() - started) * 1000:.0f} ms")
+        latency, connections, tokens = measure(server, lambda: gpt4o.ask(MSGS), args.calls)
+        print(f"共用连接+缓存token  {latency.summary()}  新连接 {connections}  换token {tokens}")
+    finally:
+        gpt4o.get_client().close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
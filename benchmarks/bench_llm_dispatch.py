@@ -0,0 +1,84 @@
+"""实时模式下LLM请求的堆积：每次一个线程 / 共享调度器（限制并发、合并同一功能的请求）
+
+运行: python -m benchmarks.bench_llm_dispatch [--seconds S] [--tick T] [--latency L] [--workers N]
+
+不需要LLM服务：每个请求用sleep模拟，服务同时处理的请求越多越慢
+（耗时 = L * 同时进行的请求数 / 2，至少L）。实时模式每T秒提交summary、viewpoints、
+navigation三个请求。统计发出的请求数、同时进行的最大请求数，以及面板上显示的
+结果所用transcript的平均陈旧程度（显示时距离它的快照时间的秒数）。
+"""
+import argparse
+import threading
+import time
+
+from caption_ingest import LatencyStats
+from llm_dispatcher import LLMDispatcher
+
+FEATURES = ("summary", "viewpoints", "navigation")
+
+
+class SlowEndpoint:
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+        self.staleness = LatencyStats()
+
+    def call(self, snapshot):
+        with self.lock:
+            self.active += 1
+            self.requests += 1
+            self.peak = max(self.peak, self.active)
+            load = self.active
+        time.sleep(self.latency * max(1.0, load / 2))
+        with self.lock:
+            self.active -= 1
+        self.staleness.add(time.monotonic() - snapshot)
+
+
+def run(submit, args):
+    started = time.monotonic()
+    while time.monotonic() - started < args.seconds:
+        snapshot = time.monotonic()
+        for feature in FEATURES:
+            submit(feature, snapshot)
+        time.sleep(args.tick)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10, help="实时模式运行的秒数")
+    parser.add_argument("--tick", type=float, default=0.5, help="实时更新的间隔（秒）")
+    parser.add_argument("--latency", type=float, default=1.0, help="单个请求的耗时（秒）")
+    parser.add_argument("--workers", type=int, default=2, help="调度器的并发数")
+    args = parser.parse_args()
+
+    endpoint = SlowEndpoint(args.latency)
+    threads = []
+
+    def submit_thread(feature, snapshot):
+        thread = threading.Thread(target=endpoint.call, args=(snapshot,), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    run(submit_thread, args)
+    for thread in threads:
+        thread.join()
+    print(f"每次一个线程  请求 {endpoint.requests:4d}  最大并发 {endpoint.peak:3d}  "
+          f"结果陈旧 {endpoint.staleness.summary()}")
+
+    endpoint = SlowEndpoint(args.latency)
+    dispatcher = LLMDispatcher(args.workers)
+    run(lambda feature, snapshot: dispatcher.submit(feature, lambda: endpoint.call(snapshot)), args)
+    while dispatcher.in_flight or dispatcher.queue_depth:
+        time.sleep(0.05)
+    dispatcher.shutdown(wait=True)
+    print(f"共享调度器    请求 {endpoint.requests:4d}  最大并发 {endpoint.peak:3d}  "
+          f"结果陈旧 {endpoint.staleness.summary()}")
+    print(dispatcher.stats())
+
+
+if __name__ == "__main__":
+    main()
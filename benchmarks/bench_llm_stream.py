@@ -0,0 +1,76 @@
+"""LLM回复延迟对比：一次性返回 / 流式返回（SSE）
+
+运行: python -m benchmarks.bench_llm_stream [--rounds N] [--tokens N] [--token-ms T] [--first-ms F]
+
+不需要真实的LLM服务：对本地接口桩（benchmarks.llm_stub）调用gpt4o，
+统计从发出请求到面板上第一次出现内容的时间（首个token）和收到完整回复的时间。
+一次性返回时两者相同。
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import gpt4o
+from benchmarks.llm_stub import start_stub
+from caption_ingest import LatencyStats
+
+MSGS = [{"role": "user", "content": "Summarize the meeting"}]
+
+
+def run(call, rounds):
+    ttft = LatencyStats()
+    total = LatencyStats()
+    updates = 0
+    for _ in range(rounds):
+        stats = {}
+        started = time.perf_counter()
+        first = []
+
+        def on_text(partial):
+            nonlocal updates
+            updates += 1
+            if not first:
+                first.append(time.perf_counter() - started)
+
+        # gpt4o会打印请求和回复
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = call(on_text, stats)
+        total.add(time.perf_counter() - started)
+        ttft.add(first[0] if first else total.samples[-1])
+        assert response.startswith("word0 ")
+    return ttft, total, updates / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="每种方式的请求次数")
+    parser.add_argument("--tokens", type=int, default=200, help="每个回复的token数")
+    parser.add_argument("--token-ms", type=float, default=10, help="每个token的毫秒数")
+    parser.add_argument("--first-ms", type=float, default=300, help="第一个token之前的毫秒数")
+    args = parser.parse_args()
+
+    server, url = start_stub(0, args.tokens, args.token_ms / 1000, args.first_ms / 1000)
+    gpt4o.OPENAI_MM_URL = url
+    gpt4o.OPENAI_TOKEN = "stub"
+    gpt4o.HEAD_TOKEN_KEY = "Authorization"
+    gpt4o.OPENAI_APPLICATION_ID = "bench"
+    try:
+        def blocking(on_text, stats):
+            response = gpt4o.ask_with_msgs("Bearer stub", MSGS)
+            on_text(response)
+            return response
+
+        def streaming(on_text, stats):
+            return gpt4o.ask_with_msgs_stream("Bearer stub", MSGS, on_text, stats)
+
+        for name, call in (("一次性返回", blocking), ("流式返回", streaming)):
+            ttft, total, updates = run(call, args.rounds)
+            print(f"{name:<6} 首个token {ttft.summary()}")
+            print(f"{'':<6} 完整回复  {total.summary()}  每次回复更新面板 {updates:.0f} 次")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
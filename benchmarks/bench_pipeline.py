@@ -0,0 +1,70 @@
+"""采集管线压测：回放来源 -> 去重合并 -> 日志持久化 -> UI队列
+
+运行: python -m benchmarks.bench_pipeline [--segments N] [--speed S] [--replay 录制文件]
+
+不需要Windows和Zoom。speed=0时尽可能快地回放（每次轮询前进一帧），
+speed=N时按N倍速回放，由回放来源的变化通知驱动读取。
+"""
+import argparse
+import contextlib
+import io
+import queue
+import tempfile
+import threading
+import time
+
+from caption_source import ReplayCaptionSource
+from test import TranscriptManager, monitor_transcript_loop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=2000, help="合成会议的字幕条数")
+    parser.add_argument("--speed", type=float, default=0, help="回放倍速，0表示不限速")
+    parser.add_argument("--replay", help="RecordingCaptionSource录制的文件")
+    args = parser.parse_args()
+
+    if args.replay:
+        source = ReplayCaptionSource.from_file(args.replay, speed=args.speed)
+    else:
+        source = ReplayCaptionSource.synthetic(args.segments, speed=args.speed)
+    min_interval = 0.25 / args.speed if args.speed > 0 else 0
+
+    # UI队列由另一个线程消费，模拟Tk线程
+    ui_queue = queue.Queue()
+    rendered = 0
+
+    def consume():
+        nonlocal rendered
+        while True:
+            message = ui_queue.get()
+            if message is None:
+                break
+            rendered += 1
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        manager = TranscriptManager(
+            lambda msg_type, content: ui_queue.put((msg_type, content)),
+            transcript_dir=transcript_dir
+        )
+        started = time.perf_counter()
+        # 管线本身逐条打印日志，压测时丢弃输出
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor_transcript_loop(manager, source, min_interval, min_interval * 8)
+        ui_queue.put(None)
+        consumer.join()
+        elapsed = time.perf_counter() - started
+
+    segments = len(manager.transcripts)
+    print(f"快照 {len(source.frames)}  字幕 {segments}  UI事件 {rendered}  "
+          f"修订 {manager.merger.revisions}")
+    print(f"耗时 {elapsed:.2f} s  {segments / elapsed:,.0f} 条/秒  "
+          f"{len(source.frames) / elapsed:,.0f} 快照/秒")
+    print(f"字幕到存储延迟: {manager.latency.summary()}")
+
+
+if __name__ == "__main__":
+    main()
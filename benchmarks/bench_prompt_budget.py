@@ -0,0 +1,67 @@
+"""按token预算裁剪prompt：不同会议长度下prompt的大小、省略的内容和裁剪耗时
+
+运行: python -m benchmarks.bench_prompt_budget [--sizes 100,1000,5000,20000] [--budget N]
+
+不需要LLM服务：用config.ini中的navigate_prompt模板和模拟的transcript
+（其中少量较早的行提到干系人Carol），比较直接填充的token数和裁剪后的token数，
+以及裁剪后保留下来的提及Carol的较早的行数。
+"""
+import argparse
+import configparser
+import os
+import random
+import time
+
+from prompt_budget import ContextBuilder, estimate_tokens, parse_terms
+from transcript_store import format_clock
+
+SPEAKERS = ("Alice", "Bob", "Dave", "Erin")
+
+
+def transcript(size):
+    rng = random.Random(size)
+    lines = []
+    for n in range(size):
+        speaker = SPEAKERS[n % len(SPEAKERS)]
+        content = " ".join(rng.choice(("release", "budget", "risk", "timeline", "scope", "owner"))
+                           for _ in range(rng.randint(6, 30)))
+        if n % 97 == 0:
+            content += " -- Carol should review this"
+        lines.append(f"[{format_clock(9 * 3600 + n * 4)}] {speaker}: {content}\n")
+    return "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,5000,20000", help="逗号分隔的transcript行数")
+    parser.add_argument("--budget", type=int, default=6000, help="prompt的token预算")
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'),
+                encoding='utf-8')
+    template = config['Prompts']['navigate_prompt']
+    builder = ContextBuilder({"navigation": args.budget})
+    terms = parse_terms("Carol, Dave", "Jim")
+
+    print(f"{'行数':>6} {'直接填充 tokens':>15} {'裁剪后 tokens':>13} {'省略行':>7} {'保留提及':>8} {'耗时 ms':>8}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        params = {
+            "transcript": transcript(size),
+            "meeting_topic": "Release planning",
+            "meeting_goals": "Agree on the date",
+            "key_stakeholders": "Carol, Dave",
+            "user_name": "Jim",
+            "language": "En",
+            "notes": "",
+        }
+        started = time.perf_counter()
+        prompt, report = builder.build("navigation", template, params, terms)
+        elapsed = time.perf_counter() - started
+        assert estimate_tokens(prompt) == report.tokens
+        print(f"{size:>6} {report.original_tokens:>15,} {report.tokens:>13,} {report.dropped_lines:>7,} "
+              f"{report.kept_mentions:>8} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""重新连接耗时：字幕窗口消失一段时间后多久重新开始读取
+
+运行: python -m benchmarks.bench_reconnect [--outages N] [--max-outage 秒] [--retry 秒]
+
+回放来源在播放过程中多次"关闭窗口"，经过随机时长后重新出现。
+统计监控循环从发现窗口关闭到重新连接成功的时间，并与原来固定每retry秒重试一次
+时的重连时间（向上取整到retry的整数倍）对比。
+"""
+import argparse
+import contextlib
+import io
+import math
+import random
+import tempfile
+import time
+
+from caption_source import ReplayCaptionSource
+from test import TranscriptManager, monitor_transcript_loop
+
+
+class FlakySource(ReplayCaptionSource):
+    """回放到指定帧时窗口消失，经过outage秒后重新出现"""
+
+    def __init__(self, frames, speed, outages):
+        super().__init__(frames, speed)
+        # {帧序号: 消失的秒数}
+        self.outages = outages
+        self.closed_until = None
+
+    def connect(self) -> bool:
+        if self.closed_until is not None:
+            if time.monotonic() < self.closed_until:
+                return False
+            self.closed_until = None
+        return super().connect()
+
+    def is_alive(self) -> bool:
+        outage = self.outages.pop(self._index, None)
+        if outage is not None:
+            self.closed_until = time.monotonic() + outage
+            return False
+        return super().is_alive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outages", type=int, default=6, help="窗口消失的次数")
+    parser.add_argument("--max-outage", type=float, default=3.0, help="每次消失的最长秒数")
+    parser.add_argument("--retry", type=float, default=5.0, help="最长重试间隔（原来的固定间隔）")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    source = ReplayCaptionSource.synthetic(200, speed=0)
+    step = len(source.frames) // (args.outages + 1)
+    outages = {step * (n + 1): rng.uniform(0.1, args.max_outage) for n in range(args.outages)}
+    legacy = [math.ceil(outage / args.retry) * args.retry for outage in outages.values()]
+
+    source = FlakySource(source.frames, 0, dict(outages))
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        manager = TranscriptManager(transcript_dir=transcript_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor_transcript_loop(manager, source, 0, 0, retry_interval=args.retry)
+
+    print(f"窗口消失 {len(outages)} 次，合计 {sum(outages.values()):.2f} 秒")
+    print(f"固定{args.retry:g}秒重试: 合计 {sum(legacy):.2f} 秒")
+    print(f"指数退避重试: 合计 {sum(manager.reconnect_times.samples):.2f} 秒  "
+          f"{manager.reconnect_times.summary()}")
+
+
+if __name__ == "__main__":
+    main()
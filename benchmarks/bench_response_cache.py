@@ -0,0 +1,68 @@
+"""实时分析发出的请求数：每次都请求 / 输入不变时不请求 / 再加最少新增字符数
+
+运行: python -m benchmarks.bench_response_cache [--minutes M] [--tick S] [--silence P] [--min-new-chars C]
+
+不需要LLM服务：模拟一场有发言也有安静时段（休息、演示、屏幕共享）的会议，
+每tick秒对summary、viewpoints、navigation三个功能做一次实时更新，
+用ResponseCache按 (功能, 模板, 背景字段, transcript版本) 判断是否需要发送请求。
+"""
+import argparse
+import random
+
+from response_cache import ResponseCache
+from transcript_store import TranscriptItem, TranscriptStore, format_clock
+
+FEATURES = {
+    "summary": "Summarize: {transcript}",
+    "viewpoints": "Viewpoints: {transcript}",
+    "navigation": "Navigate: {transcript}",
+}
+FIELDS = {"meeting_topic": "Release planning", "language": "En"}
+
+
+def simulate(args, min_new_chars, use_cache):
+    rng = random.Random(7)
+    store = TranscriptStore()
+    cache = ResponseCache()
+    requests = 0
+    seconds = 9 * 3600
+    silent = False
+    for tick in range(int(args.minutes * 60 / args.tick)):
+        # 每个tick以一定概率切换发言/安静
+        if rng.random() < 0.2:
+            silent = rng.random() < args.silence
+        if not silent:
+            for _ in range(rng.randint(2, 6)):
+                seconds += rng.randint(2, 8)
+                store.add(TranscriptItem("Alice", format_clock(seconds), "x" * rng.randint(20, 120), seconds))
+        version = store.version
+        for feature, template in FEATURES.items():
+            if not use_cache:
+                requests += 1
+                continue
+            key = ResponseCache.make_key(feature, template, FIELDS, version)
+            status, _ = cache.check(key, store.content_chars, min_new_chars)
+            if status == "miss":
+                requests += 1
+                cache.store(key, f"response {version}")
+    return requests, cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60, help="会议时长（分钟）")
+    parser.add_argument("--tick", type=float, default=30, help="实时更新的间隔（秒）")
+    parser.add_argument("--silence", type=float, default=0.4, help="安静时段的比例")
+    parser.add_argument("--min-new-chars", type=int, default=300, help="刷新所需的最少新增字符数")
+    args = parser.parse_args()
+
+    requests, _ = simulate(args, 0, False)
+    print(f"每次都请求          请求 {requests}")
+    requests, cache = simulate(args, 0, True)
+    print(f"输入不变时不请求    {cache.stats()}")
+    requests, cache = simulate(args, args.min_new_chars, True)
+    print(f"最少新增 {args.min_new_chars} 字符  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""实时分析prompt中transcript的长度：每次发送全文 / 滚动总结（块总结 + 最新原文）
+
+运行: python -m benchmarks.bench_rolling_summary [--hours H] [--interval S] [--tick S] [--summary-chars C]
+
+不需要LLM服务：模拟每interval秒一条字幕的会议，总结用固定长度的文本代替。
+每tick秒做一次实时更新（先总结新结束的块，再取prompt用的transcript），
+按会议进行的时间列出每次发送的字符数，以及为生成总结累计发送的字符数。
+"""
+import argparse
+
+from rolling_summary import RollingSummarizer
+from transcript_store import TranscriptItem, TranscriptStore, format_clock
+
+START = 9 * 3600
+
+
+def caption(n, interval):
+    seconds = START + n * interval
+    return TranscriptItem(f"Speaker{n % 5}", format_clock(seconds),
+                          f"caption {n}: we discussed the release plan and the open risks for next week", seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3, help="会议时长（小时）")
+    parser.add_argument("--interval", type=int, default=5, help="每条字幕的间隔（秒）")
+    parser.add_argument("--tick", type=int, default=30, help="实时更新的间隔（秒）")
+    parser.add_argument("--summary-chars", type=int, default=400, help="每个总结的字符数")
+    args = parser.parse_args()
+
+    calls = []
+
+    def summarize(text, level):
+        calls.append(len(text))
+        return f"level {level} summary " + "x" * args.summary_chars
+
+    store = TranscriptStore()
+    summarizer = RollingSummarizer(summarize)
+    report_at = {15, 30, 60, 120, 180, 240, 360, 480}
+    total = int(args.hours * 3600)
+    sent_full = sent_rolling = 0
+    added = 0
+    print(f"{'分钟':>5} {'条目':>6} {'全文字符':>10} {'滚动字符':>9} {'总结':>4} {'累计发送(全文)':>15} "
+          f"{'累计发送(滚动+总结)':>20}")
+    for elapsed in range(args.tick, total + 1, args.tick):
+        while (added + 1) * args.interval <= elapsed:
+            store.add(caption(added, args.interval))
+            added += 1
+        summarizer.advance(store, max_chunks=4)
+        full = len(store.text())
+        rolling = len(summarizer.context(store))
+        sent_full += full
+        sent_rolling += rolling
+        if elapsed % 60 == 0 and elapsed // 60 in report_at:
+            print(f"{elapsed // 60:>5} {added:>6} {full:>10,} {rolling:>9,} {len(summarizer.summaries):>4} "
+                  f"{sent_full:>15,} {sent_rolling + sum(calls):>20,}")
+    print(summarizer.stats())
+
+
+if __name__ == "__main__":
+    main()
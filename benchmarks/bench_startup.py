@@ -0,0 +1,60 @@
+"""启动耗时：窗口显示前必须导入的模块 / 后台延迟导入的模块
+
+运行: python -m benchmarks.bench_startup [--rounds N] [--report]
+
+不需要图形界面：每轮启动一个新的Python进程，用StartupProfiler分别计时
+导入meeting_navigator（窗口显示之前的关键路径）和后台线程导入的采集、LLM模块。
+原来这些模块在meeting_navigator顶部导入，窗口要等全部导入完成才能显示。
+--report 打印最后一轮的完整启动分析报告。
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, sys, time
+from startup_profile import StartupProfiler
+profiler = StartupProfiler()
+profiler.install()
+with profiler.phase("导入meeting_navigator"):
+    import meeting_navigator
+with profiler.phase("导入采集模块"):
+    import test
+    import capture_supervisor
+with profiler.phase("导入LLM模块"):
+    import gpt4o
+phases = {name: elapsed for name, start, elapsed, thread in profiler.phases}
+print(json.dumps({"phases": phases, "report": profiler.report()}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="启动进程的次数")
+    parser.add_argument("--report", action="store_true", help="打印完整的启动分析报告")
+    args = parser.parse_args()
+
+    samples = {}
+    report = ""
+    for _ in range(args.rounds):
+        output = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        for name, elapsed in result["phases"].items():
+            samples.setdefault(name, []).append(elapsed)
+        report = result["report"]
+
+    median = {name: statistics.median(values) * 1000 for name, values in samples.items()}
+    window = median["导入meeting_navigator"]
+    deferred = median["导入采集模块"] + median["导入LLM模块"]
+    for name, value in median.items():
+        print(f"{name:<20} {value:8.1f} ms")
+    print(f"窗口显示前: 原来 {window + deferred:.1f} ms -> 现在 {window:.1f} ms"
+          f"（{deferred:.1f} ms 移到后台线程）")
+    if args.report:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
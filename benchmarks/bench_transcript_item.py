@@ -0,0 +1,98 @@
+"""TranscriptItem 内存/吞吐对比
+
+运行: python -m benchmarks.bench_transcript_item [条目数]
+
+对比旧的dataclass实现（字符串时间戳 + strptime排序）与slots实现
+（解析时计算秒数）在构造、内存占用和按时间排序上的差异。
+"""
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+from transcript_store import MeetingClock, TranscriptItem
+
+SPEAKERS = ["Alice Wang", "Bob Li", "Carol Zhang", "David Chen", "Eve Liu"]
+
+
+@dataclass
+class LegacyTranscriptItem:
+    """原先的字幕条目数据类"""
+    speaker: str
+    timestamp: str
+    content: str
+
+    def to_string(self) -> str:
+        return f"[{self.timestamp}] {self.speaker}: {self.content}"
+
+
+def make_rows(count):
+    """生成合成字幕，从22:00开始，跨越午夜"""
+    rng = random.Random(42)
+    start = 22 * 3600
+    rows = []
+    for i in range(count):
+        seconds = (start + i) % (24 * 3600)
+        timestamp = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        content = " ".join(rng.choice(["we", "should", "ship", "the", "release", "today"])
+                           for _ in range(rng.randint(5, 20)))
+        # 与ListItemControl.Name相同的格式
+        rows.append(f"{rng.choice(SPEAKERS)} {timestamp}\n{content}")
+    return rows
+
+
+def split_name(name):
+    """与解析列表项时相同的拆分，每次都产生新的字符串对象"""
+    header, content = name.split('\n', 1)
+    speaker, timestamp = header.rsplit(' ', 1)
+    return speaker, timestamp, content
+
+
+def measure(label, build, sort_key, rows):
+    # 计时与内存分开测量，避免tracemalloc拖慢计时
+    started = time.perf_counter()
+    items = build(rows)
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sorted(items, key=sort_key)
+    sort_time = time.perf_counter() - started
+
+    del items
+    tracemalloc.start()
+    items = build(rows)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<10} 构造 {build_time * 1000:8.1f} ms  "
+          f"排序 {sort_time * 1000:8.1f} ms  内存 {memory / 1024 / 1024:7.2f} MiB")
+    return items
+
+
+def build_legacy(rows):
+    return [LegacyTranscriptItem(*split_name(name)) for name in rows]
+
+
+def build_slotted(rows):
+    clock = MeetingClock()
+    items = []
+    for name in rows:
+        speaker, timestamp, content = split_name(name)
+        items.append(TranscriptItem(speaker, timestamp, content, clock.resolve(timestamp)))
+    return items
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rows = make_rows(count)
+    print(f"{count} 条字幕")
+    measure("dataclass", build_legacy, lambda x: datetime.strptime(x.timestamp, '%H:%M:%S'), rows)
+    slotted = measure("slots", build_slotted, lambda x: x.seconds, rows)
+    # 跨午夜的条目仍然排在前一天的条目之后
+    assert all(a.seconds < b.seconds for a, b in zip(slotted, slotted[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""转录面板更新开销：原来的全文扫描 / 按mark定位的单行更新
+
+运行: python -m benchmarks.bench_transcript_pane [--lines N] [--updates U]
+
+需要图形界面（Tk）。先在面板中显示N行，再测量U次追加和U次修订的平均耗时。
+原来的方式每次更新都读取全文逐行匹配，修订时重建整个面板，耗时随N增长；
+按mark定位时追加和修订都只涉及一行。
+"""
+import argparse
+import collections
+import re
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+from meeting_navigator import MeetingNavigator
+from transcript_store import TranscriptItem, format_clock
+
+
+def legacy_update(text_widget, transcript_item):
+    """原来MeetingNavigator.update_transcript_display的实现"""
+    current_text = text_widget.get("1.0", tk.END)
+    lines = current_text.splitlines()
+    found = False
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        match = re.match(r'\[([\d:]+)\] ([^:]+):', line)
+        if match:
+            timestamp, speaker = match.groups()
+            if timestamp == transcript_item.timestamp and speaker == transcript_item.speaker:
+                found = True
+                current_content = line.split(':', 1)[1].strip()
+                if transcript_item.content != current_content:
+                    text_widget.delete("1.0", tk.END)
+                    for j, old_line in enumerate(lines):
+                        if j == i:
+                            text_widget.insert(tk.END, f"{transcript_item.to_string()}\n")
+                        elif old_line:
+                            text_widget.insert(tk.END, f"{old_line}\n")
+                break
+    if not found:
+        text_widget.insert(tk.END, f"{transcript_item.to_string()}\n")
+    text_widget.see(tk.END)
+
+
+class MarkedPane:
+    """只带有update_transcript_display需要的属性，不创建整个MeetingNavigator"""
+
+    update_transcript_display = MeetingNavigator.update_transcript_display
+
+    def __init__(self, text_widget):
+        self.transcript_text = text_widget
+        self.transcript_max_lines = 0
+        self.transcript_marks = collections.OrderedDict()
+        self._transcript_mark_seq = 0
+
+
+def item(n: int, content: str = "we should ship the release after review") -> TranscriptItem:
+    return TranscriptItem(["Alice", "Bob", "Carol"][n % 3], format_clock(9 * 3600 + n), content)
+
+
+def measure(update, lines: int, updates: int):
+    for n in range(lines):
+        update(item(n))
+    started = time.perf_counter()
+    for n in range(lines, lines + updates):
+        update(item(n))
+    append = (time.perf_counter() - started) / updates
+    started = time.perf_counter()
+    for n in range(updates):
+        # 修订面板中间的行
+        update(item(lines // 2 + n, f"revised {n}"))
+    revise = (time.perf_counter() - started) / updates
+    return append, revise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="面板中已有的行数")
+    parser.add_argument("--updates", type=int, default=50, help="测量的追加和修订次数")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    legacy_widget = scrolledtext.ScrolledText(root)
+    pane = MarkedPane(scrolledtext.ScrolledText(root))
+
+    legacy = measure(lambda transcript: legacy_update(legacy_widget, transcript), args.lines, args.updates)
+    marked = measure(pane.update_transcript_display, args.lines, args.updates)
+    assert legacy_widget.get("1.0", tk.END) == pane.transcript_text.get("1.0", tk.END), "两种方式显示的内容不同"
+
+    print(f"面板 {args.lines} 行")
+    print(f"全文扫描   追加 {legacy[0] * 1000:8.2f} ms  修订 {legacy[1] * 1000:8.2f} ms")
+    print(f"按mark定位 追加 {marked[0] * 1000:8.2f} ms  修订 {marked[1] * 1000:8.2f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""虚拟化转录视图：每次刷新的开销与会议长度的关系
+
+运行: python -m benchmarks.bench_transcript_view [--sizes 10000,100000,500000] [--visible V]
+
+不需要图形界面：用TranscriptViewport和TranscriptStore做与VirtualTranscriptView.refresh()
+相同的计算（确定渲染范围、按位置读取条目、拼接文本），分别测量跟随最新内容时
+每来一条字幕的刷新耗时、向上滚动的耗时和跳转到指定时间的耗时，以及Text中需要保存的字符数。
+"""
+import argparse
+import time
+
+from transcript_store import TranscriptItem, TranscriptStore, format_clock
+from transcript_view import TranscriptViewport
+
+
+def render(store, viewport):
+    """VirtualTranscriptView.refresh()中与Tk无关的部分，返回渲染的字符数"""
+    viewport.set_total(store.memory_count)
+    if not viewport.needs_render(store.version):
+        return 0
+    start, stop = viewport.render_range()
+    version = store.version
+    lines = "".join(item.to_string() + "\n" for item in store.window(start, stop))
+    viewport.rendered = (start, stop, version)
+    return len(lines)
+
+
+def caption(n, start=9 * 3600):
+    # 超过一天的条目换一个说话者，避免 (时间戳, 说话者) 重复
+    return TranscriptItem(f"Speaker{n // 86400}", format_clock(start + n),
+                          f"caption number {n} about the release", start + n)
+
+
+def measure(size, visible, rounds=200):
+    store = TranscriptStore()
+    for n in range(size):
+        store.add(caption(n))
+    viewport = TranscriptViewport(visible)
+
+    follow = 0.0
+    chars = 0
+    for n in range(size, size + rounds):
+        store.add(caption(n))
+        started = time.perf_counter()
+        chars = max(chars, render(store, viewport))
+        follow += time.perf_counter() - started
+    follow /= rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        viewport.scroll(-3)
+        render(store, viewport)
+    scroll = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for n in range(rounds):
+        viewport.jump(store.position_of(format_clock(9 * 3600 + n * min(size, 86400) // rounds)))
+        render(store, viewport)
+    jump = (time.perf_counter() - started) / rounds
+    return follow, scroll, jump, chars, len(store.text())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,500000", help="逗号分隔的会议条目数")
+    parser.add_argument("--visible", type=int, default=40, help="视口显示的条数")
+    args = parser.parse_args()
+
+    print(f"{'条目数':>8} {'跟随 us':>9} {'滚动 us':>9} {'跳转 us':>9} {'渲染字符':>9} {'全文字符':>11}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        follow, scroll, jump, chars, full = measure(size, args.visible)
+        print(f"{size:>8} {follow * 1e6:>9.1f} {scroll * 1e6:>9.1f} {jump * 1e6:>9.1f} "
+              f"{chars:>9,} {full:>11,}")
+
+
+if __name__ == "__main__":
+    main()
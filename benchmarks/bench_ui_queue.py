@@ -0,0 +1,137 @@
+"""UI消息处理对比：原来每秒全部处理一次 / 立即唤醒、合并修订、按帧预算处理
+
+运行: python -m benchmarks.bench_ui_queue [--seconds S] [--burst N] [--render-ms R]
+
+不需要图形界面：用一个单线程的事件循环模拟Tk主循环（after()可以从其它线程调用）。
+工作线程每0.5秒产生一批N条消息，分布在20条字幕上（大部分是修订），
+每渲染一条消息占用Tk线程R毫秒。统计入队到渲染的延迟、渲染次数，
+以及Tk线程连续被占用的最长时间（越长界面越卡）。
+"""
+import argparse
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from caption_ingest import LatencyStats
+from transcript_store import TranscriptItem, format_clock
+from ui_queue import CoalescingQueue
+
+FRAME_BUDGET = 0.012
+
+
+class SimulatedMainLoop:
+    """单线程执行after()注册的回调，记录每个回调占用的时间"""
+
+    def __init__(self):
+        self._timers = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self.longest_block = 0.0
+        self.stopped = False
+
+    def after(self, ms, callback):
+        with self._cond:
+            heapq.heappush(self._timers, (time.monotonic() + ms / 1000, next(self._order), callback))
+            self._cond.notify()
+
+    def run(self, seconds):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            with self._cond:
+                timeout = self._timers[0][0] - time.monotonic() if self._timers else end - time.monotonic()
+                if timeout > 0:
+                    self._cond.wait(min(timeout, max(0.0, end - time.monotonic())))
+                    continue
+                _, _, callback = heapq.heappop(self._timers)
+            started = time.monotonic()
+            callback()
+            self.longest_block = max(self.longest_block, time.monotonic() - started)
+
+
+def render(render_cost):
+    deadline = time.perf_counter() + render_cost
+    while time.perf_counter() < deadline:
+        pass
+
+
+def produce(put, seconds, burst, stop):
+    """每0.5秒一批消息：20条字幕，每条被修订多次"""
+    started = time.monotonic()
+    base = 9 * 3600
+    while time.monotonic() - started < seconds and not stop.is_set():
+        for n in range(burst):
+            segment = base + n % 20
+            item = TranscriptItem("Alice", format_clock(segment), f"revision {n}", segment)
+            put("transcript_revised" if n >= 20 else "transcript", item)
+        base += 20
+        time.sleep(0.5)
+
+
+def run_legacy(args):
+    loop = SimulatedMainLoop()
+    messages = collections.deque()
+    latency = LatencyStats()
+    renders = 0
+
+    def update_ui():
+        nonlocal renders
+        while messages:
+            _, _, enqueued = messages.popleft()
+            render(args.render_ms / 1000)
+            latency.add(time.monotonic() - enqueued)
+            renders += 1
+        loop.after(1000, update_ui)
+
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, daemon=True, args=(
+        lambda msg_type, item: messages.append((msg_type, item, time.monotonic())),
+        args.seconds, args.burst, stop))
+    loop.after(0, update_ui)
+    producer.start()
+    loop.run(args.seconds + 1.5)
+    stop.set()
+    return latency, renders, loop.longest_block
+
+
+def run_coalescing(args):
+    loop = SimulatedMainLoop()
+    renders = 0
+
+    def handle(msg_type, item):
+        nonlocal renders
+        render(args.render_ms / 1000)
+        renders += 1
+
+    def process():
+        if queue.drain(handle, FRAME_BUDGET):
+            loop.after(0, process)
+
+    queue = CoalescingQueue(lambda: loop.after(0, process))
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, daemon=True, args=(
+        lambda msg_type, item: queue.put(msg_type, item, (item.timestamp, item.speaker)),
+        args.seconds, args.burst, stop))
+    producer.start()
+    loop.run(args.seconds + 1.5)
+    stop.set()
+    return queue.latency, renders, loop.longest_block, queue.coalesced
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5, help="产生消息的秒数")
+    parser.add_argument("--burst", type=int, default=300, help="每批消息数量")
+    parser.add_argument("--render-ms", type=float, default=0.5, help="渲染一条消息的毫秒数")
+    args = parser.parse_args()
+
+    latency, renders, block = run_legacy(args)
+    print(f"每秒处理    渲染 {renders:5d} 次  最长占用 {block * 1000:6.1f} ms  {latency.summary()}")
+    latency, renders, block, coalesced = run_coalescing(args)
+    print(f"唤醒+预算  渲染 {renders:5d} 次  最长占用 {block * 1000:6.1f} ms  {latency.summary()}  "
+          f"合并 {coalesced} 条")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""本地LLM接口桩：模拟OPENAI_MM_URL的chat completions接口和OPENAI_TOKEN_URL的换token接口
+
+运行: python -m benchmarks.llm_stub [--port P] [--tokens N] [--token-ms T] [--first-ms F]
+                                    [--handshake-ms H] [--auth-ms A]
+
+请求体中stream为true时以SSE逐个返回token，否则生成全部token后一次返回JSON。
+生成第一个token前等待F毫秒（模拟排队和处理提示词），之后每个token等待T毫秒。
+每个新连接等待H毫秒（模拟TCP和TLS握手），/token 等待A毫秒后返回一个JWT。
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_jwt(ttl):
+    """只有exp有意义的JWT，签名部分是占位"""
+    def encode(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).rstrip(b"=").decode("ascii")
+    return f"{encode({'alg': 'none'})}.{encode({'exp': time.time() + ttl})}.stub"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分开写，不关闭Nagle时复用的连接上每个响应会多等一个延迟ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_delay)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        if self.path.endswith("/token"):
+            with server.lock:
+                server.token_requests += 1
+            time.sleep(server.auth_delay)
+            self._send_json({"issued_token": make_jwt(server.token_ttl)})
+            return
+        words = [f"word{n} " for n in range(server.tokens)]
+        time.sleep(server.first_delay)
+        if request.get("stream"):
+            self._stream(words)
+        else:
+            time.sleep(server.token_delay * len(words))
+            self._send_json({"choices": [{"message": {"role": "assistant", "content": "".join(words)}}]})
+
+    def _stream(self, words):
+        delay = self.server.token_delay
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # 与Azure OpenAI一样，第一个事件没有choices
+        self._send_event(json.dumps({"choices": [], "prompt_filter_results": []}))
+        for n, word in enumerate(words):
+            if n:
+                time.sleep(delay)
+            self._send_event(json.dumps({"choices": [{"index": 0, "delta": {"content": word}}]}))
+        self._send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _send_event(self, data):
+        body = f"data: {data}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port=0, tokens=200, token_delay=0.01, first_delay=0.3,
+               handshake_delay=0.0, auth_delay=0.0, token_ttl=3600):
+    """在后台线程启动接口桩，返回 (server, 接口URL)；换token的接口是 server.token_url
+
+    server.connections 和 server.token_requests 统计新连接数和换token次数。
+    用server.shutdown()停止。
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.tokens = tokens
+    server.token_delay = token_delay
+    server.first_delay = first_delay
+    server.handshake_delay = handshake_delay
+    server.auth_delay = auth_delay
+    server.token_ttl = token_ttl
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.token_requests = 0
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    server.token_url = f"{base}/token"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{base}/chat/completions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--tokens", type=int, default=200, help="每个回复的token数")
+    parser.add_argument("--token-ms", type=float, default=10, help="每个token的毫秒数")
+    parser.add_argument("--first-ms", type=float, default=300, help="第一个token之前的毫秒数")
+    parser.add_argument("--handshake-ms", type=float, default=0, help="每个新连接的毫秒数")
+    parser.add_argument("--auth-ms", type=float, default=0, help="换token的毫秒数")
+    args = parser.parse_args()
+
+    server, url = start_stub(args.port, args.tokens, args.token_ms / 1000, args.first_ms / 1000,
+                             args.handshake_ms / 1000, args.auth_ms / 1000)
+    print(f"接口桩已启动: {url}  换token: {server.token_url}")
+    print("设置 OPENAI_MM_URL，以及 OPENAI_TOKEN 或 OPENAI_TOKEN_URL 后运行程序")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import time
+from typing import Callable, Iterator, List, Optional
+
+
+def first_header(names: List[str]) -> Optional[str]:
+    """列表中第一个可见项的第一行（说话者和时间戳），用来判断列表是否滚动过"""
+    if not names:
+        return None
+    return names[0].split('\n', 1)[0]
+
+
+class BackfillScanner:
+    """按控件的实际响应速度滚动字幕列表，回填已有内容
+
+    每次按键后以poll_interval读取列表，直到第一个可见项变化并且两次读取结果相同
+    （控件已经渲染完成）才继续；settle_timeout内没有变化说明已经到达顶部或底部。
+    到达顶部和底部都需要连续confirmations次没有变化，每次确认的等待时间加倍，
+    避免把一次较慢的渲染误认为到底。只有当前说话的最后一条字幕在增长时，
+    第一个可见项不变，因此直播中的会议也能结束扫描。
+    """
+
+    def __init__(self, read_names: Callable[[], List[str]], scroll_top: Callable[[], None],
+                 page_down: Callable[[], None], poll_interval: float = 0.02,
+                 settle_timeout: float = 0.3, confirmations: int = 2, max_pages: int = 100000):
+        self.read_names = read_names
+        self.scroll_top = scroll_top
+        self.page_down = page_down
+        self.poll_interval = poll_interval
+        self.settle_timeout = settle_timeout
+        self.confirmations = confirmations
+        self.max_pages = max_pages
+        self.pages = 0
+        self.keys = 0
+        self.elapsed = 0.0
+
+    def scan(self) -> Iterator[List[str]]:
+        """产出当前可见项，然后回到顶部逐页向下，产出每一页的列表项名字"""
+        started = time.monotonic()
+        self.pages = 0
+        self.keys = 0
+        try:
+            # 先产出当前可见的最新内容，再回到顶部
+            yield self.read_names()
+            names = self._to_top()
+            yield names
+            self.pages = 1
+
+            misses = 0
+            while misses < self.confirmations and self.pages < self.max_pages:
+                self.page_down()
+                self.keys += 1
+                moved = self._wait_for_scroll(names, self.settle_timeout * (2 ** misses))
+                if moved is None:
+                    misses += 1
+                    continue
+                misses = 0
+                names = moved
+                self.pages += 1
+                yield names
+        finally:
+            self.elapsed = time.monotonic() - started
+
+    def _to_top(self) -> List[str]:
+        """按Home直到第一个可见项不再变化"""
+        names = self.read_names()
+        misses = 0
+        while misses < self.confirmations and self.keys < self.max_pages:
+            self.scroll_top()
+            self.keys += 1
+            moved = self._wait_for_scroll(names, self.settle_timeout * (2 ** misses))
+            if moved is None:
+                misses += 1
+            else:
+                names = moved
+        return names
+
+    def _wait_for_scroll(self, names: List[str], timeout: float) -> Optional[List[str]]:
+        """等待列表滚动并渲染完成，返回新的名字；超时没有滚动返回None"""
+        header = first_header(names)
+        deadline = time.monotonic() + timeout
+        previous = None
+        while True:
+            current = self.read_names()
+            if first_header(current) != header:
+                # 连续两次读取相同才认为渲染完成，一直在变化时到时间也接受
+                if current == previous or time.monotonic() >= deadline:
+                    return current
+                previous = current
+            elif time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
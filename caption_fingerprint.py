@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class FingerprintCache:
+    """记住上一次读取时每个可见列表项的指纹，跳过没有变化的项
+
+    列表项的身份是名字的第一行（说话者和时间戳），指纹是整个名字的哈希。
+    身份和指纹都没变的项不需要再拆分、匹配时间戳和比较存储。
+
+    Zoom只修订最近的几条字幕，所以只有最后tail项每次都计算指纹；
+    更早的项身份、位置（按第一项对齐，列表滚动后也能对上）和名字长度都没变时
+    直接跳过，不再计算哈希。缓存只保留最近一次读取中可见的项。
+    """
+
+    def __init__(self, tail: int = 3):
+        self.tail = tail
+        # 上一次读取各位置的 (身份, 名字长度, 指纹, 解析该项之后的当前说话者)
+        self._rows: List[Tuple[str, int, int, str]] = []
+        self._seen: List[Tuple[str, int, int, str]] = []
+        # 本次读取的第0项对应上一次读取的位置，对不上时为None
+        self._offset: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def start_poll(self, names: List[str]) -> Tuple[int, Optional[str]]:
+        """开始一次新的读取
+
+        返回 (开头可以直接跳过的项数, 跳过的最后一项之后的当前说话者)。
+        """
+        rows = self._rows
+        self._offset = None
+        self._seen = []
+        if not rows or not names:
+            return 0, None
+        first = names[0]
+        identity = first[:first.find('\n')]
+        # 列表通常只滚动了几项，从头向后找第一项的位置
+        for offset, row in enumerate(rows):
+            if row[0] == identity:
+                break
+        else:
+            return 0, None
+        self._offset = offset
+        limit = min(len(names) - self.tail, len(rows) - offset)
+        count = 0
+        while count < limit:
+            row = rows[offset + count]
+            name = names[count]
+            if len(name) != row[1] or not name.startswith(row[0]):
+                break
+            count += 1
+        if not count:
+            return 0, None
+        self._seen = rows[offset:offset + count]
+        self.hits += count
+        return count, self._seen[-1][3]
+
+    def lookup(self, index: int, name: str) -> Optional[str]:
+        """第index项的名字没有变化时返回解析该项之后的当前说话者，否则返回None"""
+        if self._offset is not None and 0 <= self._offset + index < len(self._rows):
+            row = self._rows[self._offset + index]
+            fingerprint = hash(name)
+            if row[2] == fingerprint and name.startswith(row[0]):
+                self._seen.append(row)
+                self.hits += 1
+                return row[3]
+        self.misses += 1
+        return None
+
+    def store(self, name: str, current_speaker: str):
+        """记录新解析的项，以及解析之后的当前说话者"""
+        self._seen.append((name[:name.find('\n')], len(name), hash(name), current_speaker))
+
+    def end_poll(self):
+        """结束读取，丢弃已不可见的项"""
+        self._rows = self._seen
+        self._seen = []
+
+    def reset(self):
+        """忘记所有指纹，下一次读取时重新解析全部可见项"""
+        self._rows = []
+        self._seen = []
+        self._offset = None
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,109 @@
+import collections
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AdaptivePoller:
+    """按字幕活跃程度调整轮询间隔
+
+    有新内容时立即回到最短间隔；会议安静时每次按backoff倍数放宽，直到最长间隔。
+    """
+
+    def __init__(self, min_interval: float = 0.25, max_interval: float = 2.0, backoff: float = 1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def record(self, changed: bool):
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+
+class ReconnectBackoff:
+    """连接失败后的重试间隔：指数增长、带随机抖动、有上限
+
+    每次失败间隔乘以factor，直到max_interval；实际等待在
+    [间隔*(1-jitter), 间隔] 之间随机取值，连接成功后回到最短间隔。
+    """
+
+    def __init__(self, min_interval: float = 0.25, max_interval: float = 5.0,
+                 factor: float = 2.0, jitter: float = 0.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+        self.interval = min_interval
+
+    def next_delay(self) -> float:
+        """返回这一次应等待的秒数，并放宽下一次的间隔"""
+        delay = random.uniform(self.interval * (1 - self.jitter), self.interval)
+        self.interval = min(self.max_interval, self.interval * self.factor)
+        return delay
+
+    def reset(self):
+        self.interval = self.min_interval
+
+
+class LatencyStats:
+    """记录字幕从出现到写入存储的延迟，保留最近max_samples个样本"""
+
+    def __init__(self, max_samples: int = 10000):
+        self.samples = collections.deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentiles(self, *points: float) -> Dict[float, Optional[float]]:
+        """返回各百分位的延迟（秒），没有样本时为None"""
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return {point: None for point in points}
+        return {point: ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))]
+                for point in points}
+
+    def summary(self) -> str:
+        values = self.percentiles(50, 90, 99)
+        if values[50] is None:
+            return "无延迟样本"
+        return (f"p50 {values[50] * 1000:.0f} ms  p90 {values[90] * 1000:.0f} ms  "
+                f"p99 {values[99] * 1000:.0f} ms  ({len(self.samples)} 个样本)")
+
+
+class CaptionIngestor:
+    """决定何时再次读取字幕列表
+
+    来源支持变化通知时由通知唤醒（仍以最长轮询间隔兜底，防止漏掉通知），
+    否则退回自适应轮询。
+    """
+
+    def __init__(self, source, poller: AdaptivePoller = None, latency: LatencyStats = None):
+        self.source = source
+        self.poller = poller or AdaptivePoller()
+        self.latency = latency
+        self._changed = threading.Event()
+        self.event_driven = source.subscribe(self._changed.set)
+
+    def wait(self):
+        """等待下一次读取的时机"""
+        if self.event_driven:
+            self._changed.wait(self.poller.max_interval)
+            # 先清除再读取，读取期间到达的通知会让下一次等待立即返回
+            self._changed.clear()
+        elif self.poller.interval:
+            time.sleep(self.poller.interval)
+
+    def record(self, changed: bool):
+        """记录一次读取的结果，更新轮询间隔和延迟统计"""
+        self.poller.record(changed)
+        if changed and self.latency is not None:
+            change_time = self.source.change_time()
+            if change_time is not None:
+                self.latency.add(time.monotonic() - change_time)
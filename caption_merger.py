@@ -0,0 +1,82 @@
+import difflib
+import math
+from typing import List, Tuple
+
+
+class CaptionMerger:
+    """识别Zoom对同一条字幕的滚动修订
+
+    Zoom会原位修改字幕：补充文字、替换词语、缩短内容或把一段拆成两段。
+    同一 (timestamp, speaker) 的新内容与旧内容有足够长的公共前缀，
+    或者编辑相似度足够高时，视为修订并直接替换，即使新内容更短。
+    """
+
+    def __init__(self, prefix_ratio: float = 0.5, similarity: float = 0.6):
+        self.prefix_ratio = prefix_ratio
+        self.similarity = similarity
+        self.revisions = 0
+        self.rejected = 0
+
+    def is_revision(self, old: str, new: str) -> bool:
+        """判断new是否是old的修订"""
+        shorter = min(len(old), len(new))
+        if shorter == 0:
+            return True
+        # 最常见的情况：在原文后追加或截断，比较一次前缀切片即可
+        prefix = math.ceil(shorter * self.prefix_ratio)
+        if old[:prefix] == new[:prefix]:
+            return True
+        # 按词比较编辑相似度，Zoom的修订以词为单位
+        old_words, new_words = old.split(), new.split()
+        # 替换个别词时位置相同的词已经足够：它们是公共子序列，2*相同词数/总词数是ratio的下界
+        total = len(old_words) + len(new_words)
+        same = sum(a == b for a, b in zip(old_words, new_words))
+        if total and 2 * same / total >= self.similarity:
+            return True
+        matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+        # real_quick_ratio/quick_ratio是ratio的上界，先用它们快速排除
+        return (matcher.real_quick_ratio() >= self.similarity
+                and matcher.quick_ratio() >= self.similarity
+                and matcher.ratio() >= self.similarity)
+
+    def should_replace(self, existing, incoming) -> bool:
+        """判断incoming是否应该替换已存储的existing"""
+        if existing is None:
+            return True
+        if incoming.content == existing.content:
+            return False
+        if self.is_revision(existing.content, incoming.content):
+            self.revisions += 1
+            return True
+        # 不像修订时保持原有策略：保留更长的内容
+        if len(incoming.content) > len(existing.content):
+            return True
+        self.rejected += 1
+        return False
+
+    def merge_batch(self, store, new_items) -> List[Tuple[object, bool]]:
+        """把一批条目合并进store
+
+        先在批内算出每个 (timestamp, speaker) 的最终状态，再对每条发生变化的字幕
+        调用一次store.add()，返回 [(item, is_new)]。
+        """
+        # {(timestamp, speaker): (store中原有的条目, 批内当前的状态)}
+        pending = {}
+        for item in new_items:
+            key = (item.timestamp, item.speaker)
+            if key in pending:
+                stored, current = pending[key]
+            elif store.is_spilled(item):
+                # 长会议模式下已经写入磁盘的字幕不再修订
+                continue
+            else:
+                stored = current = store.get(item.timestamp, item.speaker)
+            if self.should_replace(current, item):
+                pending[key] = (stored, item)
+        changes = []
+        for stored, item in pending.values():
+            # 批内改来改去又回到了原来的内容
+            if stored is not None and stored.content == item.content:
+                continue
+            changes.append((item, store.add(item)))
+        return changes
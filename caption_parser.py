@@ -0,0 +1,75 @@
+import re
+from typing import List, Optional
+
+from caption_fingerprint import FingerprintCache
+from transcript_store import MeetingClock, TranscriptItem
+
+# 列表项名字: "Speaker HH:MM:SS\n内容"，内容可能折成多行；
+# 同一说话者连续发言时第一行只有时间戳
+CAPTION_NAME_PATTERN = re.compile(r'([^\n]*?)(\d{2}:\d{2}:\d{2})[^\n]*\n(.*)', re.S)
+# 说话者名字中没有数字时的快速匹配，不需要逐字符尝试时间戳
+SIMPLE_CAPTION_NAME_PATTERN = re.compile(r'([^\d\n]*)(\d{2}:\d{2}:\d{2})[^\n]*\n(.*)', re.S)
+
+
+class CaptionParser:
+    """把字幕列表项的名字批量解析为TranscriptItem
+
+    正则预先编译，一次匹配同时取出说话者、时间戳和内容。折行的内容用空格连接成一行，
+    不再只保留第一行。没有说话者的条目沿用上一条的说话者，
+    current_speaker跨批次保留。
+    """
+
+    def __init__(self, clock: MeetingClock = None):
+        self.clock = clock or MeetingClock()
+        self.current_speaker = ""
+
+    def parse(self, name: str) -> Optional[TranscriptItem]:
+        """解析单个名字，格式不符时返回None"""
+        if not name:
+            return None
+        match = SIMPLE_CAPTION_NAME_PATTERN.match(name) or CAPTION_NAME_PATTERN.match(name)
+        if not match:
+            return None
+        speaker_part, timestamp, content = match.groups()
+
+        speaker_part = speaker_part.strip()
+        if speaker_part:
+            self.current_speaker = speaker_part
+
+        if '\n' in content:
+            content = ' '.join(line.strip() for line in content.split('\n') if line.strip())
+        else:
+            content = content.strip()
+
+        return TranscriptItem(self.current_speaker, timestamp, content,
+                              self.clock.resolve(timestamp))
+
+    def parse_batch(self, names: List[str], fingerprints: FingerprintCache = None) -> List[TranscriptItem]:
+        """按顺序解析一批名字，返回解析成功的条目
+
+        传入fingerprints时跳过与上一批相同的名字，只恢复当时的说话者。
+        """
+        items = []
+        parse = self.parse
+        if fingerprints is None:
+            for name in names:
+                item = parse(name)
+                if item:
+                    items.append(item)
+            return items
+
+        skipped, speaker = fingerprints.start_poll(names)
+        if skipped:
+            self.current_speaker = speaker
+        for index in range(skipped, len(names)):
+            name = names[index]
+            speaker = fingerprints.lookup(index, name)
+            if speaker is not None:
+                self.current_speaker = speaker
+                continue
+            item = parse(name)
+            fingerprints.store(name, self.current_speaker)
+            if item:
+                items.append(item)
+        fingerprints.end_poll()
+        return items
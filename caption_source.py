@@ -0,0 +1,232 @@
+import contextlib
+import json
+import random
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from transcript_store import TranscriptItem, format_clock, parse_clock
+
+
+class CaptionSource:
+    """字幕来源接口
+
+    TranscriptManager只通过这个接口读取字幕列表：每个列表项是一个
+    "Speaker HH:MM:SS\\n内容" 格式的名字字符串，与Zoom ListItemControl.Name相同。
+    """
+
+    # 来源已经结束（例如回放完毕），监控循环不再重连
+    finished = False
+
+    def initialize_thread(self):
+        """在当前线程中做来源需要的初始化"""
+
+    def thread_context(self):
+        """在工作线程中使用来源时需要进入的上下文"""
+        # 不做任何事的上下文（contextlib.nullcontext需要Python 3.7）
+        return contextlib.suppress()
+
+    def connect(self) -> bool:
+        """查找并连接字幕列表，成功返回True"""
+        raise NotImplementedError
+
+    def is_alive(self) -> bool:
+        """已连接的字幕列表是否仍然存在"""
+        raise NotImplementedError
+
+    def read_names(self) -> List[str]:
+        """读取当前可见的所有列表项名字"""
+        raise NotImplementedError
+
+    def backfill(self) -> Iterator[List[str]]:
+        """首次连接时回填已有内容，每次产出一页列表项名字"""
+        return iter(())
+
+    def subscribe(self, callback) -> bool:
+        """注册列表变化通知，来源支持通知时返回True，否则调用方退回轮询"""
+        return False
+
+    def change_time(self) -> Optional[float]:
+        """最近一次read_names()读到的最早一个新变化发生的time.monotonic()时间，未知时为None"""
+        return None
+
+    def close(self):
+        """释放来源占用的资源"""
+
+
+class ReplayCaptionSource(CaptionSource):
+    """回放录制或合成的字幕列表快照，不依赖Windows
+
+    frames是 (相对秒数, [列表项名字]) 的序列。speed=1为实时回放，
+    speed=N为N倍速，speed=0时每次read_names()前进一帧，用于尽可能快地压测。
+    """
+
+    def __init__(self, frames: Sequence[Tuple[float, List[str]]], speed: float = 1.0):
+        self.frames = list(frames)
+        self.speed = speed
+        self._index = -1
+        self._started = None
+        self._change_time = None
+        # 当前通知线程的停止信号，重新订阅或关闭时设置
+        self._notify_stop = None
+
+    @property
+    def finished(self) -> bool:
+        return self._index >= len(self.frames) - 1
+
+    def connect(self) -> bool:
+        if self._started is None:
+            self._started = time.monotonic()
+        return bool(self.frames) and not self.finished
+
+    def is_alive(self) -> bool:
+        return not self.finished
+
+    def read_names(self) -> List[str]:
+        if not self.frames:
+            return []
+        previous = self._index
+        if self.speed <= 0:
+            self._index = min(self._index + 1, len(self.frames) - 1)
+        else:
+            elapsed = (time.monotonic() - self._started) * self.speed
+            while self._index + 1 < len(self.frames) and self.frames[self._index + 1][0] <= elapsed:
+                self._index += 1
+        # 不限速回放时没有时间概念，不记录变化时间
+        if self._index != previous and self.speed > 0:
+            self._change_time = self._due_time(previous + 1)
+        return self.frames[self._index][1] if self._index >= 0 else []
+
+    def subscribe(self, callback) -> bool:
+        """按帧的时间发送变化通知；不限速回放时没有时间概念，返回False
+
+        重新连接后再次订阅时先停止上一次的通知线程。
+        """
+        self._stop_notify()
+        if self.speed <= 0 or self._started is None:
+            return False
+        stop = self._notify_stop = threading.Event()
+
+        def notify():
+            for index in range(self._index + 1, len(self.frames)):
+                delay = self._due_time(index) - time.monotonic()
+                if delay > 0 and stop.wait(delay):
+                    return
+                if stop.is_set():
+                    return
+                callback()
+
+        threading.Thread(target=notify, daemon=True).start()
+        return True
+
+    def close(self):
+        self._stop_notify()
+
+    def _stop_notify(self):
+        if self._notify_stop is not None:
+            self._notify_stop.set()
+            self._notify_stop = None
+
+    def change_time(self) -> Optional[float]:
+        return self._change_time
+
+    def _due_time(self, index: int) -> float:
+        return self._started + self.frames[index][0] / self.speed
+
+    @classmethod
+    def from_file(cls, path, speed: float = 1.0) -> "ReplayCaptionSource":
+        """读取录制文件：每行 {"t": 相对秒数, "names": [...]}"""
+        frames = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    frames.append((record["t"], record["names"]))
+        return cls(frames, speed)
+
+    @classmethod
+    def from_transcript(cls, items, speed: float = 1.0, visible: int = 8,
+                        steps: int = 4) -> "ReplayCaptionSource":
+        """把已有转录条目还原成逐步增长的列表快照（每条分steps次显示完整）"""
+        frames = []
+        shown = []
+        start = None
+        for item in items:
+            if start is None:
+                start = item.seconds
+            words = item.content.split(' ')
+            shown.append(None)
+            for step in range(1, steps + 1):
+                partial = ' '.join(words[:max(1, len(words) * step // steps)])
+                shown[-1] = f"{item.speaker} {item.timestamp}\n{partial}"
+                offset = item.seconds - start + step / (steps + 1)
+                frames.append((offset, shown[-visible:]))
+        return cls(frames, speed)
+
+    @classmethod
+    def synthetic(cls, segments: int = 1000, speed: float = 1.0, seed: int = 1,
+                  start: str = "09:00:00", visible: int = 8) -> "ReplayCaptionSource":
+        """生成合成会议：随机说话者、逐词增长的字幕"""
+        rng = random.Random(seed)
+        words = ["we", "should", "ship", "the", "release", "after", "review", "budget",
+                 "timeline", "risk", "owner", "next", "sprint", "deploy", "customer"]
+        speakers = ["Alice", "Bob", "Carol", "David"]
+        seconds = parse_clock(start)
+        items = []
+        for _ in range(segments):
+            content = ' '.join(rng.choice(words) for _ in range(rng.randint(4, 24)))
+            items.append(TranscriptItem(rng.choice(speakers), format_clock(seconds), content, seconds))
+            seconds += rng.randint(2, 8)
+        return cls.from_transcript(items, speed=speed, visible=visible)
+
+
+class RecordingCaptionSource(CaptionSource):
+    """包装另一个来源，把读到的每次快照写入文件，供ReplayCaptionSource回放"""
+
+    def __init__(self, source: CaptionSource, path):
+        self.source = source
+        self._file = open(path, 'a', encoding='utf-8')
+        self._started = time.monotonic()
+        self._last_names = None
+
+    @property
+    def finished(self) -> bool:
+        return self.source.finished
+
+    def initialize_thread(self):
+        self.source.initialize_thread()
+
+    def thread_context(self):
+        return self.source.thread_context()
+
+    def connect(self) -> bool:
+        return self.source.connect()
+
+    def is_alive(self) -> bool:
+        return self.source.is_alive()
+
+    def read_names(self) -> List[str]:
+        return self._record(self.source.read_names())
+
+    def backfill(self) -> Iterator[List[str]]:
+        for names in self.source.backfill():
+            yield self._record(names)
+
+    def subscribe(self, callback) -> bool:
+        return self.source.subscribe(callback)
+
+    def change_time(self) -> Optional[float]:
+        return self.source.change_time()
+
+    def close(self):
+        self.source.close()
+        self._file.close()
+
+    def _record(self, names: List[str]) -> List[str]:
+        # 内容没有变化的快照不重复记录
+        if names != self._last_names:
+            record = {"t": round(time.monotonic() - self._started, 3), "names": names}
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._last_names = names
+        return names
@@ -0,0 +1,158 @@
+import collections
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from caption_ingest import ReconnectBackoff
+from caption_source import CaptionSource
+from test import TranscriptManager, monitor_transcript_loop
+
+
+class CaptureStream:
+    """一个字幕来源的采集状态"""
+
+    # 吞吐量按最近RATE_WINDOW秒内的条目增长计算
+    RATE_WINDOW = 60.0
+
+    def __init__(self, key: str, manager: TranscriptManager):
+        self.key = key
+        self.manager = manager
+        # waiting: 等待空闲的工作线程; running; finished: 来源结束; failed: 采集线程出错
+        self.state = "waiting"
+        self.error = None
+        self.started = None
+        self.future = None
+        # 出错后重新采集的间隔，连续出错时指数增长
+        self.backoff = ReconnectBackoff(1.0, 60.0)
+        self.retry_at = 0.0
+        # (time.monotonic()时间, 条目数) 的样本，用于计算吞吐量
+        self._samples = collections.deque([(time.monotonic(), 0)])
+
+    def status(self) -> Dict:
+        """当前的条目数、吞吐量（条/分钟）和延迟"""
+        now = time.monotonic()
+        count = len(self.manager.transcripts)
+        self._samples.append((now, count))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.RATE_WINDOW:
+            self._samples.popleft()
+        oldest_time, oldest_count = self._samples[0]
+        rate = (count - oldest_count) * 60 / (now - oldest_time) if now > oldest_time else 0.0
+        latency = self.manager.latency.percentiles(50)[50]
+        last_read = self.manager.last_read
+        last_change = self.manager.last_change
+        return {
+            "key": self.key,
+            "state": self.state,
+            "segments": count,
+            "per_minute": rate,
+            "latency": latency,
+            "since_read": now - last_read if last_read is not None else None,
+            "since_change": now - last_change if last_change is not None else None,
+            "error": self.error,
+        }
+
+
+class CaptureSupervisor:
+    """同时采集多个字幕窗口
+
+    定期调用discover()发现字幕来源，每个来源使用独立的TranscriptManager
+    （各自的日志和.txt文件），在最多max_workers个工作线程中运行监控循环。
+    一个来源出错只影响它自己，之后仍被发现的来源按指数退避重新开始采集。
+    已经结束的来源不会重新采集。
+    """
+
+    def __init__(self, discover: Callable[[], Dict[str, Callable[[], CaptionSource]]],
+                 manager_factory: Callable[[str], TranscriptManager], max_workers: int = 2,
+                 discover_interval: float = 5.0, **loop_options):
+        self.discover = discover
+        self.manager_factory = manager_factory
+        self.max_workers = max_workers
+        self.discover_interval = discover_interval
+        self.loop_options = loop_options
+        self.streams: Dict[str, CaptureStream] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="capture")
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        """发现循环，直到stop()"""
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.discover_interval)
+
+    def poll(self):
+        """发现一次来源，为新的来源启动采集"""
+        if self._stop.is_set():
+            return
+        try:
+            discovered = self.discover()
+        except Exception as e:
+            print(f"发现字幕来源时出错: {e}")
+            return
+        for key, create_source in discovered.items():
+            with self._lock:
+                stream = self.streams.get(key)
+                if stream is not None and stream.state in ("waiting", "running", "finished"):
+                    continue
+                if stream is not None and time.monotonic() < stream.retry_at:
+                    continue
+                if stream is None:
+                    stream = CaptureStream(key, self.manager_factory(key))
+                    self.streams[key] = stream
+                stream.state = "waiting"
+                stream.error = None
+                stream.future = self._executor.submit(self._capture, stream, create_source)
+            print(f"开始采集字幕来源: {key}")
+
+    def _capture(self, stream: CaptureStream, create_source: Callable[[], CaptionSource]):
+        """在工作线程中运行一个来源的监控循环"""
+        if self._stop.is_set():
+            return
+        stream.state = "running"
+        stream.started = time.monotonic()
+        try:
+            source = create_source()
+            with source.thread_context():
+                monitor_transcript_loop(stream.manager, source, stop=self._stop, **self.loop_options)
+            stream.manager.finalize()
+            stream.state = "finished"
+        except Exception as e:
+            print(f"字幕来源 {stream.key} 采集出错: {e}")
+            traceback.print_exc()
+            stream.error = str(e)
+            stream.retry_at = time.monotonic() + stream.backoff.next_delay()
+            stream.state = "failed"
+            try:
+                stream.manager.finalize()
+            except Exception as finalize_error:
+                print(f"保存字幕来源 {stream.key} 时出错: {finalize_error}")
+
+    def stop(self, wait: bool = True):
+        """停止所有采集，保存每个来源的会议"""
+        self._stop.set()
+        # 还没开始的采集直接取消（shutdown的cancel_futures参数需要Python 3.9）
+        with self._lock:
+            futures = [stream.future for stream in self.streams.values() if stream.future]
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=wait)
+
+    def status(self) -> List[Dict]:
+        with self._lock:
+            streams = list(self.streams.values())
+        return [stream.status() for stream in streams]
+
+    def format_status(self, statuses: Optional[List[Dict]] = None) -> str:
+        """每个来源一行的状态表"""
+        lines = []
+        for status in statuses if statuses is not None else self.status():
+            latency = f"{status['latency'] * 1000:.0f}ms" if status['latency'] is not None else "-"
+            since_read = f"{status['since_read']:.1f}s" if status['since_read'] is not None else "-"
+            line = (f"{status['key']}: {status['state']} {status['segments']}条 "
+                    f"{status['per_minute']:.0f}条/分 延迟{latency} 读取{since_read}前")
+            if status['error']:
+                line += f" 错误: {status['error']}"
+            lines.append(line)
+        return "\n".join(lines) if lines else "没有发现字幕来源"
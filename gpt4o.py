@@ -4,6 +4,8 @@ import requests
 import json
 import base64
 import configparser
+import threading
+import time
 
 _config = configparser.ConfigParser()
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
@@ -20,6 +22,117 @@ OPENAI_PASSWORD = os.getenv('OPENAI_PASSWORD',_config['GenAI'].get('OPENAI_PASSW
 OPENAI_APPLICATION_ID = os.getenv('OPENAI_APPLICATION_ID',_config['GenAI'].get('OPENAI_APPLICATION_ID'))
 OPENAI_APPLICATION_NAME = os.getenv('OPENAI_APPLICATION_NAME',_config['GenAI'].get('OPENAI_APPLICATION_NAME'))
 HEAD_TOKEN_KEY = os.getenv('HEAD_TOKEN_KEY',_config['GenAI'].get('HEAD_TOKEN_KEY'))
+# 是否使用流式响应（SSE），服务端不支持时设为0
+OPENAI_STREAM = os.getenv('OPENAI_STREAM',_config['GenAI'].get('OPENAI_STREAM', '1'))
+
+
+class GenAIClient:
+    """复用连接和token的LLM客户端
+
+    所有请求共用一个keep-alive的requests.Session，只在第一次连接时做TCP和TLS握手。
+    通过用户名密码换来的JWT缓存到过期前refresh_margin秒，并在那时由后台线程提前换新，
+    调用方不用等待换token。JWT中没有exp时按default_ttl秒过期。
+    有效期较短的token至少用到一半有效期才换新；有效期不超过refresh_margin时不提前换，
+    过期后由下一次调用换新，避免不停地请求换token的接口。
+    """
+
+    def __init__(self, refresh_margin=120.0, default_ttl=1800.0, pool_size=8):
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._token = None
+        self._expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self._refresh_timer = None
+        self.token_fetches = 0
+
+    def auth_header(self):
+        """请求头中的token：优先使用配置的OPENAI_TOKEN，否则使用缓存的JWT"""
+        if OPENAI_TOKEN and OPENAI_TOKEN.strip():  # 优先从环境变量中取token
+            return "Bearer " + OPENAI_TOKEN
+        token = self._token
+        if token and time.time() < self._expires_at:
+            return token
+        # 多个线程同时发现token过期时只换一次
+        with self._token_lock:
+            if self._token and time.time() < self._expires_at:
+                return self._token
+            return self._refresh_token()
+
+    def _refresh_token(self):
+        token = get_token(self.session)
+        self.token_fetches += 1
+        expires_at = jwt_expiry(token) or time.time() + self.default_ttl
+        self._token = token
+        self._expires_at = expires_at
+        self._schedule_refresh(expires_at - time.time())
+        return token
+
+    def _schedule_refresh(self, ttl):
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        if ttl <= self.refresh_margin:
+            return
+        delay = max(ttl - self.refresh_margin, ttl / 2)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._token_lock:
+                self._refresh_token()
+        except Exception as e:
+            # 旧token过期后，下一次调用会重新换token
+            print(f"后台刷新token失败: {e}")
+
+    def warm_up(self):
+        """提前换好token并建立到LLM服务的连接，第一次调用时不用再等"""
+        try:
+            self.auth_header()
+            if OPENAI_MM_URL:
+                # 只为建立连接，不关心返回的状态
+                self.session.head(OPENAI_MM_URL, timeout=10).close()
+        except Exception as e:
+            print(f"LLM连接预热失败: {e}")
+
+    def close(self):
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """所有调用共用的GenAIClient"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GenAIClient()
+    return _client
+
+
+def warm_up():
+    get_client().warm_up()
+
+
+def jwt_expiry(token):
+    """JWT中的过期时间（time.time()秒），无法解析时返回None"""
+    try:
+        payload = token.split()[-1].split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
 
 # 实现ask函数
 def ask(msgs):
@@ -29,18 +142,13 @@ def ask(msgs):
     print(msgs)
     print("~"*100)
     
-    _token = ""
-    
-    if OPENAI_TOKEN and OPENAI_TOKEN.strip():  # 优先从环境变量中取token
-        _token = "Bearer " + OPENAI_TOKEN
-    else:
-        # 如果没有找到环境变量中的token，尝试通过get_token获取
-        _token = get_token()
+    # 优先使用配置的token，否则使用缓存的JWT，过期时才重新获取
+    _token = get_client().auth_header()
     resp = ask_with_msgs(_token, msgs)
     return resp
         
 
-def get_token():
+def get_token(session=None):
   url = OPENAI_TOKEN_URL
   payload = json.dumps({
     "input_token_state": {
@@ -56,7 +164,7 @@ def get_token():
     'Content-Type': 'application/json'
   }
 
-  response = requests.request("POST", url, headers=headers, data=payload, verify=False)
+  response = (session or get_client().session).request("POST", url, headers=headers, data=payload, verify=False)
 
   token_json=response.json()
 
@@ -72,7 +180,7 @@ def check_health():
     payload={}
     headers = {}
 
-    response = requests.request("GET", url, headers=headers, data=payload, verify=False)
+    response = get_client().session.request("GET", url, headers=headers, data=payload, verify=False)
     status=response.json()["status"]
     print(status)
     return status
@@ -119,7 +227,7 @@ def ask_on_images(token, img_pths=[], prompt="" ):
     'GAI-Platform-Application-ID': OPENAI_APPLICATION_ID,
     'Content-Type': 'application/json'
     }
-    response = requests.request("POST", OPENAI_MM_URL, headers=headers, data=payload, verify=False, timeout=180)
+    response = get_client().session.request("POST", OPENAI_MM_URL, headers=headers, data=payload, verify=False, timeout=180)
     print("-"*50)
     print(response.text)
     print("="*50)
@@ -146,7 +254,7 @@ def ask_with_msgs(token, msgs):
     'GAI-Platform-Application-ID': OPENAI_APPLICATION_ID,
     'Content-Type': 'application/json'
     }
-    response = requests.request("POST", OPENAI_MM_URL, headers=headers, data=payload, verify=False, timeout=180)
+    response = get_client().session.request("POST", OPENAI_MM_URL, headers=headers, data=payload, verify=False, timeout=180)
     print("-"*50)
     print(response.text)
     print("="*50)
@@ -155,6 +263,103 @@ def ask_with_msgs(token, msgs):
     return resp
 
 
+def ask_stream(msgs, on_text=None, stats=None):
+    """流式调用LLM，每收到一段内容就用目前为止的全文调用on_text，返回完整回复
+
+    stats不为None时写入 ttft（收到第一段内容的秒数）和 total（总秒数）。
+    OPENAI_STREAM为0时退回一次性返回的ask_with_msgs。
+    """
+    print("~"*100)
+    print(msgs)
+    print("~"*100)
+
+    _token = get_client().auth_header()
+
+    if str(OPENAI_STREAM).strip().lower() in ('0', 'false', 'no', 'off'):
+        started = time.perf_counter()
+        resp = ask_with_msgs(_token, msgs)
+        if stats is not None:
+            stats["ttft"] = stats["total"] = time.perf_counter() - started
+        if on_text:
+            on_text(resp)
+        return resp
+    return ask_with_msgs_stream(_token, msgs, on_text, stats)
+
+
+def iter_sse_data(lines):
+    """从SSE响应的行中逐个取出事件的data，一个事件的多行data用换行连接"""
+    data = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line:
+            # 空行表示一个事件结束
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+
+def ask_with_msgs_stream(token, msgs, on_text=None, stats=None):
+    payload = json.dumps({
+        "model": "gpt-4o",
+        "messages": msgs,
+        "temperature": 0.7,
+        "top_p": 0.95,
+        "frequency_penalty": 0,
+        "presence_penalty": 0,
+        "max_tokens": 800,
+        "stop": None,
+        "stream": True
+    })
+    headers = {
+    HEAD_TOKEN_KEY: token,
+    'GAI-Platform-Application-ID': OPENAI_APPLICATION_ID,
+    'Content-Type': 'application/json'
+    }
+    started = time.perf_counter()
+    ttft = None
+    parts = []
+    # 连接超时10秒；读取超时180秒是两段内容之间的最长间隔，而不是整个回复
+    with get_client().session.post(OPENAI_MM_URL, headers=headers, data=payload, verify=False,
+                                   timeout=(10, 180), stream=True) as response:
+        response.raise_for_status()
+        # chunk_size=None: 数据到达多少就处理多少，不等凑满缓冲区
+        for data in iter_sse_data(response.iter_lines(chunk_size=None)):
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or []
+            if not choices:
+                continue
+            delta = (choices[0].get("delta") or {}).get("content")
+            if not delta:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(delta)
+            if on_text:
+                on_text("".join(parts))
+    total = time.perf_counter() - started
+    if ttft is None:
+        ttft = total
+    resp = "".join(parts)
+    if stats is not None:
+        stats["ttft"] = ttft
+        stats["total"] = total
+    print("-"*50)
+    print(resp)
+    print(f"首个token {ttft:.2f}s, 总耗时 {total:.2f}s")
+    print("="*50)
+    return resp
+
+
 
 
 
@@ -0,0 +1,110 @@
+import collections
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+from caption_ingest import LatencyStats
+
+
+class LLMDispatcher:
+    """共享的LLM请求调度器
+
+    最多max_workers个请求同时进行。每个请求属于一个功能（summary、viewpoints等），
+    同一功能同时最多一个请求在进行、一个在排队：功能已有请求在排队时，新请求替换它
+    （只有最新的transcript会被发送）；功能的请求正在进行时，新请求排队等它完成。
+    被替换或在shutdown()时丢弃的请求不会执行，改为调用它提交时给出的on_dropped()。
+    功能的请求全部完成后调用on_idle(feature)，on_idle在工作线程中调用。
+    """
+
+    def __init__(self, max_workers: int = 2, on_idle: Callable[[Hashable], None] = None):
+        self.max_workers = max(1, max_workers)
+        self.on_idle = on_idle
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        # {功能: (调用, 入队的time.monotonic()时间, on_dropped)}，按入队顺序
+        self._pending = collections.OrderedDict()
+        self._running = set()
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        # 入队到开始执行的等待时间
+        self.wait = LatencyStats()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    def is_busy(self, feature: Hashable) -> bool:
+        with self._lock:
+            return feature in self._pending or feature in self._running
+
+    def submit(self, feature: Hashable, call: Callable[[], None],
+               on_dropped: Callable[[], None] = None):
+        """提交一个请求；同一功能排队中的旧请求被替换，保留它在队列中的位置"""
+        with self._lock:
+            self.submitted += 1
+            previous = self._pending.get(feature)
+            if previous is not None:
+                self.coalesced += 1
+                self._pending[feature] = (call, previous[1], on_dropped)
+            else:
+                self._pending[feature] = (call, time.monotonic(), on_dropped)
+            self._dispatch()
+        if previous is not None:
+            self._dropped(previous)
+
+    def _dispatch(self):
+        """在持有锁时调用：把排队的请求交给空闲的工作线程"""
+        while len(self._running) < self.max_workers:
+            feature = next((f for f in self._pending if f not in self._running), None)
+            if feature is None:
+                return
+            call, enqueued, _ = self._pending.pop(feature)
+            self._running.add(feature)
+            self.wait.add(time.monotonic() - enqueued)
+            self._executor.submit(self._run, feature, call)
+
+    def _run(self, feature: Hashable, call: Callable[[], None]):
+        try:
+            call()
+        except Exception:
+            self.failed += 1
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running.discard(feature)
+                self.completed += 1
+                idle = feature not in self._pending
+                self._dispatch()
+            if idle and self.on_idle:
+                self.on_idle(feature)
+
+    def shutdown(self, wait: bool = False):
+        """丢弃排队的请求；wait为True时等待进行中的请求完成"""
+        with self._lock:
+            dropped = list(self._pending.values())
+            self._pending.clear()
+        for request in dropped:
+            self._dropped(request)
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _dropped(request):
+        on_dropped = request[2]
+        if on_dropped:
+            try:
+                on_dropped()
+            except Exception:
+                traceback.print_exc()
+
+    def stats(self) -> str:
+        return (f"LLM 进行中 {self.in_flight}  排队 {self.queue_depth}  "
+                f"提交 {self.submitted}  合并 {self.coalesced}  完成 {self.completed}  "
+                f"失败 {self.failed}  等待 {self.wait.summary()}")
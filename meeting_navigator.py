@@ -1,14 +1,30 @@
+import sys
+from startup_profile import StartupProfiler
+
+# --profile-startup 需要在导入其它模块之前开始计时
+startup_profiler = StartupProfiler() if __name__ == "__main__" and "--profile-startup" in sys.argv else None
+if startup_profiler:
+    startup_profiler.install()
+
+import argparse
+import contextlib
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import threading
 from datetime import datetime
-import queue
-import uiautomation as auto
-from test import TranscriptManager, monitor_transcript
-import re
+import time
+import collections
+from ui_queue import CoalescingQueue
+from llm_dispatcher import LLMDispatcher
+from rolling_summary import RollingSummarizer
+from response_cache import ResponseCache
+from prompt_budget import ContextBuilder, parse_budgets, parse_terms
+from transcript_view import VirtualTranscriptView
 import configparser
-from gpt4o import ask
+from caption_ingest import LatencyStats
 import os
+# 采集模块（test、capture_supervisor）和LLM模块（gpt4o）在窗口显示后由后台线程导入，
+# 见 MeetingNavigator.start_background_init
 
 class NotificationWindow:
     def __init__(self, parent, message, duration=4):
@@ -89,7 +105,8 @@ class ConfigDialog:
         row = 0
         
         # 单行输入项
-        single_line_items = ['duration', 'username', 'language', 'live_freq', 'notification_showtime']
+        single_line_items = ['duration', 'username', 'language', 'live_freq', 'live_min_new_chars',
+                             'notification_showtime']
         for key in single_line_items:
             ttk.Label(defaults_frame, text=key).grid(row=row, column=0, padx=5, pady=2)
             var = tk.StringVar(value=self.config.get('Defaults', key, fallback=''))
@@ -118,7 +135,8 @@ class ConfigDialog:
             ('summarize_prompt', 'Summarize Prompt'),
             ('viewpoints_prompt', 'Viewpoints Prompt'),
             ('navigate_prompt', 'Navigation Prompt'),
-            ('minutes_prompt', 'Meeting Minutes Prompt')
+            ('minutes_prompt', 'Meeting Minutes Prompt'),
+            ('chunk_summary_prompt', 'Chunk Summary Prompt')
         ]
         
         for row, (key, label) in enumerate(prompts):
@@ -139,7 +157,8 @@ class ConfigDialog:
         for key in ['openai_token', 'openai_token_url', 'openai_health_url', 
                    'openai_mm_url', 'openai_chat_url', 'openai_user_name', 
                    'openai_password', 'openai_application_id', 'openai_application_name',
-                   'head_token_key']:
+                   'head_token_key', 'openai_stream', 'llm_workers',
+                   'prompt_budget', 'prompt_budgets']:
             ttk.Label(genai_frame, text=key).grid(row=row, column=0, padx=5, pady=2)
             var = tk.StringVar(value=self.config.get('GenAI', key, fallback=''))
             ttk.Entry(genai_frame, textvariable=var).grid(row=row, column=1, padx=5, pady=2)
@@ -181,20 +200,49 @@ class ConfigDialog:
         self.top.destroy()
 
 class MeetingNavigator:
-    def __init__(self, root):
+    # 每一帧处理UI消息的时间预算（秒），剩余的消息留到下一帧
+    UI_FRAME_BUDGET = 0.012
+    
+    def __init__(self, root, profiler: StartupProfiler = None):
+        # 启动耗时分析（--profile-startup），None表示不记录
+        self.profiler = profiler
+        
         # 首先加载配置文件
         self.config = configparser.ConfigParser()
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
-        if not self.config.read(config_path, encoding='utf-8'):
-            raise Exception("无法加载配置文件: config.ini")
+        with self.profile_phase("读取配置"):
+            if not self.config.read(config_path, encoding='utf-8'):
+                raise Exception("无法加载配置文件: config.ini")
         
         self.root = root
         self.root.title("Meeting Navigator")
         self.root.geometry("1200x800")
         
-        # 创建消息队列用于线程间通信
-        self.message_queue = queue.Queue()
-        self.llm_queue = queue.Queue()
+        # 创建消息队列用于线程间通信，消息到达时立即唤醒Tk线程
+        self.message_queue = CoalescingQueue(self.schedule_ui_messages)
+        self.llm_queue = CoalescingQueue(self.schedule_ui_messages)
+        self._ui_continuation = False
+        # LLM首个token和完整回复的耗时
+        self.llm_ttft = LatencyStats()
+        self.llm_total = LatencyStats()
+        # 所有LLM请求共用的调度器，同一功能还在进行时只保留最新的请求
+        self.llm_dispatcher = LLMDispatcher(self.config.getint('GenAI', 'llm_workers', fallback=2),
+                                            on_idle=self.on_llm_idle)
+        # {功能: 按钮名}，功能的请求全部完成后停止按钮动画
+        self.llm_buttons = {}
+        # 滚动总结：prompt中只放已结束块的总结和最新的原文（rolling_chunk为0时发送全文）
+        rolling_chunk = self.config.getint('Transcript', 'rolling_chunk', fallback=40)
+        self.rolling_summary = RollingSummarizer(
+            self.summarize_chunk, rolling_chunk,
+            tail=self.config.getint('Transcript', 'rolling_tail', fallback=20),
+            max_summaries=self.config.getint('Transcript', 'rolling_max_summaries', fallback=8)
+        ) if rolling_chunk > 0 else None
+        # 总结块使用的输出语言，在Tk线程中提交总结时更新
+        self.rolling_language = None
+        # 输入没有变化的分析请求不再发送
+        self.response_cache = ResponseCache()
+        # 按各功能的token预算裁剪prompt
+        self.context_builder = self.create_context_builder()
         
         # 初始化按钮相关的属性
         self.buttons = {}  # 初始化按钮字典
@@ -208,22 +256,76 @@ class MeetingNavigator:
         # 初始化Transcript相关变量
         self.transcript_thread = None
         self.transcript_manager = None
+        # 通知单个来源的监控循环保存会议并退出
+        self.transcript_stop = threading.Event()
+        # capture_workers > 1 时同时采集多个字幕窗口
+        self.capture_supervisor = None
         self.last_update = datetime.now()
+        # 长会议模式：内存和转录面板只保留最近的条目（0表示不限制）
+        self.transcript_max_lines = self.config.getint('Transcript', 'hot_window', fallback=0)
+        # 转录面板中每个条目所在行的mark，见update_transcript_display
+        self.transcript_marks = collections.OrderedDict()
+        self._transcript_mark_seq = 0
         
         # 初始化变量
         self.init_variables()
         
         # 创建主分割区域
-        self.create_main_layout()
+        with self.profile_phase("创建界面"):
+            self.create_main_layout()
         
         # 启动UI更新循环
         self.update_ui()
         
-        # 启动转录监控
-        self.start_transcript_monitor()
+        # 窗口先绘制出来，再在后台初始化转录监控和LLM
+        self.root.after_idle(self.root.after, 0, self.start_background_init)
         
         # 获取通知显示时间
         self.notification_duration = int(self.config['Defaults'].get('notification_showtime', '4'))
+        
+        # 关闭窗口时压缩转录日志
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def profile_phase(self, name):
+        """记录一个启动阶段的耗时，没有开启--profile-startup时不做任何事"""
+        # contextlib.suppress()不做任何事（nullcontext需要Python 3.7）
+        return self.profiler.phase(name) if self.profiler else contextlib.suppress()
+    
+    def start_background_init(self):
+        """窗口绘制之后，在后台线程导入采集和LLM模块，导入完成后启动转录监控"""
+        if self.profiler:
+            self.profiler.mark("窗口已绘制")
+        
+        def start_monitor():
+            with self.profile_phase("启动转录监控"):
+                self.start_transcript_monitor()
+        
+        def init_subsystems():
+            try:
+                with self.profile_phase("导入采集模块"):
+                    import test
+                    import capture_supervisor
+                # 上次异常退出时留下的日志在新的会议开始写日志之前压缩为.txt
+                with self.profile_phase("恢复转录日志"):
+                    test.recover_journals()
+                self.root.after(0, start_monitor)
+                # 提前导入、换好token并建立连接，第一次调用LLM时不用再等
+                with self.profile_phase("导入LLM模块"):
+                    import gpt4o
+                with self.profile_phase("预热LLM连接"):
+                    gpt4o.warm_up()
+            except Exception as e:
+                self.message_queue.put("error", f"后台初始化失败: {str(e)}")
+            finally:
+                if self.profiler:
+                    self.root.after(0, self.print_startup_profile)
+        
+        threading.Thread(target=init_subsystems, name="startup-init", daemon=True).start()
+    
+    def print_startup_profile(self):
+        self.profiler.mark("后台初始化完成")
+        self.profiler.uninstall()
+        print(self.profiler.report())
     
     def init_variables(self):
         """初始化所有变量"""
@@ -283,10 +385,23 @@ class MeetingNavigator:
         self.transcript_header.bind('<Button-1>', lambda e: self.toggle_transcript())
         
         # Transcript内容
+        # 多窗口采集时每个来源一行的状态（只在启用时显示）
+        self.capture_status = ttk.Label(self.transcript_frame, text="", justify=tk.LEFT)
+        
         self.transcript_content = ttk.Frame(self.transcript_frame)
         self.transcript_content.pack(fill=tk.BOTH, expand=True)
-        self.transcript_text = scrolledtext.ScrolledText(self.transcript_content)
-        self.transcript_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
+        if self.config.getboolean('Transcript', 'virtual_view', fallback=False):
+            # 很长的会议：只渲染视口附近的条目，直接从TranscriptStore读取
+            self.transcript_view = VirtualTranscriptView(
+                self.transcript_content,
+                lambda: self.transcript_manager.transcripts if self.transcript_manager else None
+            )
+            self.transcript_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
+            self.transcript_text = self.transcript_view.text
+        else:
+            self.transcript_view = None
+            self.transcript_text = scrolledtext.ScrolledText(self.transcript_content)
+            self.transcript_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
         
         # Live Summary区域
         self.summary_frame = ttk.Frame(self.left_main_frame)
@@ -430,44 +545,49 @@ class MeetingNavigator:
         }
     
     def update_transcript_display(self, transcript_item):
-        """更新转录内容显示"""
+        """更新转录内容显示
+
+        每行开头有一个Tk mark，transcript_marks按显示顺序记录
+        (timestamp, speaker) -> (mark名, 当前内容)。新条目追加到末尾，
+        修订只替换对应的一行，开销与面板中的行数无关。
+        """
         try:
-            # 获取所有当前显示的内容
-            current_text = self.transcript_text.get("1.0", tk.END)
-            lines = current_text.splitlines()
+            if self.transcript_view:
+                # 虚拟化视图直接从存储读取，合并到下一次空闲时刷新
+                self.transcript_view.invalidate()
+                return
             
-            # 查找是否存在相同时间戳和说话者的行
-            found = False
-            for i, line in enumerate(lines):
-                if not line:  # 跳过空行
-                    continue
-                # 解析行内容
-                match = re.match(r'\[([\d:]+)\] ([^:]+):', line)
-                if match:
-                    timestamp, speaker = match.groups()
-                    # 如果找到相同时间戳和说话者的行
-                    if timestamp == transcript_item.timestamp and speaker == transcript_item.speaker:
-                        found = True
-                        # 获取当前行的内容
-                        current_content = line.split(':', 1)[1].strip()
-                        # 如果新内容更长，则替换这一行
-                        if len(transcript_item.content) > len(current_content):
-                            # 清除所有内容
-                            self.transcript_text.delete("1.0", tk.END)
-                            # 重建内容：保持之前的行
-                            for j, old_line in enumerate(lines):
-                                if j == i:  # 在这个位置插入新内容
-                                    self.transcript_text.insert(tk.END, f"{transcript_item.to_string()}\n")
-                                elif old_line:  # 插入其他非空行
-                                    self.transcript_text.insert(tk.END, f"{old_line}\n")
-                        break
+            text = self.transcript_text
+            key = (transcript_item.timestamp, transcript_item.speaker)
+            entry = self.transcript_marks.get(key)
             
-            # 如果没有找到相同的行，追加新内容
-            if not found:
-                self.transcript_text.insert(tk.END, f"{transcript_item.to_string()}\n")
+            if entry is not None:
+                mark, current_content = entry
+                # 内容被修订（可能变短），则替换这一行
+                if transcript_item.content != current_content:
+                    text.delete(mark, f"{mark} lineend")
+                    text.insert(mark, transcript_item.to_string())
+                    self.transcript_marks[key] = (mark, transcript_item.content)
+            else:
+                # mark左对齐，在它的位置插入文本时mark留在行首
+                self._transcript_mark_seq += 1
+                mark = f"segment{self._transcript_mark_seq}"
+                text.mark_set(mark, "end-1c")
+                text.mark_gravity(mark, tk.LEFT)
+                text.insert(tk.END, f"{transcript_item.to_string()}\n")
+                self.transcript_marks[key] = (mark, transcript_item.content)
+                
+                # 长会议模式下删除最旧的行，面板只显示最近的条目
+                if self.transcript_max_lines and len(self.transcript_marks) > self.transcript_max_lines:
+                    excess = len(self.transcript_marks) - self.transcript_max_lines
+                    for _ in range(excess):
+                        _, (old_mark, _) = self.transcript_marks.popitem(last=False)
+                        text.mark_unset(old_mark)
+                    first_mark = next(iter(self.transcript_marks.values()))[0]
+                    text.delete("1.0", first_mark)
             
             # 自动滚动到底部
-            self.transcript_text.see(tk.END)
+            text.see(tk.END)
             
         except Exception as e:
             print(f"更新转录显示错误: {e}")
@@ -560,6 +680,10 @@ class MeetingNavigator:
                                           command=self.show_config_dialog)
         self.buttons['config'].pack(side=tk.LEFT, padx=5)
         
+        # LLM请求的进行中和排队数量
+        self.llm_status = ttk.Label(button_frame, text="")
+        self.llm_status.pack(side=tk.LEFT, padx=5)
+        
         # 右对齐按钮
         self.buttons['save'] = ttk.Button(button_frame, text="Save", 
                                         command=self.save_all)
@@ -583,13 +707,31 @@ class MeetingNavigator:
     
     def start_transcript_monitor(self):
         """启动转录监控线程"""
+        capture_workers = self.config.getint('Transcript', 'capture_workers', fallback=1)
+        if capture_workers > 1:
+            self.start_capture_supervisor(capture_workers)
+            return
+        
+        from test import create_caption_source, monitor_transcript
+        
         def run_monitor():
             try:
-                with auto.UIAutomationInitializerInThread():
+                # 字幕来源：默认读取Zoom窗口，replay用于在没有Zoom的机器上回放
+                source = create_caption_source(
+                    self.config.get('Transcript', 'caption_source', fallback='zoom'),
+                    replay_file=self.config.get('Transcript', 'replay_file', fallback='') or None,
+                    replay_speed=self.config.getfloat('Transcript', 'replay_speed', fallback=1.0)
+                )
+                with source.thread_context():
                     print("Debug: Starting monitor_transcript...")
                     # 获取manager实例和监控循环函数
                     manager, monitor_loop = monitor_transcript(
-                        lambda msg_type, content: self.message_queue.put((msg_type, content))
+                        self.enqueue_transcript,
+                        source=source,
+                        min_interval=self.config.getfloat('Transcript', 'poll_min_interval', fallback=0.25),
+                        max_interval=self.config.getfloat('Transcript', 'poll_max_interval', fallback=2.0),
+                        stop=self.transcript_stop,
+                        **self.get_manager_options()
                     )
                     # 设置manager
                     self.transcript_manager = manager
@@ -597,7 +739,7 @@ class MeetingNavigator:
                     monitor_loop()
             except Exception as e:
                 print(f"Debug: Error in run_monitor: {e}")
-                self.message_queue.put(("error", f"Transcript monitor error: {str(e)}"))
+                self.message_queue.put("error", f"Transcript monitor error: {str(e)}")
         
         if self.transcript_thread is None or not self.transcript_thread.is_alive():
             print("Debug: Creating new transcript monitor thread")
@@ -606,31 +748,56 @@ class MeetingNavigator:
             self.transcript_thread.start()
             print("Debug: Transcript monitor thread started")
     
+    def get_manager_options(self):
+        """TranscriptManager的配置项"""
+        return {
+            'journal_fsync_interval': self.config.getfloat('Transcript', 'journal_fsync_interval', fallback=5.0),
+            'hot_window': self.transcript_max_lines,
+            'spill_chunk': self.config.getint('Transcript', 'spill_chunk', fallback=500),
+        }
+    
+    def start_capture_supervisor(self, capture_workers):
+        """同时采集所有字幕窗口，每个窗口保存为单独的会议文件"""
+        from capture_supervisor import CaptureSupervisor
+        from test import TranscriptManager, discover_caption_sources
+        
+        def create_manager(key):
+            # 第一个发现的来源显示在转录面板中，其它来源只保存到各自的文件
+            primary = self.transcript_manager is None
+            callback = self.enqueue_transcript if primary else None
+            manager = TranscriptManager(callback, stream_name=key, **self.get_manager_options())
+            if primary:
+                self.transcript_manager = manager
+            return manager
+        
+        self.capture_supervisor = CaptureSupervisor(
+            lambda: discover_caption_sources(
+                self.config.get('Transcript', 'caption_source', fallback='zoom'),
+                replay_file=self.config.get('Transcript', 'replay_file', fallback='') or None,
+                replay_speed=self.config.getfloat('Transcript', 'replay_speed', fallback=1.0)
+            ),
+            create_manager,
+            max_workers=capture_workers,
+            min_interval=self.config.getfloat('Transcript', 'poll_min_interval', fallback=0.25),
+            max_interval=self.config.getfloat('Transcript', 'poll_max_interval', fallback=2.0)
+        )
+        self.capture_status.pack(fill=tk.X, padx=5, before=self.transcript_content)
+        self.transcript_thread = threading.Thread(target=self.capture_supervisor.run, daemon=True)
+        self.transcript_thread.start()
+    
     def update_ui(self):
         """更新UI的周期性任务"""
         try:
-            # 处理transcript消息队列
-            while not self.message_queue.empty():
-                msg_type, msg_content = self.message_queue.get_nowait()
-                if msg_type == "transcript":
-                    self.update_transcript_display(msg_content)
-                elif msg_type == "error":
-                    self.show_error(msg_content)
+            # 消息到达时已经立即处理，这里只兜底
+            self.process_ui_messages()
             
-            # 处理LLM响应消息队列
-            while not self.llm_queue.empty():
-                msg_type, content = self.llm_queue.get_nowait()
-                if msg_type == "summary":
-                    self.summary_text.delete("1.0", tk.END)
-                    self.summary_text.insert("1.0", content)
-                elif msg_type == "viewpoints":
-                    self.views_text.delete("1.0", tk.END)
-                    self.views_text.insert("1.0", content)
-                elif msg_type == "navigation":
-                    self.nav_text.delete("1.0", tk.END)
-                    self.nav_text.insert("1.0", content)
-                elif msg_type == "error":
-                    self.show_error(content)
+            if self.capture_supervisor:
+                self.capture_status.config(text=f"{self.capture_supervisor.format_status()}\n"
+                                                f"UI {self.message_queue.stats()}")
+            dispatcher = self.llm_dispatcher
+            cache = self.response_cache
+            self.llm_status.config(text=f"LLM 进行中 {dispatcher.in_flight}  排队 {dispatcher.queue_depth}  "
+                                        f"命中 {cache.hits}  跳过 {cache.skips}")
             
             # 如果实时功能开启，执行实时更新
             if self.live_var.get():
@@ -643,6 +810,59 @@ class MeetingNavigator:
             print(f"UI更新错误: {e}")
             self.root.after(1000, self.update_ui)
     
+    def schedule_ui_messages(self):
+        """工作线程放入消息后唤醒Tk线程"""
+        try:
+            self.root.after(0, self.process_ui_messages)
+        except (RuntimeError, tk.TclError):
+            # 窗口已经关闭
+            pass
+    
+    def process_ui_messages(self):
+        """在一帧的时间预算内处理消息，剩余的留到下一帧"""
+        try:
+            deadline = time.monotonic() + self.UI_FRAME_BUDGET
+            # LLM结果最多占一半预算，剩余的预算都给字幕；两个队列每帧都至少处理一条，
+            # 字幕持续到达时LLM结果也不会一直等待
+            llm_remaining = self.llm_queue.drain(self.handle_llm_message, self.UI_FRAME_BUDGET / 2)
+            remaining = self.message_queue.drain(self.handle_transcript_message,
+                                                 max(0.0, deadline - time.monotonic()))
+            remaining = remaining or llm_remaining
+            if remaining and not self._ui_continuation:
+                # 先让Tk完成重绘等空闲任务，再继续处理
+                self._ui_continuation = True
+                self.root.after_idle(self.root.after, 0, self.continue_ui_messages)
+        except Exception as e:
+            print(f"UI消息处理错误: {e}")
+    
+    def continue_ui_messages(self):
+        self._ui_continuation = False
+        self.process_ui_messages()
+    
+    def handle_transcript_message(self, msg_type, msg_content):
+        if msg_type in ("transcript", "transcript_revised"):
+            self.update_transcript_display(msg_content)
+        elif msg_type == "error":
+            self.show_error(msg_content)
+    
+    def handle_llm_message(self, msg_type, content):
+        if msg_type == "summary":
+            self.summary_text.delete("1.0", tk.END)
+            self.summary_text.insert("1.0", content)
+        elif msg_type == "viewpoints":
+            self.views_text.delete("1.0", tk.END)
+            self.views_text.insert("1.0", content)
+        elif msg_type == "navigation":
+            self.nav_text.delete("1.0", tk.END)
+            self.nav_text.insert("1.0", content)
+        elif msg_type == "error":
+            self.show_error(content)
+    
+    def enqueue_transcript(self, msg_type, content):
+        """TranscriptManager的回调：同一条字幕的多次修订在渲染前合并"""
+        key = (content.timestamp, content.speaker) if msg_type in ("transcript", "transcript_revised") else None
+        self.message_queue.put(msg_type, content, key)
+    
     def update_live_features(self):
         """更新实时功能"""
         try:
@@ -652,9 +872,11 @@ class MeetingNavigator:
             
             # 检查是否需要更新
             if (current_time - self.last_update).total_seconds() >= freq:
-                self.manual_summarize()
-                self.manual_viewpoints()
-                self.manual_navigation()
+                # 同一次更新中的所有prompt共享同一份transcript快照
+                snapshot = self.get_prompt_snapshot()
+                self.manual_summarize(snapshot, live=True)
+                self.manual_viewpoints(snapshot, live=True)
+                self.manual_navigation(snapshot, live=True)
                 self.last_update = current_time
         except Exception as e:
             print(f"实时更新错误: {e}")
@@ -686,37 +908,23 @@ class MeetingNavigator:
             import traceback
             traceback.print_exc()
     
-    def get_transcript_text(self):
-        """获取有transcript内容"""
+    def get_transcript_text(self, full=False):
+        """获取有transcript内容
+
+        长会议模式下默认只返回内存中最近的条目，full=True时包含磁盘上的部分。
+        """
         try:
-            print("\nDebug: Getting transcript text...")
-            
             if not self.transcript_manager:
                 print("Debug: transcript_manager is None")
                 return ""
             
-            print(f"Debug: transcript_manager exists, transcripts count: {len(self.transcript_manager.transcripts)}")
-            
-            if not self.transcript_manager.transcripts:
-                print("Debug: transcripts dictionary is empty")
-                return ""
-            
-            # 获取所有转录内容并按时间排序
-            sorted_items = sorted(
-                self.transcript_manager.transcripts.values(),
-                key=lambda x: datetime.strptime(x.timestamp, '%H:%M:%S')
-            )
-            
-            print(f"Debug: Sorted items count: {len(sorted_items)}")
-            
-            # 将每个条目转换为字符串并连接
-            transcript_text = "\n".join(item.to_string() for item in sorted_items)
+            if full:
+                return self.transcript_manager.transcripts.full_text()
             
-            print("Debug: Current transcript:")
-            print("-" * 50)
-            print(transcript_text)
-            print("-" * 50)
-            print(f"Debug: Transcript text length: {len(transcript_text)}")
+            # 存储按版本缓存渲染好的全文，版本未变时不做任何拼接
+            version, transcript_text = self.transcript_manager.transcripts.snapshot()
+            print(f"Debug: Transcript version {version}, "
+                  f"{len(self.transcript_manager.transcripts)} items, {len(transcript_text)} chars")
             
             return transcript_text
             
@@ -726,6 +934,76 @@ class MeetingNavigator:
             traceback.print_exc()
             return ""
     
+    def get_prompt_snapshot(self):
+        """填入分析prompt的 (版本, transcript)
+
+        开启滚动总结时transcript为已结束块的总结加上最新的原文，每次调用都会在后台
+        总结新结束的块，总结完成前这些条目仍以原文发送。版本用于ResponseCache。
+        """
+        if not self.transcript_manager:
+            return None, ""
+        store = self.transcript_manager.transcripts
+        rolling = self.rolling_summary
+        if rolling is None:
+            return store.snapshot()
+        # 先读版本再读内容，内容只可能比版本新，不会用旧内容的回复冒充新版本
+        version = (store.version, rolling.chunks, rolling.folds)
+        self.rolling_language = self.language_var.get()
+        # 每次最多总结几块，刚开启时积压的原文不会长时间占用工作线程
+        self.llm_dispatcher.submit("rolling_summary", lambda: rolling.advance(store, max_chunks=4))
+        return version, rolling.context(store)
+    
+    def request_analysis(self, msg_type, prompt_name, params, version, button_name, live=False):
+        """格式化prompt并异步调用LLM；输入与之前的请求相同时直接使用它的回复
+
+        live为True时（实时更新）还要求transcript至少新增live_min_new_chars个字符。
+        """
+        template = self.get_prompt(prompt_name)
+        fields = {name: value for name, value in params.items() if name != "transcript"}
+        key = ResponseCache.make_key(msg_type, template, fields, version)
+        progress = self.transcript_manager.transcripts.content_chars if self.transcript_manager else 0
+        min_new_chars = self.config.getint('Defaults', 'live_min_new_chars', fallback=0) if live else 0
+        status, cached = self.response_cache.check(key, progress, min_new_chars)
+        if status == "hit":
+            # 回复还在生成时（cached为None）等它显示即可
+            if cached is not None:
+                self.llm_queue.put(msg_type, cached, msg_type)
+            return
+        if status == "skip":
+            return
+        
+        msgs = [
+            {"role": "system", "content": "You are a helpful meeting assistant."},
+            {"role": "user", "content": self.build_prompt(msg_type, template, params)}
+        ]
+        self.call_llm_async(msg_type, msgs, button_name, key)
+    
+    def create_context_builder(self):
+        return ContextBuilder(
+            parse_budgets(self.config.get('GenAI', 'prompt_budgets', fallback='')),
+            self.config.getint('GenAI', 'prompt_budget', fallback=6000)
+        )
+    
+    def build_prompt(self, feature, template, params):
+        """按功能的token预算填充模板，超出时省略较早的transcript，保留提到干系人和用户的行"""
+        keep_terms = parse_terms(self.stakeholders_text.get("1.0", tk.END), self.username_var.get())
+        prompt, report = self.context_builder.build(feature, template, params, keep_terms)
+        if report.trimmed:
+            print(report.summary())
+        return prompt
+    
+    def summarize_chunk(self, text, level):
+        """滚动总结的回调（工作线程）：总结一块原文，或合并几个较早的总结"""
+        from gpt4o import ask_stream
+        
+        prompt = self.get_prompt('chunk_summary_prompt').format(
+            transcript=text, language=self.rolling_language or 'En')
+        msgs = [
+            {"role": "system", "content": "You are a helpful meeting assistant."},
+            {"role": "user", "content": prompt}
+        ]
+        return ask_stream(msgs)
+    
     def get_prompt(self, prompt_name):
         """安全地获取prompt模板"""
         try:
@@ -737,60 +1015,74 @@ class MeetingNavigator:
         except Exception as e:
             raise Exception(f"获取prompt失败: {str(e)}")
     
-    def call_llm_async(self, msg_type, msgs, button_name):
-        """异步调用LLM"""
+    def call_llm_async(self, msg_type, msgs, button_name, cache_key=None):
+        """通过共享的调度器异步调用LLM，同一种结果还在生成时只保留最新的请求"""
         def run_llm():
             try:
-                # 开始动画
-                self.button_states[button_name.lower()] = True
-                self.root.after(0, self.update_button_animation)
+                # 通常已经在启动时由后台线程导入
+                from gpt4o import ask_stream
                 
-                response = ask(msgs)
-                self.llm_queue.put((msg_type, response))
+                # 流式返回：收到的部分内容立即显示，同一种结果只渲染最新的一次
+                stats = {}
+                response = ask_stream(
+                    msgs, lambda partial: self.llm_queue.put(msg_type, partial, msg_type), stats)
+                self.llm_queue.put(msg_type, response, msg_type)
+                if cache_key is not None:
+                    self.response_cache.store(cache_key, response)
+                self.llm_ttft.add(stats["ttft"])
+                self.llm_total.add(stats["total"])
                 
             except Exception as e:
-                self.llm_queue.put(("error", f"LLM调用失败: {str(e)}"))
-            finally:
-                # 停止动画
-                self.button_states[button_name.lower()] = False
-                # 恢复按钮文字
-                self.root.after(0, lambda: self.buttons[button_name.lower()].configure(
-                    text=button_name.capitalize()))
+                if cache_key is not None:
+                    self.response_cache.forget(cache_key)
+                self.llm_queue.put("error", f"LLM调用失败: {str(e)}")
+        
+        def drop_llm():
+            # 排队时被更新的请求替换，缓存中"进行中"的记录不会再有回复
+            self.response_cache.forget(cache_key)
         
-        thread = threading.Thread(target=run_llm)
-        thread.daemon = True
-        thread.start()
+        self.submit_llm(msg_type, run_llm, button_name, drop_llm if cache_key is not None else None)
+    
+    def submit_llm(self, feature, call, button_name, on_dropped=None):
+        """把请求交给调度器，请求完成前按钮显示动画"""
+        self.llm_buttons[feature] = button_name
+        self.start_button_animation(button_name)
+        self.llm_dispatcher.submit(feature, call, on_dropped)
+    
+    def on_llm_idle(self, feature):
+        """调度器的回调（工作线程）：功能的请求全部完成"""
+        try:
+            if feature in self.llm_buttons:
+                self.root.after(0, self.stop_button_animation, feature)
+        except (RuntimeError, tk.TclError):
+            # 窗口已经关闭
+            pass
     
-    def manual_summarize(self):
+    def manual_summarize(self, snapshot=None, live=False):
         """手动触发总结"""
         try:
+            version, transcript = snapshot if snapshot is not None else self.get_prompt_snapshot()
             # 准备prompt参数
             params = {
-                "transcript": self.get_transcript_text(),
+                "transcript": transcript,
                 "meeting_topic": self.topics_text.get("1.0", tk.END).strip(),
                 "meeting_goals": self.agenda_text.get("1.0", tk.END).strip(),
                 "background": self.context_text.get("1.0", tk.END).strip(),
                 "language": self.language_var.get()
             }
             
-            # 获取prompt模板并格式化
-            prompt = self.get_prompt('summarize_prompt').format(**params)
-            
-            # 异步调用LLM
-            msgs = [
-                {"role": "system", "content": "You are a helpful meeting assistant."},
-                {"role": "user", "content": prompt}
-            ]
-            self.call_llm_async("summary", msgs, "Summarize")
+            # 格式化prompt并异步调用LLM
+            self.request_analysis("summary", 'summarize_prompt', params, version, "Summarize", live)
             
         except Exception as e:
             self.show_error(f"总结生成失败: {str(e)}")
     
-    def manual_viewpoints(self):
+    def manual_viewpoints(self, snapshot=None, live=False):
         """手动触发观点分析"""
         try:
+            version, transcript = snapshot if snapshot is not None else self.get_prompt_snapshot()
             params = {
-                "transcript": self.get_transcript_text(),
+                "transcript": transcript,
                 "meeting_topic": self.topics_text.get("1.0", tk.END).strip(),
                 "meeting_goals": self.agenda_text.get("1.0", tk.END).strip(),
                 "user_name": self.username_var.get(),
@@ -798,21 +1090,17 @@ class MeetingNavigator:
                 "language": self.language_var.get()
             }
             
-            prompt = self.get_prompt('viewpoints_prompt').format(**params)
-            msgs = [
-                {"role": "system", "content": "You are a helpful meeting assistant."},
-                {"role": "user", "content": prompt}
-            ]
-            self.call_llm_async("viewpoints", msgs, "Viewpoints")
+            self.request_analysis("viewpoints", 'viewpoints_prompt', params, version, "Viewpoints", live)
             
         except Exception as e:
             self.show_error(f"观点分析失败: {str(e)}")
     
-    def manual_navigation(self):
+    def manual_navigation(self, snapshot=None, live=False):
         """手动触发导航建议"""
         try:
+            version, transcript = snapshot if snapshot is not None else self.get_prompt_snapshot()
             params = {
-                "transcript": self.get_transcript_text(),
+                "transcript": transcript,
                 "meeting_topic": self.topics_text.get("1.0", tk.END).strip(),
                 "meeting_goals": self.agenda_text.get("1.0", tk.END).strip(),
                 "key_stakeholders": self.stakeholders_text.get("1.0", tk.END).strip(),
@@ -821,12 +1109,7 @@ class MeetingNavigator:
                 "notes": self.notes_text.get("1.0", tk.END).strip()
             }
             
-            prompt = self.get_prompt('navigate_prompt').format(**params)
-            msgs = [
-                {"role": "system", "content": "You are a helpful meeting assistant."},
-                {"role": "user", "content": prompt}
-            ]
-            self.call_llm_async("navigation", msgs, "Navigate")
+            self.request_analysis("navigation", 'navigate_prompt', params, version, "Navigate", live)
             
         except Exception as e:
             self.show_error(f"导航建议生成失败: {str(e)}")
@@ -835,26 +1118,49 @@ class MeetingNavigator:
         """生成会议纪要并提交"""
         try:
             params = {
-                "transcript": self.get_transcript_text(),
+                "transcript": self.get_transcript_text(full=True),
                 "meeting_topic": self.topics_text.get("1.0", tk.END).strip(),
                 "meeting_goals": self.agenda_text.get("1.0", tk.END).strip(),
                 "language": self.language_var.get()
             }
             
-            prompt = self.get_prompt('minutes_prompt').format(**params)
+            prompt = self.build_prompt("minutes", self.get_prompt('minutes_prompt'), params)
             msgs = [
                 {"role": "system", "content": "You are a helpful meeting assistant."},
                 {"role": "user", "content": prompt}
             ]
-            response = ask(msgs)
             
-            # TODO: 实现保存会议纪要的逻辑
-            print("会议纪要生成成功")
-            print(response)
+            def run_minutes():
+                try:
+                    from gpt4o import ask_stream
+                    response = ask_stream(msgs)
+                    
+                    # TODO: 实现保存会议纪要的逻辑
+                    print("会议纪要生成成功")
+                    print(response)
+                except Exception as e:
+                    self.llm_queue.put("error", f"提交失败: {str(e)}")
+            
+            self.submit_llm("minutes", run_minutes, "Submit")
             
         except Exception as e:
             self.show_error(f"提交失败: {str(e)}")
     
+    def start_button_animation(self, button_name):
+        animating = any(self.button_states.values())
+        self.button_states[button_name.lower()] = True
+        # 动画循环已经在运行时不再启动第二个
+        if not animating:
+            self.update_button_animation()
+    
+    def stop_button_animation(self, feature):
+        if self.llm_dispatcher.is_busy(feature):
+            # 回调到达之前又提交了新的请求
+            return
+        button_name = self.llm_buttons[feature]
+        self.button_states[button_name.lower()] = False
+        self.buttons[button_name.lower()].configure(text=button_name.capitalize())
+    
     def update_button_animation(self):
         """更新按钮动画"""
         for button_name, is_active in self.button_states.items():
@@ -871,6 +1177,33 @@ class MeetingNavigator:
         if any(self.button_states.values()):
             self.root.after(300, self.update_button_animation)
     
+    def on_close(self):
+        """关闭窗口：将转录日志压缩为最终文件后退出"""
+        print(f"UI {self.message_queue.stats()}")
+        print(f"LLM 首个token {self.llm_ttft.summary()}  完整回复 {self.llm_total.summary()}")
+        print(self.llm_dispatcher.stats())
+        print(f"实时分析 {self.response_cache.stats()}")
+        if self.rolling_summary:
+            print(self.rolling_summary.stats())
+        self.llm_dispatcher.shutdown()
+        try:
+            if self.capture_supervisor:
+                # 停止所有采集线程，各自保存会议
+                self.capture_supervisor.stop()
+                for stream in self.capture_supervisor.streams.values():
+                    stream.manager.transcripts.close()
+            elif self.transcript_manager:
+                # 先让监控线程退出，压缩之后不会再有一批条目写入新的日志
+                self.transcript_stop.set()
+                if self.transcript_thread:
+                    max_interval = self.config.getfloat('Transcript', 'poll_max_interval', fallback=2.0)
+                    self.transcript_thread.join(timeout=max_interval + 3)
+                self.transcript_manager.finalize()
+                self.transcript_manager.transcripts.close()
+        except Exception as e:
+            print(f"压缩转录日志时出错: {e}")
+        self.root.destroy()
+    
     def show_notification(self, message):
         """显示通知"""
         NotificationWindow(self.root, message, self.notification_duration)
@@ -887,13 +1220,23 @@ class MeetingNavigator:
         
         # 更新通知显示时间
         self.notification_duration = int(self.config['Defaults'].get('notification_showtime', '4'))
+        self.context_builder = self.create_context_builder()
         
         # 显示成功通知
         self.show_notification("配置已更新")
 
 def main():
-    root = tk.Tk()
-    app = MeetingNavigator(root)
+    parser = argparse.ArgumentParser(description="Meeting Navigator")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="打印启动过程中每个模块的导入耗时和各初始化阶段的耗时")
+    parser.parse_args()
+    
+    if startup_profiler:
+        startup_profiler.mark("模块导入完成")
+    with startup_profiler.phase("创建Tk") if startup_profiler else contextlib.suppress():
+        root = tk.Tk()
+    with startup_profiler.phase("初始化主窗口") if startup_profiler else contextlib.suppress():
+        app = MeetingNavigator(root, startup_profiler)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+import math
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# 中日韩文字和全角符号大约每个字一个token，其它文字大约每4个字符一个token
+CJK_PATTERN = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+# 填入prompt的transcript中省略部分的占位行
+OMITTED_LINE = "[... {count} lines omitted ...]"
+OMITTED_LINE_TOKENS = math.ceil(len(OMITTED_LINE.format(count=999999)) / 4) + 1
+
+
+def estimate_tokens(text: str) -> int:
+    """不依赖分词器，在本地粗略估算token数"""
+    if not text:
+        return 0
+    if text.isascii():
+        return math.ceil(len(text) / 4)
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """解析 "summary:4000, viewpoints:6000" 格式的各功能预算"""
+    budgets = {}
+    for part in re.split(r'[,;\n]', value or ''):
+        if ':' not in part:
+            continue
+        feature, tokens = part.split(':', 1)
+        try:
+            budgets[feature.strip()] = int(tokens)
+        except ValueError:
+            print(f"无效的prompt预算: {part.strip()}")
+    return budgets
+
+
+def parse_terms(*values: str) -> List[str]:
+    """从干系人列表和用户名中取出需要保留的名字（逗号、分号、换行分隔）"""
+    terms = []
+    for value in values:
+        for term in re.split(r'[,;，；、\n]', value or ''):
+            term = term.strip()
+            if len(term) >= 2 and term.lower() not in terms:
+                terms.append(term.lower())
+    return terms
+
+
+class PromptReport:
+    """一次prompt裁剪的结果"""
+
+    __slots__ = ('feature', 'budget', 'tokens', 'original_tokens', 'lines', 'dropped_lines',
+                 'dropped_tokens', 'kept_mentions', 'truncated_fields')
+
+    def __init__(self, feature: str, budget: int):
+        self.feature = feature
+        self.budget = budget
+        self.tokens = 0
+        self.original_tokens = 0
+        self.lines = 0
+        self.dropped_lines = 0
+        self.dropped_tokens = 0
+        # 因为提到干系人或用户而保留的较早的行
+        self.kept_mentions = 0
+        self.truncated_fields: List[str] = []
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.dropped_lines or self.truncated_fields)
+
+    def summary(self) -> str:
+        text = (f"prompt {self.feature}: 约 {self.tokens}/{self.budget} tokens"
+                f"（原 {self.original_tokens}）")
+        if self.dropped_lines:
+            text += (f"  省略 {self.dropped_lines}/{self.lines} 行 约 {self.dropped_tokens} tokens"
+                     f"  保留提及 {self.kept_mentions} 行")
+        if self.truncated_fields:
+            text += f"  截断字段 {', '.join(self.truncated_fields)}"
+        return text
+
+
+class ContextBuilder:
+    """按token预算填充prompt模板
+
+    每个功能有自己的预算（未配置时用default_budget）。模板和其它字段先占用预算，
+    单个字段超过预算的field_share时截断；剩余预算给transcript：
+    先从最新的行向前保留，占用 (1 - mention_share) 的预算，再从剩下较早的行中
+    保留提到干系人、用户名的行和滚动总结的行，最后用剩余预算继续向前保留最新的行。
+    省略的连续行用一行占位说明，保留的行维持原来的顺序。
+    """
+
+    def __init__(self, budgets: Dict[str, int] = None, default_budget: int = 6000,
+                 mention_share: float = 0.25, field_share: float = 0.125):
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.mention_share = mention_share
+        self.field_share = field_share
+
+    def budget_for(self, feature: str) -> int:
+        return self.budgets.get(feature, self.default_budget)
+
+    def build(self, feature: str, template: str, params: Dict[str, str],
+              keep_terms: Iterable[str] = ()) -> Tuple[str, PromptReport]:
+        """返回 (prompt, 裁剪结果)"""
+        budget = self.budget_for(feature)
+        report = PromptReport(feature, budget)
+        params = dict(params)
+        transcript = params.get("transcript", "")
+        report.original_tokens = estimate_tokens(template.format(**params))
+
+        field_cap = max(1, int(budget * self.field_share))
+        for name, value in params.items():
+            if name != "transcript" and estimate_tokens(value) > field_cap:
+                params[name] = self._truncate(value, field_cap)
+                report.truncated_fields.append(name)
+
+        params["transcript"] = ""
+        available = budget - estimate_tokens(template.format(**params))
+        params["transcript"] = self._fit_transcript(transcript, available, keep_terms, report)
+        prompt = template.format(**params)
+        report.tokens = estimate_tokens(prompt)
+        return prompt, report
+
+    def _fit_transcript(self, transcript: str, available: int, keep_terms: Iterable[str],
+                        report: PromptReport) -> str:
+        lines = transcript.splitlines()
+        report.lines = len(lines)
+        if estimate_tokens(transcript) + len(lines) <= available:
+            return transcript
+        costs = [estimate_tokens(line) + 1 for line in lines]
+
+        terms = [term.lower() for term in keep_terms]
+        keep = [False] * len(lines)
+        # 最早的一段省略说明
+        used = OMITTED_LINE_TOKENS
+
+        # 1. 最新的行
+        recent_budget = available * (1 - self.mention_share)
+        index = len(lines) - 1
+        while index >= 0 and used + costs[index] <= recent_budget:
+            keep[index] = True
+            used += costs[index]
+            index -= 1
+        # 2. 较早的行中提到干系人、用户名的行和滚动总结
+        for older in range(index, -1, -1):
+            line = lines[older]
+            lowered = line.lower()
+            if line.startswith("[Summary ") or any(term in lowered for term in terms):
+                # 单独保留的行后面会多一段省略说明
+                cost = costs[older] + OMITTED_LINE_TOKENS
+                if used + cost <= available:
+                    keep[older] = True
+                    used += cost
+                    if not line.startswith("[Summary "):
+                        report.kept_mentions += 1
+        # 3. 剩余预算继续保留最新的行
+        while index >= 0:
+            if not keep[index]:
+                if used + costs[index] > available:
+                    break
+                keep[index] = True
+                used += costs[index]
+            index -= 1
+
+        output = []
+        omitted = 0
+        for line, kept, cost in zip(lines, keep, costs):
+            if kept:
+                if omitted:
+                    output.append(OMITTED_LINE.format(count=omitted))
+                    omitted = 0
+                output.append(line)
+            else:
+                omitted += 1
+                report.dropped_lines += 1
+                report.dropped_tokens += cost
+        if omitted:
+            output.append(OMITTED_LINE.format(count=omitted))
+        return "\n".join(output) + "\n"
+
+    @staticmethod
+    def _truncate(value: str, tokens: int) -> str:
+        """保留开头约tokens个token"""
+        low, high = 0, len(value)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(value[:middle]) <= tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return value[:low] + " ..."
@@ -0,0 +1,67 @@
+import collections
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """实时分析的请求去重：输入没有变化时不发送请求
+
+    输入的key由功能、prompt模板、会议背景字段和transcript版本组成。
+    - 命中：与某次已经发出的请求输入完全相同，直接使用它的回复（还在生成时什么也不做）
+    - 跳过：模板和背景字段没变，transcript新增的字符数少于min_new_chars
+    失败的请求和在排队时被替换的请求通过forget()移除，下一次会重新发送。
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # {key: 回复}，回复为None表示请求还在进行
+        self._responses: Dict[Tuple, Optional[str]] = collections.OrderedDict()
+        # {功能: (最近一次请求的key, 当时transcript的累计字符数)}
+        self._last: Dict[Hashable, Tuple[Tuple, int]] = {}
+        self.hits = 0
+        self.skips = 0
+        self.requests = 0
+
+    @staticmethod
+    def make_key(feature: Hashable, template: str, fields: Dict[str, str], version) -> Tuple:
+        return (feature, template, tuple(sorted(fields.items())), version)
+
+    def check(self, key: Tuple, progress: int, min_new_chars: int = 0) -> Tuple[str, Optional[str]]:
+        """返回 ("hit", 缓存的回复或None)、("skip", None) 或 ("miss", None)
+
+        progress是transcript的累计字符数；返回miss时记为一次新请求。
+        """
+        feature = key[0]
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                self.hits += 1
+                return "hit", self._responses[key]
+            last = self._last.get(feature)
+            if (min_new_chars and last is not None and last[0][:3] == key[:3]
+                    and progress - last[1] < min_new_chars):
+                self.skips += 1
+                return "skip", None
+            self.requests += 1
+            self._last[feature] = (key, progress)
+            self._responses[key] = None
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+            return "miss", None
+
+    def store(self, key: Tuple, response: str):
+        with self._lock:
+            if key in self._responses:
+                self._responses[key] = response
+
+    def forget(self, key: Tuple):
+        """请求失败或被丢弃，下一次相同的输入重新发送"""
+        with self._lock:
+            self._responses.pop(key, None)
+            last = self._last.get(key[0])
+            if last is not None and last[0] == key:
+                del self._last[key[0]]
+
+    def stats(self) -> str:
+        return f"请求 {self.requests}  命中 {self.hits}  跳过 {self.skips}"
@@ -0,0 +1,147 @@
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from transcript_store import TranscriptStore, format_clock
+
+
+class ChunkSummary:
+    """一段连续条目（或几个更低层总结）的总结，level为0表示直接由原文总结"""
+
+    __slots__ = ('start_seconds', 'end_seconds', 'level', 'segments', 'text')
+
+    def __init__(self, start_seconds: int, end_seconds: int, level: int, segments: int, text: str):
+        self.start_seconds = start_seconds
+        self.end_seconds = end_seconds
+        self.level = level
+        self.segments = segments
+        self.text = text
+
+    def to_string(self) -> str:
+        """一行文本：LLM返回的多行总结合并为一行，按token预算裁剪prompt时整条保留或省略"""
+        text = " ".join(line.strip() for line in self.text.splitlines() if line.strip())
+        return f"[Summary {format_clock(self.start_seconds)}-{format_clock(self.end_seconds)}] {text}"
+
+
+class RollingSummarizer:
+    """滚动总结：已经结束的条目分块总结一次并缓存，prompt中只放各块的总结和最新的原文
+
+    按时间顺序每chunk_size条组成一块；最新的tail条还可能被修订，不参与分块。
+    总结数量超过max_summaries时，把fold_size个相邻的同层总结再总结为高一层的总结，
+    优先合并层数高的，长会议的总结数量和长度因此保持有界。
+    已经总结过的时间范围内之后又被修订或迟到的条目不会重新总结，
+    而是以原文放在总结之后、未总结的原文之前，不会从prompt中消失。
+
+    summarize(text, level)由调用方提供（通常调用LLM），在调用advance()的线程中执行，
+    同一时间只应有一个线程调用advance()；context()可以在任意线程中调用。
+    """
+
+    def __init__(self, summarize: Callable[[str, int], str], chunk_size: int = 40, tail: int = 20,
+                 max_summaries: int = 8, fold_size: int = 4):
+        self.summarize = summarize
+        self.chunk_size = max(1, chunk_size)
+        self.tail = max(0, tail)
+        self.max_summaries = max(2, max_summaries)
+        self.fold_size = max(2, min(fold_size, self.max_summaries))
+        self.summaries: List[ChunkSummary] = []
+        # 已经总结的最后一个条目的会议秒数，None表示还没有总结
+        self.boundary: Optional[int] = None
+        # 总结之后才修订或迟到的条目 {(timestamp, speaker): 条目}
+        self.revised: Dict[Tuple[str, str], object] = {}
+        # 已经检查过修订的store版本
+        self._checked_version = 0
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.folds = 0
+        # 发送给summarize的字符数
+        self.summarized_chars = 0
+
+    def advance(self, store: TranscriptStore, max_chunks: int = None) -> int:
+        """总结store中新结束的块（最多max_chunks块），返回新总结的块数"""
+        # 先读取版本再读取条目：之后的修订即使已经包含在本次的块中，也会在下次被检查到
+        version = store.version
+        if self.boundary is not None:
+            revised = store.changed_since(self._checked_version, self.boundary)
+            if revised:
+                with self._lock:
+                    for item in revised:
+                        self.revised[(item.timestamp, item.speaker)] = item
+        items = self._pending(store, self.boundary)
+        count = 0
+        while len(items) - self.tail >= self.chunk_size and (max_chunks is None or count < max_chunks):
+            end = self.chunk_size
+            # 块在秒数变化处结束，同一秒的条目不会被拆到两块
+            while end < len(items) - self.tail and items[end].seconds == items[end - 1].seconds:
+                end += 1
+            if end < len(items) and items[end].seconds == items[end - 1].seconds:
+                # 这一秒的条目延伸到了尾部，等尾部向后移动
+                break
+            chunk, items = items[:end], items[end:]
+            text = "".join(item.to_string() + "\n" for item in chunk)
+            summary = ChunkSummary(chunk[0].seconds, chunk[-1].seconds, 0, len(chunk),
+                                   self._summarize(text, 0))
+            with self._lock:
+                self.summaries.append(summary)
+                self.boundary = chunk[-1].seconds
+                self.chunks += 1
+            count += 1
+            self._fold()
+        self._checked_version = version
+        return count
+
+    def context(self, store: TranscriptStore) -> str:
+        """各块的总结加上还没有总结的原文"""
+        # 总结和边界一起读取，advance()同时在另一个线程中运行时也不会重复或遗漏
+        with self._lock:
+            summaries = list(self.summaries)
+            boundary = self.boundary
+            revised = sorted(self.revised.values(), key=lambda item: item.seconds)
+        lines = [summary.to_string() + "\n" for summary in summaries]
+        lines.extend(item.to_string() + "\n" for item in revised)
+        lines.extend(item.to_string() + "\n" for item in self._pending(store, boundary))
+        return "".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.summaries = []
+            self.boundary = None
+            self.revised = {}
+        self._checked_version = 0
+
+    def stats(self) -> str:
+        levels = {}
+        for summary in self.summaries:
+            levels[summary.level] = levels.get(summary.level, 0) + 1
+        return (f"滚动总结 {self.chunks} 块  合并 {self.folds} 次  当前 {len(self.summaries)} 个总结 "
+                f"(各层 {dict(sorted(levels.items()))})  总结后修订 {len(self.revised)} 条  "
+                f"发送总结原文 {self.summarized_chars:,} 字符")
+
+    def _pending(self, store: TranscriptStore, boundary: Optional[int]) -> list:
+        return store.after(boundary) if boundary is not None else list(store.iter_all())
+
+    def _summarize(self, text: str, level: int) -> str:
+        self.summarized_chars += len(text)
+        return self.summarize(text, level)
+
+    def _fold(self):
+        while len(self.summaries) > self.max_summaries:
+            summaries = self.summaries
+            start = self._fold_start(summaries)
+            group = summaries[start:start + self.fold_size]
+            text = "".join(summary.to_string() + "\n" for summary in group)
+            level = max(summary.level for summary in group) + 1
+            merged = ChunkSummary(group[0].start_seconds, group[-1].end_seconds, level,
+                                  sum(summary.segments for summary in group),
+                                  self._summarize(text, level))
+            with self._lock:
+                self.summaries = summaries[:start] + [merged] + summaries[start + self.fold_size:]
+                self.folds += 1
+
+    def _fold_start(self, summaries: List[ChunkSummary]) -> int:
+        """最高层中第一组fold_size个相邻的同层总结；没有时合并最早的fold_size个"""
+        for level in sorted({summary.level for summary in summaries}, reverse=True):
+            run = 0
+            for index, summary in enumerate(summaries):
+                run = run + 1 if summary.level == level else 0
+                if run == self.fold_size:
+                    return index - self.fold_size + 1
+        return 0
@@ -0,0 +1,130 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class _TimingLoader:
+    """包装模块的loader，记录执行模块代码的耗时；其它属性转发给原loader"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.importing(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder:
+    """放在sys.meta_path最前面，给其它finder找到的模块换上_TimingLoader"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """记录启动过程中每个模块的导入耗时和各初始化阶段的耗时
+
+    install()之后导入的模块都会被计时（包括后台线程中的导入）。
+    每个模块记录累计耗时（包括它导入的其它模块）和自身耗时，
+    与 python -X importtime 的两列含义相同。
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (模块名, 开始时间, 自身耗时, 累计耗时, 线程名)
+        self.imports: List[Tuple[str, float, float, float, str]] = []
+        # (阶段名, 开始时间, 耗时, 线程名)，耗时为None表示一个时间点
+        self.phases: List[Tuple[str, float, float, str]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finder = None
+
+    def install(self):
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    @contextmanager
+    def importing(self, name: str):
+        stack = self._local.__dict__.setdefault("stack", [])
+        # [导入的子模块累计耗时]
+        frame = [0.0]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self._lock:
+                self.imports.append((name, started - self.started, elapsed - frame[0], elapsed,
+                                     threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, started - self.started, time.perf_counter() - started,
+                                    threading.current_thread().name))
+
+    def mark(self, name: str):
+        """记录一个时间点，例如窗口第一次绘制"""
+        with self._lock:
+            self.phases.append((name, time.perf_counter() - self.started, None,
+                                threading.current_thread().name))
+
+    def report(self, top: int = 25, min_ms: float = 1.0) -> str:
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+            imports = list(self.imports)
+        lines = ["启动阶段（从开始计时算起，毫秒）:",
+                 f"  {'开始':>8} {'耗时':>8}  {'线程':<12} 阶段"]
+        for name, start, elapsed, thread in phases:
+            duration = "" if elapsed is None else f"{elapsed * 1000:.1f}"
+            lines.append(f"  {start * 1000:>8.1f} {duration:>8}  {thread:<12} {name}")
+
+        total = {}
+        for name, start, own, cumulative, thread in imports:
+            total[thread] = total.get(thread, 0.0) + own
+        lines.append(f"模块导入（共 {len(imports)} 个，"
+                     + "，".join(f"{thread} {seconds * 1000:.1f} ms" for thread, seconds in total.items())
+                     + f"），累计耗时最长的 {top} 个:")
+        lines.append(f"  {'累计':>8} {'自身':>8} {'开始':>8}  {'线程':<12} 模块")
+        imports.sort(key=lambda item: item[3], reverse=True)
+        for name, start, own, cumulative, thread in imports[:top]:
+            if cumulative * 1000 < min_ms:
+                break
+            lines.append(f"  {cumulative * 1000:>8.1f} {own * 1000:>8.1f} {start * 1000:>8.1f}  "
+                         f"{thread:<12} {name}")
+        return "\n".join(lines)
@@ -1,46 +1,79 @@
-import uiautomation as auto
-from time import sleep
-from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict
-import re
-import win32api
-import win32con
-import win32gui
+from typing import Callable, Dict, List
 import os
+import re
+import shutil
 from pathlib import Path
 import time
 import threading
+from transcript_store import MeetingClock, TranscriptItem, TranscriptStore
+from transcript_journal import TranscriptJournal
+from caption_merger import CaptionMerger
+from transcript_spill import SegmentSpill
+from caption_source import CaptionSource, ReplayCaptionSource
+from caption_ingest import AdaptivePoller, CaptionIngestor, LatencyStats, ReconnectBackoff
+from caption_fingerprint import FingerprintCache
+from caption_parser import CaptionParser
 
-@dataclass
-class TranscriptItem:
-    """字幕条目的数据类"""
-    speaker: str
-    timestamp: str
-    content: str
-    
-    def to_string(self) -> str:
-        """转换为字符串格式"""
-        return f"[{self.timestamp}] {self.speaker}: {self.content}"
+# _get_journal() 创建的日志文件名: zoom_YYYY-MMM-DD_HH-MM-SS[_流名称].journal
+JOURNAL_NAME_PATTERN = re.compile(r'^zoom_(\d{4}-\w{3}-\d{2})_\d{2}-\d{2}-\d{2}(.*)$')
 
 class TranscriptManager:
-    def __init__(self, message_callback=None):
-        self.transcripts: Dict[str, TranscriptItem] = {}
-        self.current_speaker = ""
+    def __init__(self, message_callback=None, journal_fsync_interval: float = 5.0,
+                 hot_window: int = 0, spill_chunk: int = 500, transcript_dir=None,
+                 stream_name: str = None):
+        self.transcript_dir = Path(transcript_dir) if transcript_dir else None
+        # 同时采集多个窗口时，每个窗口的文件名带上各自的后缀
+        self.stream_suffix = f"_{stream_name}" if stream_name else ""
+        # hot_window > 0 时进入长会议模式，旧条目写入磁盘段文件
+        spill = None
+        if hot_window:
+            spill_name = f"spill_{datetime.now().strftime('%Y-%b-%d_%H-%M-%S')}{self.stream_suffix}"
+            spill = SegmentSpill(self._get_transcript_dir() / spill_name)
+        self.transcripts = TranscriptStore(hot_window=hot_window, spill=spill, spill_chunk=spill_chunk)
+        self.clock = MeetingClock()
+        self.parser = CaptionParser(self.clock)
+        self.merger = CaptionMerger()
         self.initial_scan_done = False
+        # 初始回填扫描的耗时（秒）
+        self.backfill_seconds = None
         self.output_file = None
         self.earliest_timestamp = None
         self.latest_timestamp = None
-        self.latest_messages = {}
         self.message_callback = message_callback
+        self.journal_fsync_interval = journal_fsync_interval
+        self.journal = None
+        self._last_saved_path = None
+        # 字幕出现到写入存储的延迟
+        self.latency = LatencyStats()
+        # 字幕窗口关闭或连接失败到重新连接成功的时间
+        self.reconnect_times = LatencyStats()
+        # 上一次读取时各列表项的指纹，没有变化的项不再解析
+        self.fingerprints = FingerprintCache()
+        # 采集状态：最近一次读取字幕列表、最近一次写入新内容的time.monotonic()时间
+        self.last_read = None
+        self.last_change = None
+    
+    def _get_transcript_dir(self) -> Path:
+        """获取并创建~/ZoomTranscript目录"""
+        transcript_dir = self.transcript_dir or default_transcript_dir()
+        transcript_dir.mkdir(parents=True, exist_ok=True)
+        return transcript_dir
+    
+    def _get_journal(self) -> TranscriptJournal:
+        """获取当前会议的日志，第一次写入时创建"""
+        if self.journal is None:
+            current_time = datetime.now()
+            file_name = f"zoom_{current_time.strftime('%Y-%b-%d_%H-%M-%S')}{self.stream_suffix}.journal"
+            self.journal = TranscriptJournal(
+                self._get_transcript_dir() / file_name,
+                fsync_interval=self.journal_fsync_interval
+            )
+        return self.journal
     
     def _get_output_path(self) -> Path:
         """获取输出文件路径"""
-        # 获取用户目录
-        user_home = os.path.expanduser("~")
-        # 创建ZoomTranscript目录
-        transcript_dir = Path(user_home) / "ZoomTranscript"
-        transcript_dir.mkdir(parents=True, exist_ok=True)
+        transcript_dir = self._get_transcript_dir()
         
         # 获取当前系统日期和时间
         current_time = datetime.now()
@@ -52,123 +85,80 @@ class TranscriptManager:
         
         # 构建文件名：zoom_YYYY-MMM-DD_HH-MM-SS_HH-MM-SS.txt
         # 使用strftime的 %b 来获取月份缩写
-        file_name = f"zoom_{current_time.strftime('%Y-%b-%d')}_{self.earliest_timestamp}_{self.latest_timestamp}.txt"
+        file_name = (f"zoom_{current_time.strftime('%Y-%b-%d')}_{self.earliest_timestamp}_"
+                     f"{self.latest_timestamp}{self.stream_suffix}.txt")
         
         return transcript_dir / file_name
     
-    def _update_earliest_timestamp(self, timestamp: str):
-        """更新最早的时间戳"""
-        try:
-            current_time = datetime.strptime(timestamp, '%H:%M:%S')
-            formatted_time = current_time.strftime("%H-%M-%S")
-            
-            if not self.earliest_timestamp:
-                self.earliest_timestamp = formatted_time
-                self.latest_timestamp = formatted_time
-            else:
-                # 比较并更新最早时间
-                earliest = datetime.strptime(self.earliest_timestamp, '%H-%M-%S')
-                if current_time < earliest:
-                    self.earliest_timestamp = formatted_time
-                
-                # 比较并更新最晚时间
-                latest = datetime.strptime(self.latest_timestamp, '%H-%M-%S')
-                if current_time > latest:
-                    self.latest_timestamp = formatted_time
-                    
-        except Exception as e:
-            print(f"更新时间戳时出错: {e}")
+    def _update_earliest_timestamp(self):
+        """根据存储的首尾条目更新最早和最晚的时间戳"""
+        earliest = self.transcripts.earliest
+        latest = self.transcripts.latest
+        if earliest and latest:
+            self.earliest_timestamp = earliest.timestamp.replace(':', '-')
+            self.latest_timestamp = latest.timestamp.replace(':', '-')
     
     def save_to_file(self):
         """保存内容到文件"""
         try:
             output_path = self._get_output_path()
             
-            # 按时间戳排序
-            sorted_items = sorted(
-                self.transcripts.values(),
-                key=lambda x: datetime.strptime(x.timestamp, '%H:%M:%S')
-            )
-            
-            # 写入文件
+            # 存储缓存了按时间排序的全文，长会议模式下先写入磁盘段文件中的部分
             with open(output_path, 'w', encoding='utf-8') as f:
-                for item in sorted_items:
-                    f.write(f"{item.to_string()}\n")
+                self.transcripts.write_text(f)
+            
+            # 文件名包含最晚时间戳，删除本次会议之前保存的旧文件
+            if self._last_saved_path and self._last_saved_path != output_path:
+                try:
+                    self._last_saved_path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._last_saved_path = output_path
             
             print(f"内容已保存到: {output_path}")
+            return True
             
         except Exception as e:
             print(f"保存文件时出错: {e}")
+            return False
     
-    def _send_key(self, vk_code):
-        """发送单个按键"""
-        win32api.keybd_event(vk_code, 0, 0, 0)
-        sleep(0.05)
-        win32api.keybd_event(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0)
-        sleep(0.05)
-
-    def _collect_all_content(self, list_control) -> List[TranscriptItem]:
-        """收集所有内容"""
+    def finalize(self):
+        """会议结束时将日志压缩为最终的.txt文件"""
+        if self.journal is None:
+            return
+        self.journal.commit(force=True)
+        if self.save_to_file():
+            self.journal.remove()
+            self.journal = None
+    
+    def commit_journal(self):
+        """没有新内容时也按间隔落盘，一阵发言之后安静下来时不用等到下一批或关闭"""
+        if self.journal is not None:
+            self.journal.commit()
+    
+    def _collect_all_content(self, source: CaptionSource) -> List[TranscriptItem]:
+        """收集所有内容；初始扫描时回填的条目直接写入存储，不在返回值中"""
         collected_items = []
         try:
             if not self.initial_scan_done:
                 print("执行初始扫描...")
-                list_control.SetFocus()
-                sleep(0.5)
-                
-                # 改进的滚动到顶部逻辑
-                print("滚动到顶部...")
-                # 先按End键确保激活滚动
-                self._send_key(win32con.VK_END)
-                sleep(0.2)
-                
-                # 多次尝试滚动到顶部
-                for _ in range(3):  # 尝试3次
-                    # 连续多次按Home键
-                    for _ in range(10):
-                        self._send_key(win32con.VK_HOME)
-                        sleep(0.1)
-                    
-                    # 检查是否到达顶部
-                    items = self._parse_visible_items(list_control)
-                    if items and items[0].timestamp:
-                        print(f"已到达顶部，最早时间戳: {items[0].timestamp}")
-                        break
-                    sleep(0.5)
-                
-                print("开始向下滚动收集内容...")
-                no_new_content_count = 0
-                last_content_hash = ""
-                seen_timestamps = set()
+                started = time.monotonic()
+                backfilled = 0
                 
-                while no_new_content_count < 3:
-                    items = self._parse_visible_items(list_control)
-                    if items:
-                        # 使用时间戳检查是否有新内容
-                        current_timestamps = {item.timestamp for item in items}
-                        new_timestamps = current_timestamps - seen_timestamps
-                        
-                        if new_timestamps:
-                            # 只添加新的内容
-                            new_items = [item for item in items if item.timestamp in new_timestamps]
-                            collected_items.extend(new_items)
-                            seen_timestamps.update(new_timestamps)
-                            print(f"发现 {len(new_items)} 个新条目")
-                            no_new_content_count = 0
-                        else:
-                            no_new_content_count += 1
-                    else:
-                        no_new_content_count += 1
-                    
-                    # 使用Page Down键滚动
-                    self._send_key(win32con.VK_NEXT)
-                    sleep(0.3)  # 稍微增加等待时间
+                # 边滚动边写入存储，不等整个扫描完成
+                for names in source.backfill():
+                    items = self._parse_visible_items(names)
+                    if items and self.update_transcripts(items):
+                        backfilled += len(items)
+                        print(f"发现 {len(items)} 个新条目")
                 
                 self.initial_scan_done = True
-                print(f"初始扫描完成，共收集到 {len(collected_items)} 个条目")
+                self.backfill_seconds = time.monotonic() - started
+                print(f"初始扫描完成，共收集到 {backfilled} 个条目，耗时 {self.backfill_seconds:.2f} 秒")
             else:
                 # 已完成初始扫描，只获取当前可见内容
-                collected_items = self._parse_visible_items(list_control)
+                collected_items = self._parse_visible_items(source.read_names())
+                self.last_read = time.monotonic()
             
             return collected_items
             
@@ -176,91 +166,44 @@ class TranscriptManager:
             print(f"收集内容时出错: {e}")
             return collected_items
 
-    def _parse_visible_items(self, list_control) -> List[TranscriptItem]:
+    def _parse_visible_items(self, names: List[str]) -> List[TranscriptItem]:
         """解析当前可见的条目"""
         items = []
         try:
-            for item in list_control.GetChildren():
-                if item.ControlTypeName == "ListItemControl":
-                    transcript = self._parse_list_item(item)
-                    if transcript:
-                        key = f"{transcript.timestamp}|{transcript.content}"
-                        if key not in self.transcripts:
-                            items.append(transcript)
+            # 名字没有变化的项上次已经处理过，由指纹缓存跳过
+            for transcript in self.parser.parse_batch(names, self.fingerprints):
+                existing = self.transcripts.get(transcript.timestamp, transcript.speaker)
+                if not existing or existing.content != transcript.content:
+                    items.append(transcript)
             return items
         except Exception as e:
             print(f"解析可见条目时出错: {e}")
             return []
-
-    def _parse_list_item(self, item) -> TranscriptItem:
-        """解析单个ListItemControl"""
-        try:
-            if not item.Name:
-                return None
-            
-            name_parts = item.Name.split('\n')
-            if len(name_parts) < 2:
-                return None
-            
-            header = name_parts[0].strip()
-            content = name_parts[1].strip()
-            
-            time_match = re.search(r'\d{2}:\d{2}:\d{2}', header)
-            if not time_match:
-                return None
-            
-            timestamp = time_match.group(0)
-            speaker_part = header[:time_match.start()].strip()
-            
-            if speaker_part:
-                self.current_speaker = speaker_part
-            speaker = speaker_part if speaker_part else self.current_speaker
-            
-            return TranscriptItem(speaker=speaker, timestamp=timestamp, content=content)
-            
-        except Exception as e:
-            print(f"解析列表项时出错: {e}")
-            return None
     
     def update_transcripts(self, new_items: List[TranscriptItem]):
         """更新转录内容"""
-        updated = False
-        for item in new_items:
-            # 使用时间戳和说话者作为去重的key
-            dedup_key = f"{item.timestamp}_{item.speaker}"
+        # 识别修订并按 (timestamp, speaker) 合并，每条字幕每批只产生一次变化
+        changes = self.merger.merge_batch(self.transcripts, new_items)
+        if not changes:
+            return False
+        
+        journal = self._get_journal()
+        for item, is_new in changes:
+            # 日志只追加本批的最终状态
+            journal.append(item)
+            action = "添加新条目" if is_new else "修订条目"
+            print(f"{action}: [{item.timestamp}] {item.speaker}: {item.content}")
             
-            # 检查是否需要更新
-            should_update = False
-            if dedup_key not in self.latest_messages:
-                should_update = True
-            else:
-                # 如果新内容更长，则更新
-                if len(item.content) > len(self.latest_messages[dedup_key].content):
-                    # 删除旧内容
-                    old_key = f"{item.timestamp}|{self.latest_messages[dedup_key].content}"
-                    if old_key in self.transcripts:
-                        del self.transcripts[old_key]
-                    should_update = True
-
-            if should_update:
-                # 更新最新消息字典
-                self.latest_messages[dedup_key] = item
-                # 更新转录字典
-                key = f"{item.timestamp}|{item.content}"
-                self.transcripts[key] = item
-                self._update_earliest_timestamp(item.timestamp)
-                print(f"添加新条目: [{item.timestamp}] {item.speaker}: {item.content}")
-                updated = True
-                
-                # 通知UI更新
-                if self.message_callback:
-                    self.message_callback("transcript", item)
+            # 通知UI更新
+            if self.message_callback:
+                self.message_callback("transcript" if is_new else "transcript_revised", item)
         
-        # 如果有更新，保存文件
-        if updated:
-            self.save_to_file()
+        self._update_earliest_timestamp()
+        self.last_change = time.monotonic()
+        # 提交日志（按间隔批量fsync）
+        journal.commit()
         
-        return updated
+        return True
     
     def print_all_transcripts(self):
         """打印所有转录内容"""
@@ -273,13 +216,7 @@ class TranscriptManager:
                 print("没有找到任何转录内容")
                 return
             
-            # 按时间戳排序
-            sorted_items = sorted(
-                self.transcripts.values(),
-                key=lambda x: datetime.strptime(x.timestamp, '%H:%M:%S')
-            )
-            
-            for item in sorted_items:
+            for item in self.transcripts.iter_all():
                 print(f"[{item.timestamp}] {item.speaker}: {item.content}")
             
             print("-" * 60)
@@ -287,106 +224,157 @@ class TranscriptManager:
         except Exception as e:
             print(f"打印转录内容时出错: {e}")
 
-def monitor_transcript(message_callback=None):
+def default_transcript_dir() -> Path:
+    return Path(os.path.expanduser("~")) / "ZoomTranscript"
+
+def recover_journal(path) -> Path:
+    """把异常退出时留下的.journal日志压缩为.txt文件，返回生成的文件（日志为空时返回None）"""
+    path = Path(path)
+    clock = MeetingClock()
+    store = TranscriptStore()
+    # 每个 (timestamp, speaker) 取最后一次写入的内容，按第一次出现的顺序换算会议秒数
+    for (timestamp, speaker), content in TranscriptJournal.latest_records(path).items():
+        store.add(TranscriptItem(speaker, timestamp, content, clock.resolve(timestamp)))
+    output_path = None
+    if len(store):
+        match = JOURNAL_NAME_PATTERN.match(path.stem)
+        date, suffix = match.groups() if match else (path.stem, "")
+        earliest = store.earliest.timestamp.replace(':', '-')
+        latest = store.latest.timestamp.replace(':', '-')
+        output_path = path.with_name(f"zoom_{date}_{earliest}_{latest}{suffix}.txt")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            store.write_text(f)
+        print(f"已从转录日志恢复: {output_path}")
+    path.unlink()
+    return output_path
+
+def recover_journals(transcript_dir=None) -> List[Path]:
+    """启动时恢复目录中上次没有压缩的所有.journal日志，并删除残留的磁盘段目录"""
+    transcript_dir = Path(transcript_dir) if transcript_dir else default_transcript_dir()
+    if not transcript_dir.is_dir():
+        return []
+    # 长会议模式异常退出时留下的spill_*目录只是日志中已有内容的副本
+    for path in transcript_dir.glob("spill_*"):
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+            print(f"已删除残留的磁盘段目录: {path}")
+    recovered = []
+    for path in sorted(transcript_dir.glob("zoom_*.journal")):
+        try:
+            output_path = recover_journal(path)
+            if output_path:
+                recovered.append(output_path)
+        except Exception as e:
+            print(f"恢复转录日志 {path} 时出错: {e}")
+    return recovered
+
+def create_caption_source(kind: str = "zoom", replay_file: str = None,
+                          replay_speed: float = 1.0) -> CaptionSource:
+    """创建字幕来源：zoom（Windows UIAutomation）或 replay（回放录制文件/合成数据）"""
+    if kind == "replay":
+        if replay_file:
+            return ReplayCaptionSource.from_file(replay_file, speed=replay_speed)
+        return ReplayCaptionSource.synthetic(speed=replay_speed)
+    # 只有使用Zoom来源时才需要Windows依赖
+    from zoom_source import ZoomCaptionSource
+    return ZoomCaptionSource()
+
+def discover_caption_sources(kind: str = "zoom", replay_file: str = None,
+                             replay_speed: float = 1.0) -> Dict[str, Callable[[], CaptionSource]]:
+    """发现当前可以采集的所有字幕来源，返回 {流名称: 创建来源的函数}
+
+    zoom为每个打开的转录窗口一个来源；replay时replay_file可以是逗号分隔的多个录制文件。
+    """
+    if kind == "replay":
+        if not replay_file:
+            return {"replay": lambda: ReplayCaptionSource.synthetic(speed=replay_speed)}
+        files = [path.strip() for path in replay_file.split(',') if path.strip()]
+        return {Path(path).stem: (lambda path=path: ReplayCaptionSource.from_file(path, speed=replay_speed))
+                for path in files}
+    from zoom_source import ZoomCaptionSource
+    return {f"w{hwnd:x}": (lambda hwnd=hwnd: ZoomCaptionSource(hwnd))
+            for hwnd in ZoomCaptionSource.discover_windows()}
+
+def monitor_transcript(message_callback=None, source: CaptionSource = None,
+                       min_interval: float = 0.25, max_interval: float = 2.0,
+                       stop: threading.Event = None, **manager_options):
     print("开始监控转录文本...")
-    manager = TranscriptManager(message_callback)
+    manager = TranscriptManager(message_callback, **manager_options)
+    if source is None:
+        source = create_caption_source()
     
-    # 如果在主线程中运行，需要初始化UIAutomation
+    # 如果在主线程中运行，需要初始化来源（例如UIAutomation）
     if threading.current_thread() is threading.main_thread():
-        auto.InitializeUIAutomationInCurrentThread()
+        source.initialize_thread()
     
     # 返回manager实例，让UI可以直接使用
-    return manager, lambda: monitor_transcript_loop(manager)
+    return manager, lambda: monitor_transcript_loop(manager, source, min_interval, max_interval, stop=stop)
 
-def monitor_transcript_loop(manager):
-    """实际的监控循环"""
+def monitor_transcript_loop(manager, source: CaptionSource, min_interval: float = 0.25,
+                            max_interval: float = 2.0, retry_interval: float = 5.0,
+                            stop: threading.Event = None):
+    """实际的监控循环，设置stop后保存当前会议并退出"""
+    stop = stop or threading.Event()
+    # 重试间隔从很短开始指数增长，最长retry_interval秒
+    backoff = ReconnectBackoff(max_interval=retry_interval)
+    disconnected_at = None
     try:
-        while True:  # 外层循环
+        while not stop.is_set():  # 外层循环
             try:
-                # 查找Zoom字幕窗口
-                target_hwnd = None
-                found_windows = []
-                
-                def find_transcript_window(hwnd, extra):
-                    if win32gui.IsWindowVisible(hwnd):
-                        title = win32gui.GetWindowText(hwnd)
-                        class_name = win32gui.GetClassName(hwnd)
-                        if "转录" in title or "字幕" in title or "Transcript" in title or "Caption" in title:
-                            found_windows.append((hwnd, title, class_name))
-                    return True  # 总是返回True继续枚举
-                
-                print("\n正在查找Zoom转录窗口...")
-                win32gui.EnumWindows(find_transcript_window, None)
-                
-                # 在收集到的窗口中查找Zoom的窗口
-                for hwnd, title, class_name in found_windows:
-                    print(f"找到可能的窗口: Title='{title}', Class='{class_name}'")
-                    if class_name == "ZPLiveTranscriptWndClass":
-                        target_hwnd = hwnd
-                        print(f"到Zoom转录窗口!")
+                if not source.connect():
+                    if source.finished:
                         break
-                
-                if not target_hwnd:
-                    print("未找到Zoom转录窗口，请确保：")
-                    print("1. Zoom会议已经开始")
-                    print("2. 转录功能已经开启")
-                    print("3. 转录窗口已经打开")
-                    print("将在5秒后重试...")
-                    time.sleep(5)  # 等待5秒后重试
+                    if disconnected_at is None:
+                        disconnected_at = time.monotonic()
+                    delay = backoff.next_delay()
+                    print(f"将在{delay:.2f}秒后重试...")
+                    stop.wait(delay)  # 等待后重试
                     continue  # 继续外层循环，重新查找窗口
                 
-                # 使用找到的句柄创建UIAutomation控件
-                target_window = auto.ControlFromHandle(target_hwnd)
-                if not target_window:
-                    print("无法获取窗口控件，将在5秒后重试...")
-                    time.sleep(5)
-                    continue  # 继续外层循环，重新查找窗口
-                    
-                print(f"成功获取窗口控件: {win32gui.GetWindowText(target_hwnd)}")
-                
-                # 递归查找ListControl
-                def find_list_control(control):
-                    try:
-                        if control.ControlTypeName == "ListControl":
-                            return control
-                        
-                        for child in control.GetChildren():
-                            result = find_list_control(child)
-                            if result:
-                                return result
-                        return None
-                    except Exception as e:
-                        print(f"检查控件时出错: {e}")
-                        return None
-                
-                print("查找列表控件...")
-                list_control = find_list_control(target_window)
-                
-                if not list_control:
-                    print("未找到列表控件，将在5秒后重试...")
-                    time.sleep(5)
-                    continue  # 继续外层循环，重新查找窗口
+                backoff.reset()
+                if disconnected_at is not None:
+                    reconnect_time = time.monotonic() - disconnected_at
+                    manager.reconnect_times.add(reconnect_time)
+                    print(f"重新连接用时 {reconnect_time:.2f} 秒")
+                    disconnected_at = None
                 
-                print("找到列表控件，开始监控内容...")
+                # 有变化通知时由通知驱动，否则按字幕活跃程度自适应轮询
+                ingestor = CaptionIngestor(source, AdaptivePoller(min_interval, max_interval),
+                                           manager.latency)
+                print("使用变化通知读取字幕" if ingestor.event_driven else "使用自适应轮询读取字幕")
                 
-                # 内层循环：监控已找到的窗口
+                # 内层循环：监控已找到的字幕列表
                 while True:
                     try:
-                        items = manager._collect_all_content(list_control)
-                        if items and manager.update_transcripts(items):
+                        items = manager._collect_all_content(source)
+                        changed = bool(items) and manager.update_transcripts(items)
+                        ingestor.record(changed)
+                        if changed:
                             print(f"\n检测到新内容，当前总条目数: {len(manager.transcripts)}")
-                            manager.print_all_transcripts()
+                        else:
+                            manager.commit_journal()
+                        
+                        ingestor.wait()
                         
-                        time.sleep(1)
+                        if stop.is_set():
+                            manager.finalize()
+                            break
                         
-                        if not win32gui.IsWindow(target_hwnd):
+                        if not source.is_alive():
                             print("转录窗口已关闭，重新开始查找...")
+                            disconnected_at = time.monotonic()
+                            manager.finalize()
                             break
                         
                     except Exception as e:
                         print(f"监控过程中出错: {e}")
-                        time.sleep(1)
+                        # 本次读取的条目可能没有写入存储，下次全部重新解析
+                        manager.fingerprints.reset()
+                        stop.wait(1)
                         continue
+                
+                if source.finished or stop.is_set():
+                    break
 
             except KeyboardInterrupt:
                 break
@@ -394,10 +382,14 @@ def monitor_transcript_loop(manager):
                 print(f"发生错误: {e}")
                 import traceback
                 traceback.print_exc()
-                time.sleep(5)
+                if disconnected_at is None:
+                    disconnected_at = time.monotonic()
+                stop.wait(backoff.next_delay())
                 
     except Exception as e:
         print(f"监控循环出错: {e}")
+    finally:
+        source.close()
 
 if __name__ == "__main__":
     monitor_transcript()
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""紧凑的二进制转录归档格式
+
+用法:
+    python transcript_archive.py pack zoom_xxx.txt [zoom_xxx.ztr]
+    python transcript_archive.py unpack zoom_xxx.ztr [zoom_xxx.txt]
+    python transcript_archive.py stats zoom_xxx.ztr
+
+文件布局（小端）:
+    文件头   magic "ZTRA", version u16, 保留 u16, 条目数 u32, 说话者数 u32,
+             说话者表偏移 u64, 内容区偏移 u64
+    条目表   每条16字节: 会议秒数 i32, 说话者编号 u32, 内容偏移 u32, 内容长度 u32
+    说话者表 每个说话者: 长度 u16 + UTF-8字节
+    内容区   所有内容的UTF-8字节依次拼接
+
+读取时整个文件通过mmap映射，条目表和内容区不做拷贝，
+只有访问某条的content时才解码出字符串。
+"""
+import argparse
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from transcript_store import MeetingClock, TranscriptItem, format_clock, parse_transcript_line
+
+MAGIC = b"ZTRA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQ")
+RECORD = struct.Struct("<iIII")
+SPEAKER_LENGTH = struct.Struct("<H")
+
+
+class ArchivedSegment:
+    """归档中的一条字幕，content在访问时才从映射的内容区解码"""
+
+    __slots__ = ('_archive', 'seconds', 'speaker', '_offset', '_length')
+
+    def __init__(self, archive, seconds, speaker, offset, length):
+        self._archive = archive
+        self.seconds = seconds
+        self.speaker = speaker
+        self._offset = offset
+        self._length = length
+
+    @property
+    def timestamp(self) -> str:
+        return format_clock(self.seconds)
+
+    @property
+    def content(self) -> str:
+        return str(self._archive.content_bytes(self._offset, self._length), 'utf-8')
+
+    def to_item(self) -> TranscriptItem:
+        return TranscriptItem(self.speaker, self.timestamp, self.content, self.seconds)
+
+    def to_string(self) -> str:
+        return f"[{self.timestamp}] {self.speaker}: {self.content}"
+
+
+class TranscriptArchive:
+    """以mmap方式打开的二进制转录归档"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, _, self.count, speaker_count, speaker_offset, self._content_offset = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是转录归档文件: {path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"不支持的归档版本: {version}")
+        # 说话者很少，打开时一次解码
+        self.speakers: List[str] = []
+        position = speaker_offset
+        for _ in range(speaker_count):
+            (length,) = SPEAKER_LENGTH.unpack_from(self._mmap, position)
+            position += SPEAKER_LENGTH.size
+            self.speakers.append(self._view[position:position + length].tobytes().decode('utf-8'))
+            position += length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> ArchivedSegment:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        seconds, speaker_id, offset, length = RECORD.unpack_from(
+            self._mmap, HEADER.size + index * RECORD.size)
+        return ArchivedSegment(self, seconds, self.speakers[speaker_id], offset, length)
+
+    def __iter__(self) -> Iterator[ArchivedSegment]:
+        speakers = self.speakers
+        unpack_from = RECORD.unpack_from
+        for position in range(HEADER.size, HEADER.size + self.count * RECORD.size, RECORD.size):
+            seconds, speaker_id, offset, length = unpack_from(self._mmap, position)
+            yield ArchivedSegment(self, seconds, speakers[speaker_id], offset, length)
+
+    def content_bytes(self, offset: int, length: int) -> memoryview:
+        """返回内容区中一段字节的视图（不拷贝）"""
+        start = self._content_offset + offset
+        return self._view[start:start + length]
+
+    def close(self):
+        try:
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+            if not self._mmap.closed:
+                self._mmap.close()
+        except BufferError:
+            # 调用方仍持有content_bytes()返回的视图，映射交给垃圾回收释放
+            pass
+        self._file.close()
+
+
+def write_archive(items: Iterable, path):
+    """把按时间排序的条目写成二进制归档"""
+    speaker_ids = {}
+    records = []
+    blob = bytearray()
+    for item in items:
+        speaker_id = speaker_ids.setdefault(item.speaker, len(speaker_ids))
+        content = item.content.encode('utf-8')
+        records.append(RECORD.pack(item.seconds, speaker_id, len(blob), len(content)))
+        blob += content
+
+    speaker_table = bytearray()
+    for speaker in speaker_ids:
+        encoded = speaker.encode('utf-8')
+        speaker_table += SPEAKER_LENGTH.pack(len(encoded)) + encoded
+
+    speaker_offset = HEADER.size + len(records) * RECORD.size
+    content_offset = speaker_offset + len(speaker_table)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), len(speaker_ids),
+                            speaker_offset, content_offset))
+        f.write(b"".join(records))
+        f.write(speaker_table)
+        f.write(blob)
+
+
+def txt_to_archive(txt_path, archive_path):
+    """把 [HH:MM:SS] Speaker: content 格式的.txt转换为二进制归档，返回条目数"""
+    clock = MeetingClock()
+    items = []
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            item = parse_transcript_line(line, clock)
+            if item:
+                items.append(item)
+    write_archive(items, archive_path)
+    return len(items)
+
+
+def archive_to_txt(archive_path, txt_path):
+    """把二进制归档还原为.txt，返回条目数"""
+    with TranscriptArchive(archive_path) as archive, open(txt_path, 'w', encoding='utf-8') as f:
+        for segment in archive:
+            f.write(segment.to_string() + "\n")
+        return len(archive)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="转录文件与二进制归档互相转换")
+    parser.add_argument("command", choices=["pack", "unpack", "stats"])
+    parser.add_argument("source")
+    parser.add_argument("target", nargs="?")
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    if args.command == "pack":
+        target = Path(args.target) if args.target else source.with_suffix(".ztr")
+        count = txt_to_archive(source, target)
+        print(f"{count} 条 -> {target} ({source.stat().st_size} -> {target.stat().st_size} 字节)")
+    elif args.command == "unpack":
+        target = Path(args.target) if args.target else source.with_suffix(".txt")
+        count = archive_to_txt(source, target)
+        print(f"{count} 条 -> {target}")
+    else:
+        with TranscriptArchive(source) as archive:
+            print(f"条目: {len(archive)}  说话者: {len(archive.speakers)}  "
+                  f"文件大小: {source.stat().st_size} 字节")
+            if len(archive):
+                print(f"时间范围: {archive[0].timestamp} - {archive[-1].timestamp}")
+
+
+if __name__ == "__main__":
+    main()
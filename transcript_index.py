@@ -0,0 +1,194 @@
+"""~/ZoomTranscript 归档的全文倒排索引
+
+用法:
+    python transcript_index.py "release budget" --speaker Alice --from 2024-01-01 --to 2024-03-31
+
+每次查询前只重新索引新增或修改过的 zoom_*.txt 文件，索引保存在
+~/ZoomTranscript/.transcript_index.sqlite3。
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from transcript_store import parse_transcript_line
+
+FILE_DATE_PATTERN = re.compile(r'^zoom_(\d{4}-[^_]+-\d{2})_')
+# 英文/数字按词切分，中日韩文字按单字切分
+TOKEN_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]|[^\W_]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    meeting_date TEXT
+);
+CREATE INDEX IF NOT EXISTS files_date ON files(meeting_date);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    speaker TEXT NOT NULL COLLATE NOCASE,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_file ON segments(file_id);
+CREATE INDEX IF NOT EXISTS segments_speaker ON segments(speaker);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    segment_id INTEGER NOT NULL,
+    PRIMARY KEY (term, segment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_segment ON postings(segment_id);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """切分为小写的检索词"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def meeting_date(file_name: str) -> Optional[str]:
+    """从 zoom_YYYY-Mon-DD_*.txt 文件名中取出ISO格式的日期"""
+    match = FILE_DATE_PATTERN.match(file_name)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), '%Y-%b-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+class TranscriptIndex:
+    """转录归档目录的增量倒排索引"""
+
+    def __init__(self, transcript_dir=None, index_path=None):
+        self.transcript_dir = Path(transcript_dir or Path(os.path.expanduser("~")) / "ZoomTranscript")
+        self.index_path = Path(index_path or self.transcript_dir / ".transcript_index.sqlite3")
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def update(self) -> int:
+        """重新索引新增或修改过的文件，删除已不存在文件的索引，返回重新索引的文件数"""
+        known = {path: (file_id, mtime, size) for file_id, path, mtime, size
+                 in self.conn.execute("SELECT id, path, mtime, size FROM files")}
+        reindexed = 0
+        seen = set()
+        with self.conn:
+            for path in sorted(self.transcript_dir.glob("zoom_*.txt")):
+                stat = path.stat()
+                key = str(path)
+                seen.add(key)
+                entry = known.get(key)
+                if entry and entry[1] == stat.st_mtime and entry[2] == stat.st_size:
+                    continue
+                if entry:
+                    self._remove_file(entry[0])
+                self._index_file(path, stat)
+                reindexed += 1
+            for key, (file_id, _, _) in known.items():
+                if key not in seen:
+                    self._remove_file(file_id)
+        return reindexed
+
+    def search(self, query: str = "", speaker: str = None, date_from: str = None,
+               date_to: str = None, limit: int = 50) -> List[dict]:
+        """查找包含所有检索词的条目，可按说话者和日期（YYYY-MM-DD）过滤"""
+        conditions = []
+        params = []
+        terms = sorted(set(tokenize(query)))
+        if terms:
+            subquery = " INTERSECT ".join("SELECT segment_id FROM postings WHERE term = ?" for _ in terms)
+            conditions.append(f"s.id IN ({subquery})")
+            params.extend(terms)
+        if speaker:
+            conditions.append("s.speaker = ?")
+            params.append(speaker)
+        if date_from:
+            conditions.append("f.meeting_date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("f.meeting_date <= ?")
+            params.append(date_to)
+        where = " AND ".join(conditions) if conditions else "1"
+        rows = self.conn.execute(
+            f"SELECT f.path, f.meeting_date, s.timestamp, s.speaker, s.content "
+            f"FROM segments s JOIN files f ON f.id = s.file_id WHERE {where} "
+            f"ORDER BY f.meeting_date, f.path, s.id LIMIT ?",
+            params + [limit]
+        )
+        return [
+            {"meeting": Path(path).name, "date": date, "timestamp": timestamp,
+             "speaker": speaker_name, "content": content}
+            for path, date, timestamp, speaker_name, content in rows
+        ]
+
+    def _index_file(self, path: Path, stat):
+        cursor = self.conn.execute(
+            "INSERT INTO files (path, mtime, size, meeting_date) VALUES (?, ?, ?, ?)",
+            (str(path), stat.st_mtime, stat.st_size, meeting_date(path.name))
+        )
+        file_id = cursor.lastrowid
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                item = parse_transcript_line(line)
+                if not item:
+                    continue
+                timestamp, speaker, content = item.timestamp, item.speaker, item.content
+                segment_id = self.conn.execute(
+                    "INSERT INTO segments (file_id, timestamp, speaker, content) VALUES (?, ?, ?, ?)",
+                    (file_id, timestamp, speaker, content)
+                ).lastrowid
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO postings (term, segment_id) VALUES (?, ?)",
+                    [(term, segment_id) for term in set(tokenize(f"{speaker} {content}"))]
+                )
+
+    def _remove_file(self, file_id: int):
+        self.conn.execute(
+            "DELETE FROM postings WHERE segment_id IN (SELECT id FROM segments WHERE file_id = ?)",
+            (file_id,)
+        )
+        self.conn.execute("DELETE FROM segments WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查找 ~/ZoomTranscript 中的历史会议内容")
+    parser.add_argument("query", nargs="?", default="", help="检索词（全部匹配）")
+    parser.add_argument("--speaker", help="只返回该说话者的条目")
+    parser.add_argument("--from", dest="date_from", help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="结束日期 YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=50, help="最多返回的条目数")
+    parser.add_argument("--dir", help="转录目录，默认 ~/ZoomTranscript")
+    args = parser.parse_args()
+
+    index = TranscriptIndex(args.dir)
+    try:
+        started = time.perf_counter()
+        reindexed = index.update()
+        index_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = index.search(args.query, args.speaker, args.date_from, args.date_to, args.limit)
+        query_ms = (time.perf_counter() - started) * 1000
+
+        for result in results:
+            print(f"{result['meeting']} {result['date'] or '?'} "
+                  f"[{result['timestamp']}] {result['speaker']}: {result['content']}")
+        print(f"{len(results)} 条结果，查询 {query_ms:.1f} ms（重新索引 {reindexed} 个文件，{index_ms:.1f} ms）")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
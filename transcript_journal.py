@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+
+class TranscriptJournal:
+    """只追加写入的转录日志
+
+    每个新增或修订的条目以一行JSON追加到同一个日志文件，
+    写入成本只与新数据量相关；fsync按配置的间隔批量执行。
+    """
+
+    def __init__(self, path, fsync_interval: float = 5.0):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, item):
+        """追加一个新增或修订的条目"""
+        record = json.dumps(
+            {"t": item.timestamp, "s": item.speaker, "c": item.content},
+            ensure_ascii=False
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(record + "\n")
+            self._dirty = True
+
+    def commit(self, force: bool = False):
+        """刷新缓冲区，距上次fsync超过间隔时落盘"""
+        with self._lock:
+            if self._file is None or not self._dirty:
+                return
+            self._file.flush()
+            now = time.monotonic()
+            if force or now - self._last_sync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+                self._dirty = False
+
+    def close(self):
+        """落盘并关闭日志文件"""
+        self.commit(force=True)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """关闭并删除日志文件（压缩完成后调用）"""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def replay(path) -> Iterator[Tuple[str, str, str]]:
+        """按写入顺序读取日志中的 (timestamp, speaker, content) 记录"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时最后一行可能写了一半
+                    continue
+                yield record["t"], record["s"], record["c"]
+
+    @staticmethod
+    def latest_records(path) -> Dict[Tuple[str, str], str]:
+        """重放日志，返回每个 (timestamp, speaker) 最后一次写入的内容"""
+        latest = {}
+        for timestamp, speaker, content in TranscriptJournal.replay(path):
+            latest[(timestamp, speaker)] = content
+        return latest
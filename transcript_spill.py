@@ -0,0 +1,73 @@
+import json
+import mmap
+import shutil
+from pathlib import Path
+from typing import Iterator, List
+
+from transcript_store import TranscriptItem
+
+
+class SpillSegment:
+    """一个已写入磁盘的段文件，内存中只保留时间范围和条数"""
+
+    __slots__ = ('path', 'first_seconds', 'last_seconds', 'count')
+
+    def __init__(self, path: Path, first_seconds: int, last_seconds: int, count: int):
+        self.path = path
+        self.first_seconds = first_seconds
+        self.last_seconds = last_seconds
+        self.count = count
+
+    def __iter__(self) -> Iterator[TranscriptItem]:
+        """通过mmap逐行读取段文件中的条目"""
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                for line in iter(m.readline, b''):
+                    seconds, timestamp, speaker, content = json.loads(line)
+                    yield TranscriptItem(speaker, timestamp, content, seconds)
+
+
+class SegmentSpill:
+    """长会议模式下保存被移出内存的旧条目
+
+    每次移出的一批条目写成一个只读段文件（每行一个JSON数组），
+    读取时按时间范围挑选段文件并用mmap扫描。
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.segments: List[SpillSegment] = []
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments)
+
+    def write(self, items: list):
+        """把一批按时间排序的条目写成新的段文件"""
+        if not items:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"segment_{len(self.segments):05d}.seg"
+        with open(path, 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps([item.seconds, item.timestamp, item.speaker, item.content],
+                                   ensure_ascii=False))
+                f.write("\n")
+        self.segments.append(SpillSegment(path, items[0].seconds, items[-1].seconds, len(items)))
+
+    def __iter__(self) -> Iterator[TranscriptItem]:
+        for segment in self.segments:
+            yield from segment
+
+    def between(self, start_seconds: int, end_seconds: int) -> Iterator[TranscriptItem]:
+        """返回时间范围内的条目，只读取范围重叠的段文件"""
+        for segment in self.segments:
+            if segment.last_seconds < start_seconds or segment.first_seconds > end_seconds:
+                continue
+            for item in segment:
+                if start_seconds <= item.seconds <= end_seconds:
+                    yield item
+
+    def clear(self):
+        """删除所有段文件"""
+        self.segments = []
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,385 @@
+import bisect
+import re
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def parse_clock(timestamp: str) -> int:
+    """将HH:MM:SS格式的时间戳转换为当天的秒数"""
+    hours, minutes, seconds = timestamp.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+SECONDS_PER_DAY = 24 * 3600
+
+# TranscriptItem.to_string() 写出的行格式: [HH:MM:SS] Speaker: content
+TRANSCRIPT_LINE_PATTERN = re.compile(r'^\[(\d{2}:\d{2}:\d{2})\] ([^:]*): (.*)$')
+
+
+def format_clock(seconds: int) -> str:
+    """将秒数转换为HH:MM:SS格式（跨午夜的秒数按当天时间显示）"""
+    seconds %= SECONDS_PER_DAY
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class MeetingClock:
+    """把HH:MM:SS换算为会议内单调递增的秒数
+
+    Zoom字幕只有时分秒，会议跨越午夜时时间戳会从23:59:59回到00:00:00。
+    与已见过的最晚时间相差超过半天时，认为跨越了午夜。
+    """
+
+    ROLLOVER_THRESHOLD = SECONDS_PER_DAY // 2
+
+    def __init__(self):
+        self._day_offset = 0
+        self._latest = None
+
+    def resolve(self, timestamp: str) -> int:
+        """返回时间戳对应的会议秒数"""
+        seconds = parse_clock(timestamp) + self._day_offset
+        if self._latest is not None:
+            if seconds < self._latest - self.ROLLOVER_THRESHOLD:
+                # 跨过午夜
+                self._day_offset += SECONDS_PER_DAY
+                seconds += SECONDS_PER_DAY
+            elif seconds > self._latest + self.ROLLOVER_THRESHOLD and self._day_offset:
+                # 跨午夜之后又收到午夜前条目的修订
+                seconds -= SECONDS_PER_DAY
+        if self._latest is None or seconds > self._latest:
+            self._latest = seconds
+        return seconds
+
+
+class TranscriptItem:
+    """字幕条目
+
+    使用__slots__减少内存，seconds在解析时计算一次，说话者名字做字符串驻留。
+    """
+
+    __slots__ = ('speaker', 'timestamp', 'content', 'seconds')
+
+    def __init__(self, speaker: str, timestamp: str, content: str, seconds: int = None):
+        self.speaker = sys.intern(speaker)
+        self.timestamp = timestamp
+        self.content = content
+        self.seconds = parse_clock(timestamp) if seconds is None else seconds
+
+    def __repr__(self) -> str:
+        return (f"TranscriptItem(speaker={self.speaker!r}, timestamp={self.timestamp!r}, "
+                f"content={self.content!r})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TranscriptItem):
+            return NotImplemented
+        return (self.speaker == other.speaker and self.timestamp == other.timestamp
+                and self.content == other.content)
+
+    def to_string(self) -> str:
+        """转换为字符串格式"""
+        return f"[{self.timestamp}] {self.speaker}: {self.content}"
+
+
+def parse_transcript_line(line: str, clock: "MeetingClock" = None):
+    """解析.txt转录文件中的一行，格式不符时返回None"""
+    match = TRANSCRIPT_LINE_PATTERN.match(line.rstrip('\r\n'))
+    if not match:
+        return None
+    timestamp, speaker, content = match.groups()
+    seconds = clock.resolve(timestamp) if clock else None
+    return TranscriptItem(speaker, timestamp, content, seconds)
+
+
+class TranscriptStore:
+    """按时间有序保存字幕条目的存储
+
+    条目按 (秒数, 到达顺序) 排序保存，插入和修订通过二分查找定位，
+    遍历时已经是时间顺序，调用方不需要再排序。
+
+    每次新增或修订都会增加version；text()缓存渲染好的全文，
+    只重新拼接第一个改动位置之后的行。
+
+    设置hot_window和spill后进入长会议模式：内存中只保留最近hot_window条，
+    更早的条目按spill_chunk成批写入磁盘段文件。items()/text()只覆盖内存中的条目，
+    iter_all()/write_text()/search()/between()会同时读取磁盘上的部分。
+    """
+
+    def __init__(self, hot_window: int = 0, spill=None, spill_chunk: int = 500):
+        # 有序的排序键 (秒数, 到达序号)，与 _items 一一对应
+        self._keys: List[Tuple[int, int]] = []
+        self._items: list = []
+        # 每个条目最后一次新增或修订时的version，与 _items 一一对应
+        self._changed: List[int] = []
+        # (timestamp, speaker) -> 排序键，用于去重和修订
+        self._index: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._seq = 0
+        self._lock = threading.RLock()
+        self.version = 0
+        # 所有条目内容的累计字符数（修订时按差值更新，写入磁盘后不减少）
+        self.content_chars = 0
+        # 渲染缓存：每行文本（含换行符）、每行在_text中的起始位置
+        self._lines: List[str] = []
+        self._offsets: List[int] = []
+        self._text = ""
+        self._dirty_from: Optional[int] = None
+        # 长会议模式
+        self.hot_window = hot_window
+        self.spill_chunk = spill_chunk
+        self._spill = spill
+        self._spilled = 0
+        self._spilled_earliest = None
+        # 最后一个写入磁盘的条目的排序键；不在内存中、时间不晚于它的条目被忽略
+        self._spilled_boundary: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._items)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.items())
+
+    def items(self) -> list:
+        """按时间顺序返回所有条目的快照"""
+        with self._lock:
+            return list(self._items)
+
+    def get(self, timestamp: str, speaker: str):
+        """根据时间戳和说话者获取条目"""
+        with self._lock:
+            key = self._index.get((timestamp, speaker))
+            if key is None:
+                return None
+            return self._items[self._position(key)]
+
+    def is_spilled(self, item) -> bool:
+        """条目是否属于已经写入磁盘的部分（不再接受修订，也不再插入更早的条目）"""
+        with self._lock:
+            return self._behind_spill(item, (item.timestamp, item.speaker))
+
+    def add(self, item) -> bool:
+        """添加或修订条目，返回是否为新条目；属于已写入磁盘部分的条目被忽略"""
+        with self._lock:
+            dedup_key = (item.timestamp, item.speaker)
+            if self._behind_spill(item, dedup_key):
+                return False
+            key = self._index.get(dedup_key)
+            line = item.to_string() + "\n"
+            self.version += 1
+            if key is not None:
+                pos = self._position(key)
+                self.content_chars += len(item.content) - len(self._items[pos].content)
+                self._items[pos] = item
+                self._lines[pos] = line
+                self._changed[pos] = self.version
+                self._mark_dirty(pos)
+                return False
+
+            key = (item.seconds, self._seq)
+            self._seq += 1
+            self.content_chars += len(item.content)
+            # 字幕基本按时间顺序到达，多数情况下直接追加到末尾
+            if not self._keys or key >= self._keys[-1]:
+                pos = len(self._keys)
+                self._keys.append(key)
+                self._items.append(item)
+                self._lines.append(line)
+                self._changed.append(self.version)
+            else:
+                pos = bisect.bisect_right(self._keys, key)
+                self._keys.insert(pos, key)
+                self._items.insert(pos, item)
+                self._lines.insert(pos, line)
+                self._changed.insert(pos, self.version)
+            self._index[dedup_key] = key
+            self._mark_dirty(pos)
+            self._maybe_spill()
+            return True
+
+    def text(self) -> str:
+        """返回按时间排序的全文，每行一个条目"""
+        with self._lock:
+            start = self._dirty_from
+            if start is None:
+                return self._text
+            # 保留改动位置之前已渲染的部分，只拼接之后的行
+            if start < len(self._offsets):
+                prefix = self._text[:self._offsets[start]]
+                del self._offsets[start:]
+            else:
+                prefix = self._text
+            position = len(prefix)
+            for line in self._lines[start:]:
+                self._offsets.append(position)
+                position += len(line)
+            self._text = prefix + "".join(self._lines[start:])
+            self._dirty_from = None
+            return self._text
+
+    def snapshot(self) -> Tuple[int, str]:
+        """返回 (version, text)，同一版本的调用方可以共享同一份文本"""
+        with self._lock:
+            return self.version, self.text()
+
+    def iter_all(self) -> Iterator:
+        """按时间顺序遍历包括磁盘段文件在内的所有条目
+
+        段文件列表和内存中的条目在同一次加锁中取快照，遍历期间发生的写入磁盘
+        不会让条目被跳过或重复；读取段文件时不持有锁。
+        """
+        with self._lock:
+            segments = list(self._spill.segments) if self._spill is not None else []
+            items = list(self._items)
+        for segment in segments:
+            yield from segment
+        yield from items
+
+    def write_text(self, f):
+        """把包括磁盘段文件在内的全文写入文件对象"""
+        with self._lock:
+            if self._spill is not None:
+                for item in self._spill:
+                    f.write(item.to_string() + "\n")
+            f.write(self.text())
+
+    def full_text(self) -> str:
+        """返回包括磁盘段文件在内的全文"""
+        with self._lock:
+            if not self._spilled:
+                return self.text()
+            spilled = "".join(item.to_string() + "\n" for item in self._spill)
+            return spilled + self.text()
+
+    def search(self, term: str) -> list:
+        """不区分大小写地查找内容或说话者包含term的条目"""
+        term = term.lower()
+        return [item for item in self.iter_all()
+                if term in item.content.lower() or term in item.speaker.lower()]
+
+    def between(self, start: str, end: str) -> list:
+        """返回时间戳在 [start, end] 区间内的条目"""
+        with self._lock:
+            start_seconds = self._resolve_query(start)
+            end_seconds = self._resolve_query(end)
+            if end_seconds < start_seconds:
+                end_seconds += SECONDS_PER_DAY
+            items = []
+            if self._spill is not None:
+                items.extend(self._spill.between(start_seconds, end_seconds))
+            items.extend(self._slice(start_seconds, end_seconds))
+            return items
+
+    def after(self, seconds: int) -> list:
+        """返回会议秒数晚于seconds的条目（包括磁盘段文件中的），供增量处理"""
+        with self._lock:
+            items = []
+            if self._spilled and self._spill is not None:
+                end = self._keys[0][0] if self._keys else seconds + SECONDS_PER_DAY * 2
+                items.extend(self._spill.between(seconds + 1, end))
+            lo = bisect.bisect_left(self._keys, (seconds + 1, -1))
+            items.extend(self._items[lo:])
+            return items
+
+    def changed_since(self, version: int, seconds: int) -> list:
+        """内存中会议秒数不晚于seconds、在version之后新增或修订过的条目"""
+        with self._lock:
+            hi = bisect.bisect_left(self._keys, (seconds + 1, -1))
+            return [item for item, changed in zip(self._items[:hi], self._changed[:hi])
+                    if changed > version]
+
+    def last_minutes(self, minutes: float) -> list:
+        """返回最近N分钟内的条目（相对于最新条目的时间）"""
+        with self._lock:
+            if not self._keys:
+                return []
+            end = self._keys[-1][0]
+            return self._slice(end - int(minutes * 60), end)
+
+    @property
+    def memory_count(self) -> int:
+        """内存中的条目数（长会议模式下不含磁盘段文件中的条目）"""
+        return len(self._items)
+
+    def window(self, start: int, stop: int) -> list:
+        """按时间顺序返回内存中第start到stop个条目，供虚拟化的转录视图按位置读取"""
+        with self._lock:
+            return self._items[max(0, start):stop]
+
+    def position_of(self, timestamp: str) -> int:
+        """内存中第一个不早于timestamp的条目的位置"""
+        with self._lock:
+            if not self._keys:
+                return 0
+            return bisect.bisect_left(self._keys, (self._resolve_query(timestamp), -1))
+
+    @property
+    def earliest(self):
+        """最早的条目"""
+        with self._lock:
+            if self._spilled_earliest is not None:
+                return self._spilled_earliest
+            return self._items[0] if self._items else None
+
+    @property
+    def latest(self):
+        """最晚的条目"""
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+    def _resolve_query(self, timestamp: str) -> int:
+        """把查询用的HH:MM:SS换算为会议秒数，早于会议开始时按次日处理"""
+        seconds = parse_clock(timestamp)
+        earliest = self.earliest
+        if earliest and seconds < earliest.seconds and seconds + SECONDS_PER_DAY <= self._keys[-1][0]:
+            seconds += SECONDS_PER_DAY
+        return seconds
+
+    def close(self):
+        """删除长会议模式下的磁盘段文件"""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.clear()
+
+    def _maybe_spill(self):
+        """超出hot_window + spill_chunk时，把最旧的条目写入磁盘"""
+        if not self.hot_window or self._spill is None:
+            return
+        if len(self._items) <= self.hot_window + self.spill_chunk:
+            return
+        count = len(self._items) - self.hot_window
+        spilled = self._items[:count]
+        self._spill.write(spilled)
+        if self._spilled_earliest is None:
+            self._spilled_earliest = spilled[0]
+        self._spilled += count
+        # 移出磁盘的条目不再修订，否则修订会作为新条目插入内存，在磁盘部分之后重复出现
+        for item in spilled:
+            self._index.pop((item.timestamp, item.speaker), None)
+        self._spilled_boundary = self._keys[count - 1]
+        del self._keys[:count]
+        del self._items[:count]
+        del self._lines[:count]
+        del self._changed[:count]
+        self._offsets = []
+        self._text = ""
+        self._dirty_from = 0
+
+    def _behind_spill(self, item, dedup_key) -> bool:
+        """不在内存中，且时间不晚于最后一个写入磁盘的条目"""
+        return (self._spilled_boundary is not None and dedup_key not in self._index
+                and item.seconds <= self._spilled_boundary[0])
+
+    def _mark_dirty(self, pos: int):
+        if self._dirty_from is None or pos < self._dirty_from:
+            self._dirty_from = pos
+
+    def _position(self, key: Tuple[int, int]) -> int:
+        # 修订基本发生在最新的条目上，先检查末尾
+        if self._keys and self._keys[-1] == key:
+            return len(self._keys) - 1
+        return bisect.bisect_left(self._keys, key)
+
+    def _slice(self, start_seconds: int, end_seconds: int) -> list:
+        with self._lock:
+            lo = bisect.bisect_left(self._keys, (start_seconds, -1))
+            hi = bisect.bisect_left(self._keys, (end_seconds + 1, -1))
+            return self._items[lo:hi]
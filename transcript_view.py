@@ -0,0 +1,184 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional, Tuple
+
+from transcript_store import TranscriptStore
+
+
+class TranscriptViewport:
+    """虚拟化转录视图的位置计算，不依赖Tk
+
+    top是视口中第一条的位置，visible是视口能显示的条数。
+    实际渲染 [top - margin, top + visible + margin) 范围内的条目，
+    在这个范围内滚动不需要重新渲染。follow为True时视口跟随最新的条目。
+    """
+
+    def __init__(self, visible: int = 30, margin: int = None):
+        self.total = 0
+        self.top = 0
+        self.visible = visible
+        self.margin = margin
+        self.follow = True
+        # 当前渲染的范围和存储版本
+        self.rendered: Tuple[int, int, int] = (0, 0, -1)
+
+    def set_total(self, total: int):
+        self.total = total
+        if self.follow:
+            self.top = self._max_top()
+        else:
+            self.top = min(self.top, self._max_top())
+
+    def set_visible(self, visible: int):
+        self.visible = max(1, visible)
+        self.set_total(self.total)
+
+    def scroll(self, rows: int):
+        """滚动rows条，向上滚动时停止跟随，滚到底部时恢复跟随"""
+        self.top = max(0, min(self._max_top(), self.top + rows))
+        self.follow = self.top >= self._max_top()
+
+    def jump(self, position: int):
+        """把position放到视口顶部"""
+        self.follow = False
+        self.top = max(0, min(self._max_top(), position))
+
+    def follow_tail(self):
+        self.follow = True
+        self.top = self._max_top()
+
+    def render_range(self) -> Tuple[int, int]:
+        margin = self.visible if self.margin is None else self.margin
+        return max(0, self.top - margin), min(self.total, self.top + self.visible + margin)
+
+    def needs_render(self, version: int) -> bool:
+        """存储有变化，或视口接近已渲染范围的边缘时需要重新渲染"""
+        start, stop, rendered_version = self.rendered
+        if version != rendered_version:
+            return True
+        margin = self.visible if self.margin is None else self.margin
+        if self.top < start or self.top + self.visible > stop:
+            return True
+        near_top = start > 0 and self.top - start < margin // 2
+        near_bottom = stop < self.total and stop - (self.top + self.visible) < margin // 2
+        return near_top or near_bottom
+
+    def _max_top(self) -> int:
+        return max(0, self.total - self.visible)
+
+
+class VirtualTranscriptView(ttk.Frame):
+    """只渲染视口附近条目的转录面板
+
+    从TranscriptStore按位置读取条目，Text中最多只有视口条数的三倍，
+    内存和重绘开销与会议长短无关。支持跳转到指定时间和跟随最新内容。
+    """
+
+    # 鼠标滚轮每一格滚动的条数
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, get_store: Callable[[], Optional[TranscriptStore]]):
+        super().__init__(parent)
+        self.get_store = get_store
+        self.viewport = TranscriptViewport()
+        self._refresh_pending = False
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=tk.X)
+        ttk.Label(toolbar, text="Jump to").pack(side=tk.LEFT, padx=2)
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(toolbar, textvariable=self.jump_var, width=10)
+        jump_entry.pack(side=tk.LEFT, padx=2)
+        jump_entry.bind('<Return>', lambda e: self.jump_to_time(self.jump_var.get()))
+        ttk.Button(toolbar, text="Go", command=lambda: self.jump_to_time(self.jump_var.get())).pack(
+            side=tk.LEFT, padx=2)
+        self.follow_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(toolbar, text="Follow", variable=self.follow_var,
+                        command=self._toggle_follow).pack(side=tk.LEFT, padx=2)
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(body, wrap=tk.WORD, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.bind('<MouseWheel>',
+                       lambda e: self._scroll(-self.WHEEL_ROWS if e.delta > 0 else self.WHEEL_ROWS))
+        self.text.bind('<Button-4>', lambda e: self._scroll(-self.WHEEL_ROWS))
+        self.text.bind('<Button-5>', lambda e: self._scroll(self.WHEEL_ROWS))
+        self.text.bind('<Configure>', lambda e: self.invalidate())
+
+    def invalidate(self):
+        """存储或视口有变化，在空闲时刷新一次"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def refresh(self):
+        self._refresh_pending = False
+        store = self.get_store()
+        if store is None:
+            return
+        viewport = self.viewport
+        linespace = max(1, int(self.text.tk.call('font', 'metrics', self.text.cget('font'), '-linespace')))
+        viewport.set_visible(self.text.winfo_height() // linespace)
+        viewport.set_total(store.memory_count)
+        self.follow_var.set(viewport.follow)
+
+        if viewport.needs_render(store.version):
+            start, stop = viewport.render_range()
+            version = store.version
+            lines = "".join(item.to_string() + "\n" for item in store.window(start, stop))
+            self.text.configure(state=tk.NORMAL)
+            self.text.delete("1.0", tk.END)
+            self.text.insert("1.0", lines)
+            self.text.configure(state=tk.DISABLED)
+            viewport.rendered = (start, stop, version)
+
+        start = viewport.rendered[0]
+        if viewport.follow:
+            self.text.see(tk.END)
+        else:
+            self.text.yview(f"{viewport.top - start + 1}.0")
+        if viewport.total:
+            self.scrollbar.set(viewport.top / viewport.total,
+                               min(1.0, (viewport.top + viewport.visible) / viewport.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def jump_to_time(self, timestamp: str):
+        """跳转到第一个不早于timestamp（HH:MM:SS）的条目"""
+        store = self.get_store()
+        if store is None:
+            return
+        try:
+            position = store.position_of(timestamp.strip())
+        except ValueError:
+            print(f"无效的时间: {timestamp}")
+            return
+        self.viewport.jump(position)
+        self.invalidate()
+
+    def _toggle_follow(self):
+        if self.follow_var.get():
+            self.viewport.follow_tail()
+        else:
+            self.viewport.follow = False
+        self.invalidate()
+
+    def _scroll(self, rows: int):
+        self.viewport.scroll(rows)
+        self.invalidate()
+        return "break"
+
+    def _on_scrollbar(self, action, *args):
+        viewport = self.viewport
+        if action == "moveto":
+            viewport.jump(int(float(args[0]) * viewport.total))
+            if viewport.top >= viewport.total - viewport.visible:
+                viewport.follow_tail()
+        elif action == "scroll":
+            amount = int(args[0])
+            viewport.scroll(amount * viewport.visible if args[1] == "pages" else amount)
+        self.invalidate()
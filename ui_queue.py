@@ -0,0 +1,69 @@
+import collections
+import threading
+import time
+from typing import Callable, Hashable
+
+from caption_ingest import LatencyStats
+
+
+class CoalescingQueue:
+    """从工作线程向Tk线程传递消息的队列
+
+    带key的消息在被处理之前合并：同一条字幕的多次修订只渲染最新的内容，
+    但延迟从第一次入队算起。队列从空变为非空时调用一次wakeup，
+    让Tk线程立即处理，而不是等下一次定时器。
+    """
+
+    def __init__(self, wakeup: Callable[[], None] = None):
+        self.wakeup = wakeup
+        # 每项为 [消息类型, 内容, 入队的time.monotonic()时间, key]
+        self._entries = collections.deque()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake_pending = False
+        self.coalesced = 0
+        # 入队到处理完成的延迟
+        self.latency = LatencyStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, msg_type: str, content, key: Hashable = None):
+        with self._lock:
+            entry = self._pending.get(key) if key is not None else None
+            if entry is not None:
+                # 第一次入队时是新条目，合并后仍按新条目处理
+                if msg_type != "transcript_revised":
+                    entry[0] = msg_type
+                entry[1] = content
+                self.coalesced += 1
+                return
+            entry = [msg_type, content, time.monotonic(), key]
+            self._entries.append(entry)
+            if key is not None:
+                self._pending[key] = entry
+            wake = not self._wake_pending
+            self._wake_pending = True
+        if wake and self.wakeup:
+            self.wakeup()
+
+    def drain(self, handler: Callable[[str, object], None], budget: float = None) -> bool:
+        """按入队顺序处理消息，超过budget秒后停止；还有剩余消息时返回True"""
+        deadline = time.monotonic() + budget if budget is not None else None
+        with self._lock:
+            self._wake_pending = False
+        while True:
+            with self._lock:
+                if not self._entries:
+                    return False
+                msg_type, content, enqueued, key = entry = self._entries.popleft()
+                if key is not None and self._pending.get(key) is entry:
+                    del self._pending[key]
+            handler(msg_type, content)
+            self.latency.add(time.monotonic() - enqueued)
+            if deadline is not None and time.monotonic() >= deadline:
+                with self._lock:
+                    return bool(self._entries)
+
+    def stats(self) -> str:
+        return f"队列 {len(self)} 条  合并 {self.coalesced} 条  入队到渲染 {self.latency.summary()}"
@@ -0,0 +1,264 @@
+import time
+from time import sleep
+from typing import Iterator, List, Optional
+
+import comtypes
+import uiautomation as auto
+import win32api
+import win32con
+import win32gui
+from uiautomation.uiautomation import _AutomationClient
+
+from caption_backfill import BackfillScanner
+from caption_source import CaptionSource
+
+
+def _create_change_handler(callback):
+    """创建同时实现StructureChanged和PropertyChanged事件接口的COM对象，事件到达时调用callback()"""
+    core = _AutomationClient.instance().UIAutomationCore
+
+    class ListChangeHandler(comtypes.COMObject):
+        _com_interfaces_ = [core.IUIAutomationStructureChangedEventHandler,
+                            core.IUIAutomationPropertyChangedEventHandler]
+
+        def HandleStructureChangedEvent(self, sender, change_type, runtime_id):
+            # 新增、删除列表项
+            callback()
+
+        def HandlePropertyChangedEvent(self, sender, property_id, new_value):
+            # 列表项的Name改变：Zoom原位修订字幕
+            callback()
+
+    return ListChangeHandler()
+
+
+class ZoomCaptionSource(CaptionSource):
+    """通过Windows UIAutomation读取Zoom转录窗口中的字幕列表
+
+    指定hwnd时只读取这一个窗口（同时采集多个会议），窗口销毁后来源结束；
+    否则连接时查找任意一个Zoom转录窗口。
+    列表控件上注册UIA的StructureChanged和Name属性的PropertyChanged事件，
+    字幕变化时唤醒读取；注册失败时由调用方退回自适应轮询。
+    """
+
+    WINDOW_CLASS = "ZPLiveTranscriptWndClass"
+
+    def __init__(self, hwnd=None):
+        self.hwnd = hwnd
+        self.target_hwnd = None
+        self.list_control = None
+        # 从窗口到ListControl的子控件序号，窗口重建后先沿这条路径查找
+        self.control_path = None
+        # 已注册的UIA事件处理器和注册时的列表元素
+        self._handler = None
+        self._handler_element = None
+        # 上次读取之后第一个事件到达的时间、上次读取到的变化的时间
+        self._event_time = None
+        self._change_time = None
+
+    def initialize_thread(self):
+        auto.InitializeUIAutomationInCurrentThread()
+
+    def thread_context(self):
+        return auto.UIAutomationInitializerInThread()
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.hwnd) and not win32gui.IsWindow(self.hwnd)
+
+    @classmethod
+    def discover_windows(cls) -> List[int]:
+        """返回所有可见的Zoom转录窗口句柄"""
+        hwnds = []
+
+        def collect(hwnd, extra):
+            if win32gui.IsWindowVisible(hwnd) and win32gui.GetClassName(hwnd) == cls.WINDOW_CLASS:
+                hwnds.append(hwnd)
+            return True
+
+        win32gui.EnumWindows(collect, None)
+        return hwnds
+
+    def connect(self) -> bool:
+        """查找Zoom字幕窗口和其中的ListControl
+
+        先按窗口类名直接查找窗口，沿上次记住的控件路径找ListControl；
+        找不到时才枚举所有顶层窗口、遍历整个控件树。
+        """
+        self.target_hwnd = None
+        self.list_control = None
+
+        if self.hwnd:
+            target_hwnd = self.hwnd if win32gui.IsWindow(self.hwnd) else None
+        else:
+            try:
+                target_hwnd = win32gui.FindWindow(self.WINDOW_CLASS, None)
+            except win32gui.error:
+                target_hwnd = None
+            if not target_hwnd or not win32gui.IsWindowVisible(target_hwnd):
+                target_hwnd = self._find_transcript_window()
+        if not target_hwnd:
+            print("未找到Zoom转录窗口，请确保：")
+            print("1. Zoom会议已经开始")
+            print("2. 转录功能已经开启")
+            print("3. 转录窗口已经打开")
+            return False
+
+        # 使用找到的句柄创建UIAutomation控件
+        target_window = auto.ControlFromHandle(target_hwnd)
+        if not target_window:
+            print("无法获取窗口控件")
+            return False
+
+        print(f"成功获取窗口控件: {win32gui.GetWindowText(target_hwnd)}")
+
+        list_control = self._follow_control_path(target_window, self.control_path)
+        if list_control:
+            print("沿缓存的控件路径找到列表控件")
+        else:
+            print("查找列表控件...")
+            path = []
+            list_control = self._find_list_control(target_window, path)
+            if not list_control:
+                print("未找到列表控件")
+                return False
+            self.control_path = path
+
+        print("找到列表控件，开始监控内容...")
+        self.target_hwnd = target_hwnd
+        self.list_control = list_control
+        return True
+
+    def _find_transcript_window(self):
+        """枚举所有可见的顶层窗口，按标题和类名查找Zoom转录窗口"""
+        found_windows = []
+
+        def find_transcript_window(hwnd, extra):
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                class_name = win32gui.GetClassName(hwnd)
+                if "转录" in title or "字幕" in title or "Transcript" in title or "Caption" in title:
+                    found_windows.append((hwnd, title, class_name))
+            return True  # 总是返回True继续枚举
+
+        print("\n正在查找Zoom转录窗口...")
+        win32gui.EnumWindows(find_transcript_window, None)
+
+        # 在收集到的窗口中查找Zoom的窗口
+        for hwnd, title, class_name in found_windows:
+            print(f"找到可能的窗口: Title='{title}', Class='{class_name}'")
+            if class_name == self.WINDOW_CLASS:
+                print(f"到Zoom转录窗口!")
+                return hwnd
+        return None
+
+    def is_alive(self) -> bool:
+        return bool(self.target_hwnd) and bool(win32gui.IsWindow(self.target_hwnd))
+
+    def read_names(self) -> List[str]:
+        """读取当前可见的ListItemControl名字"""
+        self._change_time, self._event_time = self._event_time, None
+        return [item.Name for item in self.list_control.GetChildren()
+                if item.ControlTypeName == "ListItemControl"]
+
+    def subscribe(self, callback) -> bool:
+        """在列表控件及其子项上注册UIA事件；重新连接后先注销上一次注册的处理器"""
+        self._unsubscribe()
+        if self.list_control is None:
+            return False
+
+        def on_change():
+            if self._event_time is None:
+                self._event_time = time.monotonic()
+            callback()
+
+        try:
+            automation = _AutomationClient.instance().IUIAutomation
+            element = self.list_control.Element
+            handler = _create_change_handler(on_change)
+            automation.AddStructureChangedEventHandler(element, auto.TreeScope.Subtree, None, handler)
+            self._handler, self._handler_element = handler, element
+            automation.AddPropertyChangedEventHandler(element, auto.TreeScope.Subtree, None, handler,
+                                                      [auto.PropertyId.NameProperty])
+        except Exception as e:
+            print(f"注册UIA事件失败，使用轮询: {e}")
+            self._unsubscribe()
+            return False
+        return True
+
+    def change_time(self) -> Optional[float]:
+        return self._change_time
+
+    def close(self):
+        self._unsubscribe()
+
+    def _unsubscribe(self):
+        if self._handler is None:
+            return
+        try:
+            automation = _AutomationClient.instance().IUIAutomation
+            automation.RemoveStructureChangedEventHandler(self._handler_element, self._handler)
+            automation.RemovePropertyChangedEventHandler(self._handler_element, self._handler)
+        except Exception as e:
+            # 窗口已经销毁时元素失效，处理器随之失效
+            print(f"注销UIA事件时出错: {e}")
+        self._handler = None
+        self._handler_element = None
+        self._event_time = None
+
+    def backfill(self) -> Iterator[List[str]]:
+        """滚动到列表顶部，再逐页向下，产出每一页的列表项名字
+
+        按键之间不再固定等待，而是等控件实际完成滚动，见BackfillScanner。
+        """
+        self.list_control.SetFocus()
+        # 先按End键确保激活滚动
+        self._send_key(win32con.VK_END)
+
+        print("滚动到顶部，开始向下收集内容...")
+        scanner = BackfillScanner(
+            self.read_names,
+            lambda: self._send_key(win32con.VK_HOME),
+            lambda: self._send_key(win32con.VK_NEXT),
+        )
+        yield from scanner.scan()
+        print(f"回填扫描 {scanner.pages} 页，按键 {scanner.keys} 次，耗时 {scanner.elapsed:.2f} 秒")
+
+    def _find_list_control(self, control, path: List[int]):
+        """递归查找ListControl，path记录从control到它的子控件序号"""
+        try:
+            if control.ControlTypeName == "ListControl":
+                return control
+
+            for index, child in enumerate(control.GetChildren()):
+                path.append(index)
+                result = self._find_list_control(child, path)
+                if result:
+                    return result
+                path.pop()
+            return None
+        except Exception as e:
+            print(f"检查控件时出错: {e}")
+            return None
+
+    def _follow_control_path(self, control, path: Optional[List[int]]):
+        """沿记住的子控件序号找ListControl，控件树结构变化时返回None"""
+        if path is None:
+            return None
+        try:
+            for index in path:
+                children = control.GetChildren()
+                if index >= len(children):
+                    return None
+                control = children[index]
+            return control if control.ControlTypeName == "ListControl" else None
+        except Exception as e:
+            print(f"沿缓存路径查找控件时出错: {e}")
+            return None
+
+    def _send_key(self, vk_code):
+        """发送单个按键"""
+        win32api.keybd_event(vk_code, 0, 0, 0)
+        sleep(0.02)
+        # 按键之后不再等待，由调用方等待控件响应
+        win32api.keybd_event(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0)